@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('posts', '0004_post_scheduler_sweep'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('captured_at', models.DateTimeField()),
+                ('impressions', models.PositiveIntegerField(default=0)),
+                ('reach', models.PositiveIntegerField(default=0)),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('likes', models.PositiveIntegerField(default=0)),
+                ('comments', models.PositiveIntegerField(default=0)),
+                ('shares', models.PositiveIntegerField(default=0)),
+                ('link', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='metric_snapshots', to='posts.postplatformlink')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('link', 'captured_at'), name='metric_snapshot_link_captured_at')],
+            },
+        ),
+    ]
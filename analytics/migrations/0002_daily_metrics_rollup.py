@@ -0,0 +1,45 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_snapshot_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=20)),
+                ('day', models.DateField()),
+                ('impressions', models.BigIntegerField(default=0)),
+                ('reach', models.BigIntegerField(default=0)),
+                ('views', models.BigIntegerField(default=0)),
+                ('likes', models.BigIntegerField(default=0)),
+                ('comments', models.BigIntegerField(default=0)),
+                ('shares', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_metrics', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'day'], name='daily_metrics_user_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'platform', 'day'), name='daily_metrics_user_platform_day')],
+            },
+        ),
+    ]
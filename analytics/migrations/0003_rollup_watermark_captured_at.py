@@ -0,0 +1,22 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_daily_metrics_rollup'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='rollupwatermark',
+            name='last_snapshot_id',
+        ),
+        migrations.AddField(
+            model_name='rollupwatermark',
+            name='last_captured_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
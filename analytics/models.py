@@ -1,3 +1,72 @@
 from django.db import models
+from django.contrib.auth import get_user_model
 
-# Create your models here.
+User = get_user_model()
+
+
+class MetricSnapshot(models.Model):
+    """
+    Engagement counters of one published PostPlatformLink at one point in time.
+
+    Snapshots are append-only and kept narrow (one row per link per collection
+    run) so the table stays cheap to scan and to bulk insert.
+    """
+    METRIC_FIELDS = ('impressions', 'reach', 'views', 'likes', 'comments', 'shares')
+
+    link = models.ForeignKey('posts.PostPlatformLink', on_delete=models.CASCADE, related_name='metric_snapshots')
+    captured_at = models.DateTimeField()
+    impressions = models.PositiveIntegerField(default=0)
+    reach = models.PositiveIntegerField(default=0)
+    views = models.PositiveIntegerField(default=0)
+    likes = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+    shares = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['link', 'captured_at'], name='metric_snapshot_link_captured_at'),
+        ]
+
+    def __str__(self):
+        return f"Metrics for link {self.link_id} at {self.captured_at}"
+
+
+class DailyMetrics(models.Model):
+    """
+    Precomputed per-user, per-platform, per-day engagement totals.
+
+    Each row holds what the user's posts on that platform gained that day
+    (the difference between consecutive snapshots of each link), recomputed
+    by analytics.rollups so dashboards never aggregate raw snapshots.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_metrics')
+    platform = models.CharField(max_length=20)
+    day = models.DateField()
+    impressions = models.BigIntegerField(default=0)
+    reach = models.BigIntegerField(default=0)
+    views = models.BigIntegerField(default=0)
+    likes = models.BigIntegerField(default=0)
+    comments = models.BigIntegerField(default=0)
+    shares = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'platform', 'day'], name='daily_metrics_user_platform_day'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'day'], name='daily_metrics_user_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.platform} {self.day}"
+
+
+class RollupWatermark(models.Model):
+    """Latest MetricSnapshot captured_at already folded into a rollup."""
+    name = models.CharField(max_length=50, unique=True)
+    last_captured_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_captured_at}"
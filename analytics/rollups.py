@@ -0,0 +1,111 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from .models import DailyMetrics, MetricSnapshot, RollupWatermark
+
+FIELDS = MetricSnapshot.METRIC_FIELDS
+WATERMARK = 'daily_metrics'
+
+
+def _overlap():
+    return timedelta(seconds=getattr(settings, 'ANALYTICS_ROLLUP_OVERLAP', 3600))
+
+
+def _day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+def _latest_per_link(snapshots):
+    """The latest of ``snapshots`` for each link (one correlated lookup on the (link, captured_at) index)."""
+    latest = snapshots.filter(link_id=OuterRef('link_id')).order_by('-captured_at').values('id')[:1]
+    return snapshots.filter(id=Subquery(latest))
+
+
+def _sums(snapshots):
+    """Metric totals of ``snapshots`` per (user, platform), summed by the database."""
+    rows = (
+        snapshots.values('link__post__user_id', 'link__social_account__platform')
+        .annotate(**{f'total_{field}': Sum(field) for field in FIELDS})
+    )
+    return {
+        (row['link__post__user_id'], row['link__social_account__platform']): {field: row[f'total_{field}'] for field in FIELDS}
+        for row in rows
+    }
+
+
+def _rollup_day(day):
+    """
+    Recompute the DailyMetrics rows of one day.
+
+    A link's gain for the day is its last snapshot of the day minus its last
+    snapshot before it (a first snapshot counts in full), so each row is the
+    sum of those last snapshots minus the sum of those earlier ones. Both
+    sums are aggregated in SQL; only one row per (user, platform) comes back.
+    """
+    start, end = _day_bounds(day)
+    on_day = MetricSnapshot.objects.filter(captured_at__gte=start, captured_at__lt=end)
+    before = MetricSnapshot.objects.filter(captured_at__lt=start, link_id__in=on_day.values('link_id'))
+    gains = _sums(_latest_per_link(on_day))
+    for key, values in _sums(_latest_per_link(before)).items():
+        for field, value in values.items():
+            gains[key][field] -= value
+
+    # Rows are overwritten, never incremented, so recomputing a day is harmless
+    DailyMetrics.objects.bulk_create(
+        [DailyMetrics(user_id=user_id, platform=platform, day=day, **values) for (user_id, platform), values in gains.items()],
+        update_conflicts=True,
+        unique_fields=['user', 'platform', 'day'],
+        update_fields=[*FIELDS, 'updated_at'],
+        batch_size=500,
+    )
+
+
+def _next_runs(watermark, batch_size):
+    """Collection runs after the watermark, oldest first, holding about batch_size snapshots."""
+    runs = MetricSnapshot.objects.all()
+    if watermark.last_captured_at is not None:
+        runs = runs.filter(captured_at__gt=watermark.last_captured_at)
+    taken, count = [], 0
+    # A collection run shares one captured_at, so runs are never split
+    for run in runs.values('captured_at').annotate(n=Count('id')).order_by('captured_at').iterator():
+        if count and count + run['n'] > batch_size:
+            break
+        taken.append(run['captured_at'])
+        count += run['n']
+    return taken, count
+
+
+def update_daily_rollups(batch_size=5000):
+    """
+    Fold the collection runs after the watermark into DailyMetrics.
+
+    The watermark is the latest captured_at already rolled up. Each run takes
+    the next collection runs (about batch_size snapshots) and recomputes the
+    days they fall on, plus the days within ANALYTICS_ROLLUP_OVERLAP before
+    the watermark, so a snapshot committed after a later one was rolled up is
+    still counted when the next collection arrives. Returns the number of new
+    snapshots; 0 once caught up, in which case nothing is recomputed.
+    """
+    with transaction.atomic():
+        watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=WATERMARK)
+        runs, count = _next_runs(watermark, batch_size)
+        if not runs:
+            return 0
+
+        days = {timezone.localtime(run).date() for run in runs}
+        if watermark.last_captured_at is not None:
+            day = timezone.localtime(watermark.last_captured_at - _overlap()).date()
+            while day <= timezone.localtime(watermark.last_captured_at).date():
+                days.add(day)
+                day += timedelta(days=1)
+        for day in sorted(days):
+            _rollup_day(day)
+
+        watermark.last_captured_at = runs[-1]
+        watermark.save(update_fields=['last_captured_at', 'updated_at'])
+        return count
@@ -0,0 +1,7 @@
+from rest_framework import serializers
+from .models import DailyMetrics
+
+class DailyMetricsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DailyMetrics
+        fields = ('platform', 'day', 'impressions', 'reach', 'views', 'likes', 'comments', 'shares')
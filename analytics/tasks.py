@@ -0,0 +1,28 @@
+from celery import shared_task
+import logging
+
+from .collector import MetricsCollector
+from .rollups import update_daily_rollups
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def collect_metrics_task():
+    collector = MetricsCollector()
+    written = collector.run()
+    logger.info(f"Collected {written} metric snapshots in {collector.api_calls} API calls")
+    return written
+
+
+@shared_task
+def update_rollups_task(batch_size=5000):
+    processed = 0
+    while True:
+        count = update_daily_rollups(batch_size)
+        processed += count
+        if count < batch_size:
+            break
+    if processed:
+        logger.info(f"Rolled up {processed} metric snapshots")
+    return processed
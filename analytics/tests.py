@@ -1,3 +1,171 @@
+import json
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+from urllib.parse import parse_qs
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from posts.models import Post, PostPlatformLink, SocialAccount
+from .collector import MetricsCollector
+from .models import DailyMetrics, MetricSnapshot, RollupWatermark
+from .rollups import update_daily_rollups
+
+User = get_user_model()
+
+
+def _published_links(user, platform, count, prefix):
+    account = SocialAccount.objects.create(user=user, platform=platform, platform_user_id=prefix, access_token=f'{prefix}-token')
+    posts = Post.objects.bulk_create(Post(user=user, content=f'{prefix} {i}', status='published') for i in range(count))
+    return PostPlatformLink.objects.bulk_create(
+        PostPlatformLink(post=post, social_account=account, status='published', platform_post_id=f'{prefix}_{i}')
+        for i, post in enumerate(posts)
+    )
+
+
+def _fake_metrics(self, platform_post_ids):
+    return {post_id: {'likes': 3, 'comments': 1, 'shares': 2} for post_id in platform_post_ids}
+
+
+def _graph_batch_response(url, data=None, **kwargs):
+    """Answer a Graph batch of ?ids= reads the way the Graph API would."""
+    items = []
+    for request in json.loads(data['batch']):
+        ids = parse_qs(request['relative_url'].split('?', 1)[1])['ids'][0].split(',')
+        body = {i: {'reactions': {'summary': {'total_count': 3}}, 'comments': {'summary': {'total_count': 1}},
+                    'shares': {'count': 2}} for i in ids}
+        items.append({'code': 200, 'body': json.dumps(body)})
+    return MagicMock(status_code=200, json=lambda: items)
+
+
+class MetricsCollectorTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='hank', password='pw')
+        _published_links(self.user, 'facebook', 120, 'fb')
+        _published_links(self.user, 'linkedin', 3, 'li')
+        # Not published yet, must be skipped
+        account = SocialAccount.objects.create(user=self.user, platform='facebook', platform_user_id='x', access_token='x')
+        PostPlatformLink.objects.create(post=Post.objects.create(user=self.user, content='draft'), social_account=account)
+
+    @patch('posts.services.LinkedInService.fetch_metrics', autospec=True, side_effect=_fake_metrics)
+    @patch('requests.Session.post', side_effect=_graph_batch_response)
+    def test_batches_api_calls_and_bulk_inserts(self, mock_post, mock_li):
+        collector = MetricsCollector(write_batch_size=500)
+        # links query, existing-snapshot check, one INSERT for all 123 snapshots
+        with self.assertNumQueries(3):
+            written = collector.run()
+
+        self.assertEqual(written, 123)
+        # three 50-id Graph reads travel in one batch request, plus one LinkedIn call
+        self.assertEqual(collector.api_calls, 2)
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(len(json.loads(mock_post.call_args.kwargs['data']['batch'])), 3)
+        self.assertEqual(mock_li.call_count, 1)
+        snapshot = MetricSnapshot.objects.get(link__platform_post_id='fb_7')
+        self.assertEqual((snapshot.likes, snapshot.comments, snapshot.shares, snapshot.views), (3, 1, 2, 0))
+
+    @patch('posts.services.LinkedInService.fetch_metrics', autospec=True, side_effect=_fake_metrics)
+    @patch('requests.Session.post', side_effect=RuntimeError('connection reset'))
+    def test_failing_account_does_not_stop_the_run(self, mock_post, mock_li):
+        self.assertEqual(MetricsCollector().run(), 3)
+
+    @patch('posts.services.LinkedInService.fetch_metrics', autospec=True, side_effect=_fake_metrics)
+    @patch('requests.Session.post', side_effect=_graph_batch_response)
+    def test_rerun_for_same_timestamp_is_idempotent(self, mock_post, mock_li):
+        collector = MetricsCollector()
+        collector.run()
+        rerun = MetricsCollector(captured_at=collector.captured_at)
+        self.assertEqual(rerun.run(), 0)
+        self.assertEqual(MetricSnapshot.objects.count(), 123)
+
+
+class DailyRollupTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='ivy', password='pw')
+        self.fb = _published_links(self.user, 'facebook', 2, 'fb')
+        self.li = _published_links(self.user, 'linkedin', 1, 'li')
+
+    def _snap(self, link, when, **values):
+        return MetricSnapshot.objects.create(link=link, captured_at=when, **values)
+
+    def test_incremental_rollup_counts_daily_gains(self):
+        day1 = timezone.make_aware(datetime(2026, 5, 1, 10))
+        day2 = day1 + timedelta(days=1)
+        self._snap(self.fb[0], day1, likes=10, comments=1)
+        self._snap(self.fb[1], day1, likes=5)
+        self._snap(self.li[0], day1, likes=2)
+        self.assertEqual(update_daily_rollups(), 3)
+
+        fb_day1 = DailyMetrics.objects.get(user=self.user, platform='facebook', day=day1.date())
+        self.assertEqual((fb_day1.likes, fb_day1.comments), (15, 1))
+
+        # Second run only sees new snapshots and adds the gain since the previous one.
+        self._snap(self.fb[0], day2, likes=14, comments=1)
+        self._snap(self.fb[0], day2 + timedelta(hours=1), likes=16, comments=3)
+        self.assertEqual(update_daily_rollups(), 2)
+        self.assertEqual(update_daily_rollups(), 0)
+
+        fb_day2 = DailyMetrics.objects.get(user=self.user, platform='facebook', day=day2.date())
+        self.assertEqual((fb_day2.likes, fb_day2.comments), (6, 2))
+        fb_day1.refresh_from_db()
+        self.assertEqual(fb_day1.likes, 15)
+        self.assertEqual(RollupWatermark.objects.get().last_captured_at, day2 + timedelta(hours=1))
+        # A caught-up run only reads the watermark and looks for new runs.
+        with self.assertNumQueries(4):
+            self.assertEqual(update_daily_rollups(), 0)
+
+    def test_snapshot_committed_late_is_rolled_up(self):
+        day = timezone.make_aware(datetime(2026, 5, 1, 10))
+        self._snap(self.fb[0], day, likes=10)
+        self._snap(self.fb[0], day + timedelta(hours=2), likes=12)
+        update_daily_rollups()
+
+        # A slower collection run commits after the watermark has passed it;
+        # the next collection's rollup recomputes its day and counts it.
+        self._snap(self.fb[1], day + timedelta(hours=1), likes=5)
+        self._snap(self.fb[0], day + timedelta(hours=3), likes=13)
+        self.assertEqual(update_daily_rollups(), 1)
+        self.assertEqual(DailyMetrics.objects.get(platform='facebook').likes, 18)
+        # Recomputing the same day again leaves the totals alone.
+        RollupWatermark.objects.update(last_captured_at=day)
+        update_daily_rollups()
+        self.assertEqual(DailyMetrics.objects.get(platform='facebook').likes, 18)
+
+    def test_small_batches_match_one_big_batch(self):
+        day = timezone.make_aware(datetime(2026, 5, 1, 10))
+        for hour, likes in enumerate([1, 4, 9, 9, 12]):
+            self._snap(self.fb[0], day + timedelta(hours=hour), likes=likes)
+        while update_daily_rollups(batch_size=2):
+            pass
+        self.assertEqual(DailyMetrics.objects.get(platform='facebook').likes, 12)
+
+
+class DailyMetricsApiTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='jack', password='pw')
+        self.client.force_authenticate(self.user)
+        today = timezone.localdate()
+        DailyMetrics.objects.create(user=self.user, platform='facebook', day=today, likes=4, shares=1)
+        DailyMetrics.objects.create(user=self.user, platform='facebook', day=today - timedelta(days=1), likes=6)
+        DailyMetrics.objects.create(user=self.user, platform='linkedin', day=today, likes=1)
+        DailyMetrics.objects.create(user=self.user, platform='linkedin', day=today - timedelta(days=90), likes=100)
+        other = User.objects.create_user(username='kim', password='pw')
+        DailyMetrics.objects.create(user=other, platform='facebook', day=today, likes=1000)
+
+    def test_daily_rows_for_default_window(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/analytics/daily/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 3)
+
+    def test_summary_per_platform(self):
+        response = self.client.get('/api/analytics/daily/summary/?platform=facebook')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['platform'], 'facebook')
+        self.assertEqual((response.data[0]['likes'], response.data[0]['shares']), (10, 1))
 
-# Create your tests here.
+    def test_invalid_date(self):
+        response = self.client.get('/api/analytics/daily/?start=yesterday')
+        self.assertEqual(response.status_code, 400)
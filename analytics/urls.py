@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import DailyMetricsViewSet
+
+router = DefaultRouter()
+router.register(r'daily', DailyMetricsViewSet)
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
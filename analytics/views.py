@@ -1,3 +1,52 @@
-from django.shortcuts import render
+from datetime import timedelta
 
-# Create your views here.
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .models import DailyMetrics, MetricSnapshot
+from .serializers import DailyMetricsSerializer
+
+
+class DailyMetricsViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Dashboard metrics, served only from the precomputed DailyMetrics rollup.
+
+    Filters: ``platform``, ``start`` and ``end`` (ISO dates, inclusive). Without
+    ``start`` the last 30 days are returned.
+    """
+    serializer_class = DailyMetricsSerializer
+    queryset = DailyMetrics.objects.all()
+    pagination_class = None
+    DEFAULT_DAYS = 30
+
+    def _date_param(self, name, default):
+        value = self.request.query_params.get(name)
+        if not value:
+            return default
+        parsed = parse_date(value)
+        if parsed is None:
+            raise ValidationError({name: 'Must be an ISO date (YYYY-MM-DD).'})
+        return parsed
+
+    def get_queryset(self):
+        params = self.request.query_params
+        today = timezone.localdate()
+        start = self._date_param('start', today - timedelta(days=self.DEFAULT_DAYS - 1))
+        end = self._date_param('end', today)
+
+        queryset = self.queryset.filter(user=self.request.user, day__range=(start, end))
+        if params.get('platform'):
+            queryset = queryset.filter(platform=params['platform'])
+        return queryset.order_by('day', 'platform')
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Totals per platform over the requested range."""
+        fields = MetricSnapshot.METRIC_FIELDS
+        rows = self.get_queryset().order_by().values('platform').annotate(**{f: Sum(f) for f in fields})
+        return Response(sorted(rows, key=lambda row: row['platform']))
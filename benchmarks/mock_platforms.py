@@ -0,0 +1,243 @@
+"""
+Local stand-in for the LinkedIn, Graph and YouTube APIs.
+
+Serves just enough of each API for posts.services to publish against it:
+
+    {url}/linkedin/v2    -> LINKEDIN_API_URL
+    {url}/graph/v19.0    -> GRAPH_API_URL (including batch requests)
+    {url}/youtube/       -> YOUTUBE_API_URL (resumable uploads)
+    {url}/media/<name>   -> downloadable media of ``media_size`` bytes
+
+Every request waits ``latency`` +/- ``jitter`` seconds, then fails with a 429
+(``throttle_rate``, with a Retry-After of ``retry_after`` seconds) or a 503
+(``error_rate``). Graph batch operations are subject to the same injection
+one by one. Run it standalone with ``python -m benchmarks.mock_platforms``.
+"""
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class MockPlatformServer:
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 throttle_rate=0.0, retry_after=1, media_size=1024 * 1024, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.media_size = media_size
+        self.random = random.Random(seed)
+        self.requests = Counter()
+        self.uploads = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _handler(self))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def settings(self):
+        """Environment variables pointing the services at this server."""
+        return {
+            'LINKEDIN_API_URL': f"{self.url}/linkedin/v2",
+            'GRAPH_API_URL': f"{self.url}/graph/v19.0",
+            'YOUTUBE_API_URL': f"{self.url}/youtube/",
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def next_id(self):
+        return next(self._ids)
+
+    def fault(self):
+        """Sleep for the simulated latency, then return an injected status code or None."""
+        delay = self.latency + (self.random.uniform(-self.jitter, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+        return self.fault_code()
+
+    def fault_code(self):
+        with self._lock:
+            roll = self.random.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 503
+        return None
+
+    def count(self, route):
+        with self._lock:
+            self.requests[route] += 1
+
+    def graph(self, method, path, params):
+        """(status, body) of one Graph API call, ``path`` relative to the version root."""
+        parts = [part for part in path.split('/') if part]
+        if method == 'GET' and parts == ['me']:
+            return 200, {'id': 'bench-page'}
+        if method == 'GET' and not parts and 'ids' in params:
+            return 200, {object_id: {'id': object_id, 'status_code': 'FINISHED'} for object_id in params['ids'].split(',')}
+        if method == 'GET' and parts == ['oauth', 'access_token']:
+            return 200, {'access_token': f"bench-token-{self.next_id()}", 'expires_in': 5184000}
+        if method == 'POST' and parts[-1:] == ['feed']:
+            return 200, {'id': f"bench-page_{self.next_id()}"}
+        if method == 'POST' and parts[-1:] == ['media']:
+            return 200, {'id': f"container-{self.next_id()}"}
+        if method == 'POST' and parts[-1:] == ['media_publish']:
+            return 200, {'id': f"media-{self.next_id()}"}
+        return 404, {'error': {'message': f"Unknown Graph call {method} /{path}"}}
+
+    def graph_batch(self, params):
+        items = []
+        for request in json.loads(params.get('batch', '[]')):
+            url = urlsplit(request['relative_url'])
+            query = dict(parse_qs(url.query), **parse_qs(request.get('body', '')))
+            status = self.fault_code()
+            if status:
+                body = {'error': {'message': f"Injected {status}", 'code': status}}
+            else:
+                status, body = self.graph(request['method'], url.path, {k: v[0] for k, v in query.items()})
+            self.count(f"graph batch op {request['method']}")
+            items.append({'code': status, 'body': json.dumps(body)})
+        return items
+
+
+def _handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body=None, headers=None):
+            payload = b'' if body is None else (body if isinstance(body, bytes) else json.dumps(body).encode())
+            self.send_response(status)
+            if body is not None and not isinstance(body, bytes):
+                self.send_header('Content-Type', 'application/json')
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _body(self):
+            return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+        def _params(self, body):
+            url = urlsplit(self.path)
+            params = parse_qs(url.query)
+            if 'x-www-form-urlencoded' in (self.headers.get('Content-Type') or ''):
+                params.update(parse_qs(body.decode(errors='replace')))
+            return url.path, {k: v[0] for k, v in params.items()}
+
+        def _dispatch(self, method):
+            body = self._body()
+            path, params = self._params(body)
+            server.count(f"{method} {re.sub(r'/[0-9]+$', '/<id>', path)}")
+
+            if method == 'GET' and path.startswith('/media/'):
+                return self._send(200, b'\0' * server.media_size)
+
+            status = server.fault()
+            if status:
+                headers = {'Retry-After': str(server.retry_after)} if status == 429 else {}
+                return self._send(status, {'error': {'message': f"Injected {status}", 'code': status}}, headers)
+
+            if path.startswith('/linkedin/'):
+                return self._linkedin(method, path)
+            if path.startswith('/graph/'):
+                relative = path.split('/', 3)[3] if path.count('/') >= 3 else ''
+                if method == 'POST' and not relative.strip('/') and 'batch' in params:
+                    return self._send(200, server.graph_batch(params))
+                return self._send(*server.graph(method, relative, params))
+            if path.startswith('/youtube/'):
+                return self._youtube(method, path, body)
+            self._send(404, {'error': {'message': f"Unknown path {path}"}})
+
+        def _linkedin(self, method, path):
+            if method == 'GET' and path.endswith('/me'):
+                return self._send(200, {'id': 'bench-member'})
+            if method == 'POST' and path.endswith('/ugcPosts'):
+                share = f"urn:li:share:{server.next_id()}"
+                return self._send(201, {'id': share}, {'X-RestLi-Id': share})
+            self._send(404, {'message': f"Unknown LinkedIn call {method} {path}"})
+
+        def _youtube(self, method, path, body):
+            if method == 'POST' and path.endswith('/upload/youtube/v3/videos'):
+                session = server.next_id()
+                server.uploads[session] = 0
+                return self._send(200, {}, {'Location': f"{server.url}/youtube/upload-session/{session}"})
+            if method == 'PUT' and '/upload-session/' in path:
+                session = int(path.rsplit('/', 1)[1])
+                # Content-Range: bytes first-last/total, or bytes */total for a status query
+                spec, total = self.headers.get('Content-Range', 'bytes */0').split(' ', 1)[1].split('/')
+                if spec != '*':
+                    server.uploads[session] = int(spec.split('-')[1]) + 1
+                received = server.uploads.get(session, 0)
+                if received >= int(total):
+                    return self._send(200, {'id': f"video-{session}", 'status': {'uploadStatus': 'uploaded'}})
+                headers = {'Range': f"bytes=0-{received - 1}"} if received else {}
+                return self._send(308, None, headers)
+            self._send(404, {'error': {'message': f"Unknown YouTube call {method} {path}"}})
+
+        def do_GET(self):
+            self._dispatch('GET')
+
+        def do_POST(self):
+            self._dispatch('POST')
+
+        def do_PUT(self):
+            self._dispatch('PUT')
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per request')
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests failing with 503')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of requests failing with 429')
+    parser.add_argument('--retry-after', type=int, default=1)
+    args = parser.parse_args()
+
+    server = MockPlatformServer(args.host, args.port, args.latency, args.jitter, args.error_rate,
+                                args.throttle_rate, args.retry_after)
+    for name, value in server.settings().items():
+        print(f"{name}={value}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""
+Publish-path benchmark against the local mock platform server.
+
+Drives SocialMediaManager.publish (the service layer on its own) and
+publish_post_task (selects, fan-out, rate limiter, bulk updates) at scale
+and reports throughput, p50/p95/p99 latency, database queries and the HTTP
+calls the platforms received. Nothing leaves the machine: the services are
+pointed at benchmarks.mock_platforms and run against a throwaway test
+database.
+
+    python -m benchmarks.publish --posts 200 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks.mock_platforms import MockPlatformServer
+
+PLATFORMS = ('linkedin', 'facebook', 'instagram', 'youtube')
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of ``samples`` (already sorted)."""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, max(0, round(q / 100 * len(samples)) - 1))]
+
+
+def summarize(name, latencies, seconds, statuses, server, queries=None):
+    latencies = sorted(latencies)
+    report = {
+        'scenario': name,
+        'operations': len(latencies),
+        'seconds': round(seconds, 3),
+        'throughput': round(len(latencies) / seconds, 1) if seconds else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'statuses': dict(statuses),
+        'http_requests': dict(server.requests),
+    }
+    if queries is not None:
+        report['queries'] = sum(queries)
+        report['queries_per_op'] = round(sum(queries) / len(queries), 1) if queries else 0.0
+        report['max_queries_per_op'] = max(queries, default=0)
+    server.requests.clear()
+    return report
+
+
+def bench_manager(args, server, media_url):
+    """SocialMediaManager.publish for every (post, platform) from a thread pool."""
+    from posts.resilience import TransientError
+    from posts.services import SocialMediaManager
+
+    def publish(job):
+        number, platform = job
+        started = time.perf_counter()
+        try:
+            status = SocialMediaManager.publish(
+                platform, f"bench-token-{number % args.accounts}", f"Benchmark post {number}", media_url
+            )['status']
+        except TransientError:
+            status = 'retry'
+        return time.perf_counter() - started, status
+
+    jobs = [(number, platform) for number in range(args.posts) for platform in args.platforms]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        results = list(pool.map(publish, jobs))
+    seconds = time.perf_counter() - started
+    return summarize('SocialMediaManager.publish', [r[0] for r in results], seconds,
+                     Counter(r[1] for r in results), server)
+
+
+def bench_task(args, server, media_url):
+    """publish_post_task for posts linked to every platform, one task at a time."""
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from posts.models import Post, PostPlatformLink, SocialAccount
+    from posts.tasks import publish_post_task
+
+    user = get_user_model().objects.create_user(username=f"bench-{time.time_ns()}")
+    accounts = [
+        SocialAccount.objects.create(
+            user=user, platform=platform, platform_user_id=f"{platform}-{n}", access_token=f"bench-token-{n}"
+        )
+        for n in range(args.accounts) for platform in args.platforms
+    ]
+    posts = Post.objects.bulk_create(
+        Post(user=user, content=f"Benchmark post {n}", media_url=media_url, status='publishing')
+        for n in range(args.posts)
+    )
+    per_account = len(args.platforms)
+    PostPlatformLink.objects.bulk_create(
+        PostPlatformLink(post=post, social_account=account)
+        for n, post in enumerate(posts)
+        for account in accounts[(n % args.accounts) * per_account:][:per_account]
+    )
+
+    latencies, queries = [], []
+    started = time.perf_counter()
+    for post in posts:
+        with CaptureQueriesContext(connection) as captured:
+            task_started = time.perf_counter()
+            publish_post_task(post.id, max_workers=args.workers)
+            latencies.append(time.perf_counter() - task_started)
+        queries.append(len(captured))
+    seconds = time.perf_counter() - started
+
+    statuses = Counter(
+        PostPlatformLink.objects.filter(post__in=posts).values_list('status', flat=True)
+    )
+    return summarize('publish_post_task', latencies, seconds, statuses, server, queries)
+
+
+def print_report(report):
+    print(f"\n{report['scenario']}")
+    print(f"  {report['operations']} ops in {report['seconds']}s: {report['throughput']} ops/s")
+    print(f"  latency p50 {report['p50_ms']} ms, p95 {report['p95_ms']} ms, p99 {report['p99_ms']} ms")
+    if 'queries' in report:
+        print(f"  queries {report['queries']} ({report['queries_per_op']}/op, max {report['max_queries_per_op']})")
+    print(f"  statuses {report['statuses']}")
+    for route, count in sorted(report['http_requests'].items()):
+        print(f"  {count:>7}  {route}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', choices=('all', 'manager', 'task'), default='all')
+    parser.add_argument('--posts', type=int, default=100)
+    parser.add_argument('--accounts', type=int, default=10, help='accounts per platform')
+    parser.add_argument('--platforms', type=lambda value: value.split(','), default=list(PLATFORMS))
+    parser.add_argument('--concurrency', type=int, default=8, help='threads calling SocialMediaManager.publish')
+    parser.add_argument('--workers', type=int, default=4, help='fan-out threads per publish_post_task')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per mock request')
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests failing with 503')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of requests failing with 429')
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--media-size', type=int, default=1024 * 1024, help='bytes of the posted media')
+    parser.add_argument('--rate-limits', action='store_true', help='keep SOCIAL_RATE_LIMITS (off by default)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', metavar='PATH', help='also write the reports as JSON')
+    args = parser.parse_args(argv)
+
+    server = MockPlatformServer(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after, media_size=args.media_size, seed=args.seed,
+    ).start()
+    media_dir = tempfile.TemporaryDirectory()
+    # Settings are read at import, so the environment has to be ready before django.setup()
+    os.environ.update(server.settings())
+    os.environ.setdefault('INSTAGRAM_BUSINESS_ID', 'bench-ig')
+    os.environ['MEDIA_CACHE_DIR'] = media_dir.name
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'social_marketing.settings')
+
+    import django
+    django.setup()
+    from django.db import connection
+    from django.test.utils import override_settings, setup_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    overrides = {} if args.rate_limits else {'SOCIAL_RATE_LIMITS': {}}
+    media_url = f"{server.url}/media/bench.mp4"
+    reports = []
+    try:
+        with override_settings(**overrides):
+            if args.scenario in ('all', 'manager'):
+                reports.append(bench_manager(args, server, media_url))
+            if args.scenario in ('all', 'task'):
+                reports.append(bench_task(args, server, media_url))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        server.stop()
+        media_dir.cleanup()
+
+    for report in reports:
+        print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(reports, indent=2))
+    return reports
+
+
+if __name__ == '__main__':
+    main()
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        # Response cache invalidation (see posts.caching)
+        from . import signals  # noqa: F401
+        from . import checks  # noqa: F401
@@ -0,0 +1,322 @@
+import asyncio
+import logging
+import time
+import weakref
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+from .caching import bump_version
+from .http import pool_config
+from .resilience import REJECTED_STATUS, RETRYABLE_STATUS, TransientError, circuit_breaker, parse_retry_after, timeouts
+from .services import BaseSocialService, FacebookService, InstagramService, LinkedInService
+
+logger = logging.getLogger(__name__)
+
+# One AsyncClient per event loop: httpx connections are bound to the loop that opened them.
+_clients = weakref.WeakKeyDictionary()
+
+
+def max_concurrency():
+    return getattr(settings, 'SOCIAL_ASYNC_MAX_CONCURRENCY', 100)
+
+
+def get_client():
+    """
+    Shared keep-alive ``httpx.AsyncClient`` for the running event loop.
+
+    Every async service on the loop goes through it, so hundreds of concurrent
+    platform calls share a bounded set of connections per host.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        conf = pool_config()
+        client = _clients[loop] = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_concurrency(), max_keepalive_connections=conf['POOL_MAXSIZE']),
+            timeout=conf['TIMEOUT'],
+        )
+    return client
+
+
+async def close_client():
+    """Close the running loop's client (e.g. on ASGI lifespan shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+class AsyncBaseSocialService(BaseSocialService):
+    """
+    Coroutine counterpart of BaseSocialService for ASGI views and async workers.
+
+    The async services subclass the synchronous ones so payload builders,
+    Graph operations and parsers are shared; every method that does network
+    I/O (directly or through _request) is overridden as a coroutine and goes
+    through the shared AsyncClient.
+    """
+
+    def __init__(self, access_token=None, account=None, link=None, client=None):
+        super().__init__(access_token, account, link)
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client or get_client()
+
+    async def _request(self, method, url, **kwargs):
+        """
+        Send a request with the platform's connect/read timeouts, failing fast
+        while its circuit is open. Unlike the sync services nothing is retried
+        inline: callers gathering many calls should not stall on one. The
+        failures the sync services would retry (reads, calls that never
+        connected, and throttled or rejected writes) raise TransientError
+        with the platform's Retry-After instead.
+        """
+        if 'timeout' not in kwargs:
+            connect, read = timeouts(self.PLATFORM, pool_config(httpx.URL(url).host)['TIMEOUT'])
+            kwargs['timeout'] = httpx.Timeout(read, connect=connect)
+        await sync_to_async(circuit_breaker.check)(self.PLATFORM)
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method.upper(), url, **kwargs)
+        except httpx.TransportError as e:
+            metrics.observe_request(self.PLATFORM, method, time.perf_counter() - started, error=e)
+            await sync_to_async(circuit_breaker.record_failure)(self.PLATFORM)
+            # Nothing reached the platform if the connection was never made
+            if method == 'get' or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)):
+                raise TransientError(f"{self.PLATFORM}: {e!r}") from e
+            raise
+        metrics.observe_request(self.PLATFORM, method, time.perf_counter() - started, response.status_code)
+        if response.status_code not in RETRYABLE_STATUS:
+            await sync_to_async(circuit_breaker.record_success)(self.PLATFORM)
+            return response
+        if response.status_code != 429:
+            await sync_to_async(circuit_breaker.record_failure)(self.PLATFORM)
+        if method == 'get' or response.status_code in REJECTED_STATUS:
+            raise TransientError(
+                f"{self.PLATFORM}: HTTP {response.status_code}: {response.text}",
+                retry_after=parse_retry_after(response.headers.get('Retry-After')),
+            )
+        # The platform may have acted on the write: report, never repeat
+        return response
+
+    async def _get(self, url, **kwargs):
+        return await self._request('get', url, **kwargs)
+
+    async def _post(self, url, **kwargs):
+        return await self._request('post', url, **kwargs)
+
+    async def authenticate(self):
+        raise NotImplementedError
+
+    async def is_authenticated(self):
+        """Async is_authenticated(): shares the cached verdict with the sync services."""
+        valid = await cache.aget(self._token_cache_key('auth'))
+        if valid is None:
+            valid = bool(await self.authenticate())
+            await sync_to_async(self.remember_authentication)(valid)
+        return valid
+
+    async def refresh_access_token(self, refresh_token):
+        raise NotImplementedError
+
+    async def _refresh_grant(self, token_url, refresh_token):
+        if not refresh_token:
+            return None
+        response = await self._post(token_url, data=self.refresh_grant_data(refresh_token))
+        if response.status_code != 200:
+            logger.error(f"Token refresh error: {response.text}")
+            return None
+        return self.parse_token(response.json())
+
+    async def publish_post(self, content, media_url=None):
+        raise NotImplementedError
+
+    async def fetch_analytics(self):
+        raise NotImplementedError
+
+    async def fetch_metrics(self, platform_post_ids):
+        raise NotImplementedError
+
+
+class AsyncLinkedInService(AsyncBaseSocialService, LinkedInService):
+    async def get_member_id(self):
+        """Async get_member_id(): cached id, then the stored one, then /me."""
+        cache_key = self._token_cache_key('linkedin-member')
+        member_id = await cache.aget(cache_key)
+        if member_id:
+            return member_id
+        if self.account is not None and self.account.platform_user_id:
+            if await cache.aget(self._token_cache_key('auth')) is False:
+                return None
+            await cache.aset(cache_key, self.account.platform_user_id, getattr(settings, 'SOCIAL_IDENTITY_CACHE_TTL', 3600))
+            return self.account.platform_user_id
+        return await self.lookup_member_id()
+
+    async def lookup_member_id(self):
+        """Async lookup_member_id(): same cache keys, lookup lock and write-through as the sync service."""
+        cache_key = self._token_cache_key('linkedin-member')
+        lock_key = f"{cache_key}:lock"
+        deadline = time.monotonic() + self.MEMBER_LOOKUP_TIMEOUT
+        while True:
+            member_id = await cache.aget(cache_key)
+            if member_id:
+                return member_id
+            if await cache.aget(self._token_cache_key('auth')) is False:
+                return None
+            if await cache.aadd(lock_key, 1, self.MEMBER_LOOKUP_TIMEOUT):
+                break
+            if time.monotonic() >= deadline:
+                return await self._fetch_member_id(cache_key)
+            await asyncio.sleep(0.05)
+        try:
+            return await self._fetch_member_id(cache_key)
+        finally:
+            await cache.adelete(lock_key)
+
+    async def _fetch_member_id(self, cache_key):
+        headers = {"Authorization": f"Bearer {self.access_token}"}
+        response = await self._get(f"{self.base_url}/me", headers=headers)
+        if response.status_code == 401:
+            await sync_to_async(self.remember_authentication)(False)
+        if response.status_code != 200:
+            return None
+        member_id = response.json().get("id")
+        if not member_id:
+            return None
+
+        await cache.aset(cache_key, member_id, getattr(settings, 'SOCIAL_IDENTITY_CACHE_TTL', 3600))
+        await sync_to_async(self.remember_authentication)(True)
+        if self.account is not None and self.account.platform_user_id != member_id:
+            from .models import SocialAccount
+            await SocialAccount.objects.filter(pk=self.account.pk).aupdate(platform_user_id=member_id)
+            await sync_to_async(bump_version)(self.account.user_id)
+            self.account.platform_user_id = member_id
+        return member_id
+
+    async def authenticate(self):
+        return await self.lookup_member_id() is not None
+
+    async def publish_post(self, content, media_url=None):
+        try:
+            user_urn = await self.get_member_id()
+            if not user_urn:
+                return {"status": "failed", "error": "Could not retrieve LinkedIn URN"}
+
+            response = await self._post(f"{self.base_url}/ugcPosts", headers=self.share_headers(), json=self.share_payload(user_urn, content))
+            if response.status_code == 201:
+                return {"status": "success", "platform_post_id": response.json().get('id')}
+            return {"status": "failed", "error": response.text}
+        except TransientError:
+            raise
+        except Exception as e:
+            logger.error(f"LinkedIn error: {str(e)}")
+            return {"status": "failed", "error": str(e)}
+
+    async def fetch_analytics(self):
+        # Placeholder data, nothing to wait on
+        return LinkedInService.fetch_analytics(self)
+
+    async def refresh_access_token(self, refresh_token):
+        return await self._refresh_grant(self.TOKEN_URL, refresh_token)
+
+    async def fetch_metrics(self, platform_post_ids):
+        url, headers = self.metrics_request(platform_post_ids)
+        response = await self._get(url, headers=headers)
+        if response.status_code != 200:
+            logger.error(f"LinkedIn metrics error: {response.text}")
+            return {}
+        return self.parse_metrics(response.json())
+
+
+class AsyncFacebookService(AsyncBaseSocialService, FacebookService):
+    async def authenticate(self):
+        if not self.page_access_token:
+            return False
+        response = await self._get(f"{self.base_url}/me", params={"access_token": self.page_access_token})
+        return response.status_code == 200
+
+    async def publish_post(self, content, media_url=None):
+        try:
+            _, relative_url, token, params = self.feed_operation(content, media_url)
+            response = await self._post(f"{self.base_url}/{relative_url}", params=dict(params, access_token=token))
+            if response.status_code == 200:
+                return {"status": "success", "platform_post_id": response.json().get('id')}
+            return {"status": "failed", "error": response.text}
+        except TransientError:
+            raise
+        except Exception as e:
+            logger.error(f"Facebook error: {str(e)}")
+            return {"status": "failed", "error": str(e)}
+
+    async def fetch_analytics(self):
+        return FacebookService.fetch_analytics(self)
+
+    async def refresh_access_token(self, refresh_token=None):
+        _, relative_url, token, params = self.refresh_operation()
+        response = await self._get(f"{self.base_url}/{relative_url}", params=params)
+        if response.status_code != 200:
+            logger.error(f"Token refresh error: {response.text}")
+            return None
+        return self.parse_token(response.json())
+
+    async def fetch_metrics(self, platform_post_ids):
+        _, _, token, params = self.metrics_operation(platform_post_ids)
+        response = await self._get(f"{self.base_url}/", params=dict(params, access_token=token))
+        if response.status_code != 200:
+            logger.error(f"{self.PLATFORM.capitalize()} metrics error: {response.text}")
+            return {}
+        return self.parse_metrics(response.json())
+
+
+class AsyncInstagramService(AsyncBaseSocialService, InstagramService):
+    async def authenticate(self):
+        return InstagramService.authenticate(self)
+
+    async def create_container(self, content, media_url=None):
+        """Async create_container(): start the publish and leave the rest to the container poller."""
+        if not media_url:
+            return {"status": "failed", "error": "Instagram requires a media_url (image/video)"}
+        try:
+            _, relative_url, token, params = self.container_operation(content, media_url)
+            res = (await self._post(f"{self.base_url}/{relative_url}", data=dict(params, access_token=token))).json()
+            if not res.get('id'):
+                return {"status": "failed", "error": f"Container creation failed: {res}"}
+            return {"status": "processing", "container_id": res['id']}
+        except TransientError:
+            raise
+        except Exception as e:
+            logger.error(f"Instagram error: {str(e)}")
+            return {"status": "failed", "error": str(e)}
+
+    async def publish_post(self, content, media_url=None):
+        result = await self.create_container(content, media_url)
+        if result["status"] != "processing":
+            return result
+        try:
+            _, relative_url, token, params = self.publish_operation(result["container_id"])
+            final_res = (await self._post(f"{self.base_url}/{relative_url}", data=dict(params, access_token=token))).json()
+            return {"status": "success", "platform_post_id": final_res.get('id')}
+        except TransientError:
+            raise
+        except Exception as e:
+            logger.error(f"Instagram error: {str(e)}")
+            return {"status": "failed", "error": str(e)}
+
+    async def fetch_analytics(self):
+        return InstagramService.fetch_analytics(self)
+
+    # Same Graph reads as Facebook, with Instagram's operations and parser
+    refresh_access_token = AsyncFacebookService.refresh_access_token
+    fetch_metrics = AsyncFacebookService.fetch_metrics
+
+
+ASYNC_SERVICES = {
+    'linkedin': AsyncLinkedInService,
+    'facebook': AsyncFacebookService,
+    'instagram': AsyncInstagramService,
+}
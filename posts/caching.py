@@ -0,0 +1,98 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+def _version_key(user_id):
+    return f"posts:version:{user_id}"
+
+
+def get_version(user_id):
+    """
+    Current change stamp of a user's posts and accounts.
+
+    The stamp is the time of the last change, so it doubles as Last-Modified.
+    A missing stamp (first read, or evicted from the cache) is recreated as
+    "now", which only ever makes clients revalidate.
+    """
+    key = _version_key(user_id)
+    stamp = cache.get(key)
+    if stamp is None:
+        cache.add(key, time.time(), None)
+        stamp = cache.get(key) or time.time()
+    return stamp
+
+
+def _set_versions(user_ids):
+    now = time.time()
+    cache.set_many({_version_key(user_id): now for user_id in user_ids}, None)
+
+
+def bump_version(*user_ids):
+    """
+    Invalidate the cached responses and ETags of ``user_ids``.
+
+    Called by the post_save/post_delete receivers in posts.signals; code that
+    writes with QuerySet.update() or bulk_update() bypasses the signals and
+    must call this itself. Inside a transaction the stamp is bumped again on
+    commit, so a response rendered from pre-commit rows is never kept under
+    the new stamp.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+    _set_versions(user_ids)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _set_versions(user_ids))
+
+
+class CachedResponseMixin:
+    """
+    Conditional GET and per-user response caching for list/retrieve.
+
+    Responses carry an ETag and Last-Modified derived from the user's change
+    stamp; a client sending them back gets 304 Not Modified without touching
+    the database. Otherwise the serialized data is served from the cache for
+    as long as the stamp is unchanged (at most POSTS_RESPONSE_CACHE_TTL
+    seconds), so polling clients re-run neither the queryset nor the serializer.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(request, super().retrieve, *args, **kwargs)
+
+    def _cached_response(self, request, handler, *args, **kwargs):
+        stamp = get_version(request.user.pk)
+        # The rendered format is part of the representation
+        variant = f"{request.user.pk}:{stamp!r}:{request.accepted_renderer.format}:{request.get_full_path()}"
+        digest = hashlib.sha256(variant.encode()).hexdigest()
+        etag = quote_etag(digest[:32])
+        last_modified = int(stamp)
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        cache_key = f"posts:response:{digest}"
+        data = cache.get(cache_key)
+        if data is not None:
+            response = Response(data)
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(cache_key, response.data, getattr(settings, 'POSTS_RESPONSE_CACHE_TTL', 300))
+
+        if response.status_code == 200:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            # Always revalidate, the ETag makes that cheap
+            response['Cache-Control'] = 'private, no-cache'
+        return response
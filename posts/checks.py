@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# Caches that keep their data inside one process
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    """
+    Tasks running on Celery workers need a cache the web processes share:
+    rate limits, circuit breakers and response cache invalidation live there.
+    """
+    if getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', True):
+        return []
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        'The default cache is local to each process while tasks run on Celery workers.',
+        hint='Set REDIS_URL so rate limits, circuit breakers and cached responses are shared.',
+        id='posts.W001',
+    )]
@@ -0,0 +1,114 @@
+import csv
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+from .models import Post
+
+# Output column -> Post.values() lookup. Posts are LEFT JOINed to their links,
+# so there is one row per link, and one row with empty link columns for a post
+# without links.
+EXPORT_FIELDS = {
+    'post_id': 'id',
+    'content': 'content',
+    'media_url': 'media_url',
+    'post_status': 'status',
+    'scheduled_at': 'scheduled_at',
+    'next_attempt_at': 'next_attempt_at',
+    'published_at': 'published_at',
+    'created_at': 'created_at',
+    'link_id': 'platform_links__id',
+    'platform': 'platform_links__social_account__platform',
+    'social_account_id': 'platform_links__social_account_id',
+    'link_status': 'platform_links__status',
+    'platform_post_id': 'platform_links__platform_post_id',
+    'error_message': 'platform_links__error_message',
+    'retry_count': 'platform_links__retry_count',
+}
+
+
+def chunk_size():
+    return getattr(settings, 'POSTS_EXPORT_CHUNK_SIZE', 2000)
+
+
+def export_rows(user):
+    """
+    Every post of ``user`` with its platform link results, as flat dicts keyed by EXPORT_FIELDS.
+
+    Rows come from a single values() query read through a server-side cursor
+    where the database has one, ``chunk_size()`` rows at a time, so memory use
+    does not depend on the number of posts.
+    """
+    rows = (
+        Post.objects.filter(user=user)
+        .order_by('id', 'platform_links__id')
+        .values_list(*EXPORT_FIELDS.values())
+        .iterator(chunk_size=chunk_size())
+    )
+    columns = list(EXPORT_FIELDS)
+    for row in rows:
+        yield dict(zip(columns, row))
+
+
+def _batched(lines):
+    # One write per line makes a tiny chunk per row; send about a DB chunk at a time
+    batch, size = [], chunk_size()
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= size:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+class _Line:
+    """File-like target for csv.writer: write() returns the line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.DictWriter(_Line(), fieldnames=list(EXPORT_FIELDS))
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def stream_csv(rows):
+    return _batched(csv_lines(rows))
+
+
+def stream_ndjson(rows):
+    return _batched(ndjson_lines(rows))
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Lets clients ask for an export by its media type (``Accept: text/csv``).
+
+    The rows are streamed by the view itself; only error responses (e.g. 401)
+    go through the renderer, and those are written as JSON.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+class CSVExportRenderer(ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONExportRenderer(ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
@@ -0,0 +1,111 @@
+import os
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+# Defaults for the shared connection pools; override any of these (globally or
+# per host) through the SOCIAL_HTTP_POOL setting.
+DEFAULTS = {
+    'POOL_CONNECTIONS': 4,
+    'POOL_MAXSIZE': 16,
+    'POOL_BLOCK': False,
+    'TIMEOUT': 10,
+}
+
+
+def pool_config(host=None):
+    """Resolve the pool configuration for a host, falling back to the global defaults."""
+    conf = dict(DEFAULTS)
+    user_conf = getattr(settings, 'SOCIAL_HTTP_POOL', {})
+    conf.update({k: v for k, v in user_conf.items() if k != 'HOSTS'})
+    if host:
+        conf.update(user_conf.get('HOSTS', {}).get(host, {}))
+    return conf
+
+
+class SessionPool:
+    """
+    Process-wide registry of keep-alive ``requests`` sessions, one per remote host.
+
+    Every service instance in a worker process shares the same sessions, so
+    TCP+TLS connections to api.linkedin.com / graph.facebook.com are reused
+    across publishes instead of being re-established for every call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    def _build(self, host):
+        conf = pool_config(host)
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=conf['POOL_CONNECTIONS'],
+            pool_maxsize=conf['POOL_MAXSIZE'],
+            pool_block=conf['POOL_BLOCK'],
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['Connection'] = 'keep-alive'
+        return session
+
+    def get(self, url):
+        """Return the shared session for the host that ``url`` points at."""
+        host = urlsplit(url).netloc
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = self._sessions[host] = self._build(host)
+        return session
+
+    def timeout(self, url):
+        """Default request timeout for the host that ``url`` points at."""
+        return pool_config(urlsplit(url).netloc)['TIMEOUT']
+
+    def stats(self):
+        """
+        Per-host connection reuse counters, read from the underlying urllib3 pools.
+
+        ``requests`` is the number of HTTP requests sent and ``connections`` the
+        number of sockets that had to be opened; everything else was served from
+        an already open keep-alive connection.
+        """
+        result = {}
+        for host, session in list(self._sessions.items()):
+            counters = {'requests': 0, 'connections': 0}
+            for adapter in set(session.adapters.values()):
+                for key in adapter.poolmanager.pools.keys():
+                    pool = adapter.poolmanager.pools.get(key)
+                    if pool is None:
+                        continue
+                    counters['requests'] += pool.num_requests
+                    counters['connections'] += pool.num_connections
+            counters['reused'] = max(counters['requests'] - counters['connections'], 0)
+            result[host] = counters
+        return result
+
+    def reset(self):
+        """Close and drop every session (e.g. between tests or on worker shutdown)."""
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
+
+    def _discard(self):
+        # After fork the child must not close the inherited sockets either:
+        # that would send TLS close_notify on connections the parent still owns.
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+
+session_pool = SessionPool()
+
+if hasattr(os, 'register_at_fork'):
+    # Celery's prefork pool forks after import; sockets must not be shared
+    # between the parent and its children.
+    os.register_at_fork(after_in_child=session_pool._discard)
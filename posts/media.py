@@ -0,0 +1,129 @@
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .http import session_pool
+
+
+class MediaStore:
+    """
+    Content-addressed local cache of post media, shared by every worker on a host.
+
+    ``local_path(media_url)`` streams a remote asset to disk once and returns
+    the cached file, stored as ``<sha256 of the bytes><suffix>``; the
+    url -> digest index lives in Django's cache. Posts targeting several
+    platforms or reusing the same asset therefore download it a single time,
+    and identical bytes behind different URLs are stored once. The directory
+    is kept under MEDIA_CACHE_MAX_BYTES by evicting the least recently used
+    files (by mtime, refreshed on every hit).
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, root=None, max_bytes=None):
+        self._root = root
+        self._max_bytes = max_bytes
+        # Striped locks: threads publishing the same asset wait for one download
+        self._locks = [threading.Lock() for _ in range(64)]
+
+    @property
+    def root(self):
+        root = Path(self._root or getattr(settings, 'MEDIA_CACHE_DIR', Path(tempfile.gettempdir()) / 'social-media-cache'))
+        root.mkdir(parents=True, exist_ok=True)
+        return root
+
+    @property
+    def max_bytes(self):
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return getattr(settings, 'MEDIA_CACHE_MAX_BYTES', 5 * 1024 ** 3)
+
+    def _index_key(self, media_url):
+        return f"media:url:{hashlib.sha256(media_url.encode()).hexdigest()}"
+
+    def _url_lock(self, media_url):
+        return self._locks[hash(media_url) % len(self._locks)]
+
+    def local_path(self, media_url):
+        """
+        Local file holding the bytes of ``media_url``.
+
+        Anything that is not an http(s) URL is taken to be a local path already
+        and returned unchanged.
+        """
+        if urlsplit(media_url).scheme not in ('http', 'https'):
+            return media_url
+
+        with self._url_lock(media_url):
+            name = cache.get(self._index_key(media_url))
+            if name:
+                path = self.root / name
+                try:
+                    os.utime(path)
+                    return str(path)
+                except FileNotFoundError:
+                    pass  # evicted
+
+            path = self._download(media_url)
+            cache.set(self._index_key(media_url), path.name, getattr(settings, 'MEDIA_CACHE_URL_TTL', 86400))
+        self._evict(keep=path)
+        return str(path)
+
+    def _download(self, media_url):
+        suffix = Path(urlsplit(media_url).path).suffix[:10]
+        digest = hashlib.sha256()
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix='.download-')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                response = session_pool.get(media_url).get(
+                    media_url, stream=True, timeout=session_pool.timeout(media_url)
+                )
+                with response:
+                    response.raise_for_status()
+                    for chunk in response.iter_content(self.CHUNK_SIZE):
+                        digest.update(chunk)
+                        out.write(chunk)
+            path = self.root / f"{digest.hexdigest()}{suffix}"
+            # Atomic, and harmless if another worker stored the same bytes meanwhile
+            os.replace(tmp, path)
+            return path
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _evict(self, keep=None):
+        """Drop least recently used files until the store fits in max_bytes."""
+        files = []
+        for entry in os.scandir(self.root):
+            if entry.is_file() and not entry.name.startswith('.download-'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == str(keep):
+                continue
+            try:
+                # Uploads that already opened the file keep reading it
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for entry in os.scandir(self.root):
+            if entry.is_file():
+                os.remove(entry.path)
+
+
+media_store = MediaStore()
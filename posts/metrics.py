@@ -0,0 +1,112 @@
+import os
+import time
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:  # metrics are optional: without prometheus_client every hook is a no-op
+    prometheus_client = None
+
+
+class _NoopMetric:
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+
+def _metric(kind, name, documentation, labelnames, **kwargs):
+    if prometheus_client is None:
+        return _NoopMetric()
+    return getattr(prometheus_client, kind)(name, documentation, labelnames, **kwargs)
+
+
+REQUEST_SECONDS = _metric(
+    'Histogram', 'social_request_duration_seconds', 'Latency of platform API requests.', ['platform', 'method'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+REQUEST_ERRORS = _metric(
+    'Counter', 'social_request_errors_total', 'Failed platform API requests by HTTP status or exception.',
+    ['platform', 'reason'],
+)
+RATE_LIMITED = _metric(
+    'Counter', 'social_rate_limited_total', 'Platform API requests answered with 429.', ['platform'],
+)
+PUBLISH_RESULTS = _metric(
+    'Counter', 'social_publish_results_total', 'Outcome of platform link publishes.', ['platform', 'status'],
+)
+QUEUE_WAIT_SECONDS = _metric(
+    'Histogram', 'celery_task_queue_wait_seconds', 'Time between enqueueing a task and a worker starting it.',
+    ['task'], buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900),
+)
+TASK_PHASE_SECONDS = _metric(
+    'Histogram', 'task_phase_duration_seconds', 'Time spent per phase of a task.', ['task', 'phase'],
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+
+# Message header set by before_task_publish, read back when the task starts
+ENQUEUED_AT_HEADER = 'enqueued_at'
+
+
+def observe_request(platform, method, seconds, status=None, error=None):
+    """
+    Record one platform API call: its latency, and a REQUEST_ERRORS sample
+    labelled with the HTTP status (>= 400) or exception name when it failed.
+    """
+    platform = platform or 'unknown'
+    REQUEST_SECONDS.labels(platform, method.upper()).observe(seconds)
+    if status == 429:
+        RATE_LIMITED.labels(platform).inc()
+    if error is not None:
+        REQUEST_ERRORS.labels(platform, type(error).__name__).inc()
+    elif status is not None and status >= 400:
+        REQUEST_ERRORS.labels(platform, str(status)).inc()
+
+
+def record_publish(platform, status):
+    PUBLISH_RESULTS.labels(platform, status).inc()
+
+
+def observe_queue_wait(task_name, enqueued_at, now=None):
+    if enqueued_at is None:
+        return  # run eagerly or published without the header
+    QUEUE_WAIT_SECONDS.labels(task_name).observe(max(0.0, (now or time.time()) - float(enqueued_at)))
+
+
+class PhaseTimer:
+    """
+    Times consecutive phases of a task: ``mark(phase)`` records the time since
+    the previous mark (or since the timer was created) under ``phase``.
+    """
+
+    def __init__(self, task_name, clock=time.perf_counter):
+        self.task_name = task_name
+        self.clock = clock
+        self._last = clock()
+
+    def mark(self, phase):
+        now = self.clock()
+        TASK_PHASE_SECONDS.labels(self.task_name, phase).observe(now - self._last)
+        self._last = now
+
+
+def render():
+    """
+    ``(body, content_type)`` of the Prometheus text exposition.
+
+    With PROMETHEUS_MULTIPROC_DIR set, every process (web workers and Celery
+    worker children) writes its samples to files in that directory and they
+    are aggregated here; otherwise only this process's samples are exported.
+    """
+    if prometheus_client is None:
+        return b'', 'text/plain; version=0.0.4; charset=utf-8'
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-18 09:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postplatformlink',
+            name='upload_offset',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='postplatformlink',
+            name='upload_session_uri',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_post_scheduler_sweep'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postplatformlink',
+            name='container_id',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='postplatformlink',
+            name='container_state',
+            field=models.CharField(blank=True, choices=[('container_created', 'Container created'), ('ready', 'Ready'), ('published', 'Published'), ('error', 'Error')], max_length=20, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='postplatformlink',
+            index=models.Index(condition=models.Q(('container_state__in', ['container_created', 'ready'])), fields=['container_state'], name='link_pending_container_idx'),
+        ),
+    ]
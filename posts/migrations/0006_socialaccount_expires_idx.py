@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_postplatformlink_container_state'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='socialaccount',
+            index=models.Index(fields=['expires_at'], name='account_expires_idx'),
+        ),
+    ]
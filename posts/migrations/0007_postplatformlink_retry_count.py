@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_socialaccount_expires_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postplatformlink',
+            name='retry_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_post_next_attempt_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postplatformlink',
+            name='container_failures',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
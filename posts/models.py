@@ -19,6 +19,12 @@ class SocialAccount(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Backs the token refresher's "expiring soon" range query
+            models.Index(fields=['expires_at'], name='account_expires_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.platform}"
 
@@ -26,6 +32,7 @@ class Post(models.Model):
     STATUS_CHOICES = (
         ('draft', 'Draft'),
         ('scheduled', 'Scheduled'),
+        ('publishing', 'Publishing'),
         ('published', 'Published'),
         ('failed', 'Failed'),
     )
@@ -34,10 +41,22 @@ class Post(models.Model):
     media_url = models.URLField(max_length=500, null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     scheduled_at = models.DateTimeField(null=True, blank=True)
+    # When publish_post_task deferred some links (throttling, transient errors),
+    # the time the sweep should try again; scheduled_at stays what the user chose
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
     published_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Backs the per-user, newest-first cursor pagination of the post list
+            models.Index(fields=['user', '-created_at', '-id'], name='post_user_created_idx'),
+            # Back the scheduler sweep's "due scheduled posts" and "due retries" range queries
+            models.Index(fields=['status', 'scheduled_at'], name='post_status_scheduled_idx'),
+            models.Index(fields=['status', 'next_attempt_at'], name='post_status_next_attempt_idx'),
+        ]
+
     def __str__(self):
         return f"Post by {self.user.username} - {self.status}"
 
@@ -47,6 +66,32 @@ class PostPlatformLink(models.Model):
     platform_post_id = models.CharField(max_length=255, null=True, blank=True)
     status = models.CharField(max_length=20, choices=Post.STATUS_CHOICES, default='draft')
     error_message = models.TextField(null=True, blank=True)
+    # Resumable upload checkpoint (YouTube): session URI and bytes the server has committed
+    upload_session_uri = models.TextField(null=True, blank=True)
+    upload_offset = models.BigIntegerField(default=0)
+    # Instagram media container lifecycle: container_created -> ready -> published
+    CONTAINER_STATES = (
+        ('container_created', 'Container created'),
+        ('ready', 'Ready'),
+        ('published', 'Published'),
+        ('error', 'Error'),
+    )
+    container_id = models.CharField(max_length=255, null=True, blank=True)
+    container_state = models.CharField(max_length=20, choices=CONTAINER_STATES, null=True, blank=True)
+    # Container polls that could not read or publish the container (bad token, deleted account)
+    container_failures = models.PositiveSmallIntegerField(default=0)
+    # Publish attempts that ended in a transient error (throttling, timeouts, outages)
+    retry_count = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Only in-flight containers are ever polled
+            models.Index(
+                fields=['container_state'],
+                condition=models.Q(container_state__in=['container_created', 'ready']),
+                name='link_pending_container_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.post.id} linked to {self.social_account.platform}"
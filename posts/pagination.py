@@ -0,0 +1,17 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PostCursorPagination(CursorPagination):
+    """
+    Cursor pagination on created_at, newest first.
+
+    DRF's cursor keeps the created_at of the page boundary plus an offset
+    that only counts posts sharing that exact timestamp; id just makes the
+    order of such ties stable. Each page is a range scan on the (user,
+    created_at, id) index, so its cost does not grow with the size of the
+    user's history.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
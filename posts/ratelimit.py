@@ -0,0 +1,88 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class RateLimiter:
+    """
+    Token bucket per (platform, account) whose state lives in Django's cache.
+
+    With a shared cache backend (REDIS_URL) every worker process sees the
+    same buckets, so a burst of due posts is spread out across the whole fleet
+    instead of each worker spending the platform's quota on its own. Buckets
+    are configured per platform in SOCIAL_RATE_LIMITS as
+    ``{'RATE': tokens per second, 'BURST': capacity}``; platforms without an
+    entry are not limited.
+
+    The local-memory cache used without REDIS_URL keeps a bucket per process,
+    which is only right when everything runs in one process (development and
+    tests). Updates are serialised with a short ``cache.add`` lock since the
+    cache API has no compare-and-swap.
+    """
+
+    LOCK_TIMEOUT = 5
+    LOCK_ATTEMPTS = 50
+
+    def __init__(self, cache_alias='default', clock=time.time, sleep=time.sleep):
+        self.cache_alias = cache_alias
+        self.clock = clock
+        self.sleep = sleep
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def limits(self, platform):
+        conf = getattr(settings, 'SOCIAL_RATE_LIMITS', {}).get(platform)
+        if not conf:
+            return None
+        return float(conf['RATE']), float(conf.get('BURST', 1))
+
+    def _key(self, platform, account_id):
+        return f"ratelimit:{platform}:{account_id}"
+
+    def _lock(self, key):
+        for _ in range(self.LOCK_ATTEMPTS):
+            if self.cache.add(f"{key}:lock", 1, self.LOCK_TIMEOUT):
+                return True
+            self.sleep(0.01)
+        # Fail open rather than stall publishing if a lock holder died.
+        return False
+
+    def _unlock(self, key):
+        self.cache.delete(f"{key}:lock")
+
+    def reserve(self, platform, account_id, max_wait=0):
+        """
+        Reserve one token for a call to ``platform`` on behalf of ``account_id``.
+
+        Returns ``(granted, delay)``. When granted the caller must wait ``delay``
+        seconds (0 if a token was available) before making the call. When the
+        wait would exceed ``max_wait`` nothing is reserved and ``delay`` tells the
+        caller how long to defer the call.
+        """
+        limits = self.limits(platform)
+        if limits is None:
+            return True, 0.0
+        rate, burst = limits
+
+        key = self._key(platform, account_id)
+        locked = self._lock(key)
+        try:
+            now = self.clock()
+            tokens, updated = self.cache.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            # A negative balance means tokens already promised to waiting callers.
+            delay = max(0.0, (1 - tokens) / rate)
+            if delay > max_wait:
+                return False, delay
+            # Keep idle buckets around just long enough to refill completely.
+            self.cache.set(key, (tokens - 1, now), int((burst - tokens + 1) / rate) + 60)
+            return True, delay
+        finally:
+            if locked:
+                self._unlock(key)
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,136 @@
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import parse_http_date_safe
+
+# Responses worth trying again later: throttled or the platform is having trouble
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+# Retryable even for non-idempotent calls: the platform did not act on the request
+REJECTED_STATUS = (429, 503)
+
+
+class TransientError(Exception):
+    """
+    A platform call failed in a way that is expected to go away (throttling,
+    timeouts, 5xx, open circuit). ``retry_after`` is the delay in seconds the
+    platform asked for, if any.
+    """
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(TransientError):
+    pass
+
+
+def timeouts(platform, default):
+    """(connect, read) timeout for ``platform`` from SOCIAL_PLATFORM_TIMEOUTS, else ``default`` for both."""
+    conf = getattr(settings, 'SOCIAL_PLATFORM_TIMEOUTS', {}).get(platform)
+    if not conf:
+        return (default, default)
+    return (conf.get('CONNECT', default), conf.get('READ', default))
+
+
+def retry_config():
+    conf = {'ATTEMPTS': 3, 'BACKOFF': 0.5, 'MAX_BACKOFF': 600, 'MAX_INLINE_WAIT': 2}
+    conf.update(getattr(settings, 'SOCIAL_RETRY', {}))
+    return conf
+
+
+def backoff(attempt, retry_after=None):
+    """
+    Delay before retry number ``attempt`` (0-based): exponential with jitter,
+    capped at MAX_BACKOFF, and never shorter than the platform's Retry-After.
+    """
+    conf = retry_config()
+    delay = min(conf['MAX_BACKOFF'], conf['BACKOFF'] * 2 ** attempt)
+    # Equal jitter keeps retries of many workers from arriving in lockstep
+    delay = delay / 2 + random.uniform(0, delay / 2)
+    return max(delay, retry_after or 0)
+
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    timestamp = parse_http_date_safe(value)
+    if timestamp is None:
+        return None
+    return max(0.0, timestamp - (now or time.time()))
+
+
+class CircuitBreaker:
+    """
+    Per-platform circuit breaker whose state lives in Django's cache (shared
+    by all processes once REDIS_URL is set).
+
+    After FAILURES failed calls to a platform within WINDOW seconds the
+    circuit opens for COOLDOWN seconds, during which every worker fails calls
+    to that platform immediately instead of tying up a slot on a dead
+    connection. When the cooldown ends calls go through again; one more
+    failure reopens the circuit, a success closes it. Configured with
+    SOCIAL_CIRCUIT_BREAKER (per platform overrides under the platform name).
+    """
+
+    def __init__(self, cache_alias='default', clock=time.time):
+        self.cache_alias = cache_alias
+        self.clock = clock
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def config(self, platform):
+        conf = {'FAILURES': 5, 'WINDOW': 60, 'COOLDOWN': 30}
+        user_conf = getattr(settings, 'SOCIAL_CIRCUIT_BREAKER', {})
+        conf.update({k: v for k, v in user_conf.items() if k.isupper() and not isinstance(v, dict)})
+        conf.update(user_conf.get(platform, {}))
+        return conf
+
+    def _key(self, platform, part):
+        return f"circuit:{platform}:{part}"
+
+    def retry_after(self, platform):
+        """Seconds until calls to ``platform`` are allowed again (0 when the circuit is closed)."""
+        if not platform:
+            return 0
+        open_until = self.cache.get(self._key(platform, 'open'))
+        if open_until is None:
+            return 0
+        return max(0.0, open_until - self.clock())
+
+    def check(self, platform):
+        remaining = self.retry_after(platform)
+        if remaining:
+            raise CircuitOpenError(f"{platform} circuit open, retry in {remaining:.0f}s", retry_after=remaining)
+
+    def record_success(self, platform):
+        if platform:
+            self.cache.delete(self._key(platform, 'failures'))
+
+    def record_failure(self, platform):
+        if not platform:
+            return
+        conf = self.config(platform)
+        key = self._key(platform, 'failures')
+        self.cache.add(key, 0, conf['WINDOW'])
+        try:
+            failures = self.cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr()
+            self.cache.set(key, 1, conf['WINDOW'])
+            failures = 1
+        if failures >= conf['FAILURES']:
+            self.cache.set(self._key(platform, 'open'), self.clock() + conf['COOLDOWN'], conf['COOLDOWN'])
+            # Half-open: the first failure after the cooldown reopens the circuit
+            self.cache.set(key, conf['FAILURES'] - 1, conf['COOLDOWN'] + conf['WINDOW'])
+
+
+circuit_breaker = CircuitBreaker()
@@ -0,0 +1,27 @@
+# Tasks that only talk to one platform
+PLATFORM_TASKS = {
+    'posts.tasks.poll_instagram_containers': 'instagram',
+}
+# Tasks that publish posts across platforms
+PUBLISH_TASKS = ('posts.tasks.publish_post_task',)
+
+
+def route_task(name, args, kwargs, options, task=None, **kw):
+    """
+    Celery router (CELERY_TASK_ROUTES).
+
+    Tasks sent with the ``platform`` keyword argument of a supported platform,
+    and tasks bound to one platform, go to the queue named after the
+    platform, so a slow or throttled platform only backs up its own queue and
+    workers can be sized per platform. Post fan-out goes to 'publish';
+    everything else to CELERY_TASK_DEFAULT_QUEUE (no worker consumes a queue
+    named after a platform without a service).
+    """
+    from .services import SocialMediaManager
+
+    platform = (kwargs or {}).get('platform') or PLATFORM_TASKS.get(name)
+    if platform in SocialMediaManager.SERVICES:
+        return {'queue': platform}
+    if name in PUBLISH_TASKS:
+        return {'queue': 'publish'}
+    return None
@@ -18,4 +18,23 @@ class PostSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
         fields = '__all__'
-        read_only_fields = ('user', 'status', 'published_at')
+        read_only_fields = ('user', 'status', 'published_at', 'next_attempt_at')
+
+class BulkPostSerializer(serializers.Serializer):
+    """One entry of a bulk create: a post and the social accounts it goes to."""
+    content = serializers.CharField()
+    media_url = serializers.URLField(max_length=500, required=False, allow_null=True)
+    scheduled_at = serializers.DateTimeField(required=False, allow_null=True)
+    social_accounts = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate_social_accounts(self, value):
+        # The view puts the ids of the requesting user's accounts in the context,
+        # so a batch of any size is checked with a single query.
+        unknown = set(value) - self.context['account_ids']
+        if unknown:
+            raise serializers.ValidationError(f"Unknown social accounts: {sorted(unknown)}")
+        return list(dict.fromkeys(value))
+
+class BulkScheduleSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    scheduled_at = serializers.DateTimeField()
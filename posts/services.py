@@ -1,17 +1,153 @@
-import requests
+import hashlib
+import json
 import logging
+import time
+from urllib.parse import quote, urlencode
+import requests
 from django.conf import settings
+from django.core.cache import cache
+from . import metrics
+from .http import session_pool
+from .media import media_store
+from .resilience import (
+    REJECTED_STATUS, RETRYABLE_STATUS, TransientError, backoff, circuit_breaker, parse_retry_after, retry_config, timeouts
+)
+from .youtube import youtube_clients, resumable_upload, upload_chunk_size
 
 logger = logging.getLogger(__name__)
 
 class BaseSocialService:
-    def __init__(self, access_token=None):
+    # Most ids fetch_metrics() accepts in one call
+    METRICS_BATCH_SIZE = 50
+    # Key of the app credentials in SOCIALACCOUNT_PROVIDERS
+    OAUTH_PROVIDER = None
+    # Platform name for timeouts and the circuit breaker
+    PLATFORM = None
+
+    def __init__(self, access_token=None, account=None, link=None):
         self.access_token = access_token
+        # Optional SocialAccount the token belongs to, used to persist what we learn about it
+        self.account = account
+        # Optional PostPlatformLink being published, used to checkpoint long uploads
+        self.link = link
+
+    def _token_cache_key(self, name):
+        digest = hashlib.sha256((self.access_token or '').encode()).hexdigest()
+        return f"social:{name}:{digest}"
+
+    def _request(self, method, url, **kwargs):
+        """
+        Send a request through the shared keep-alive session for the target host.
+
+        Calls fail fast with CircuitOpenError while the platform's circuit is
+        open. Throttled, failing and timed-out calls are retried with backoff
+        (honouring Retry-After) when repeating them is safe, i.e. reads, and
+        writes the platform rejected without acting on them. If that does not
+        succeed within SOCIAL_RETRY's inline budget TransientError is raised,
+        so the caller can retry later without holding a worker.
+        """
+        session = session_pool.get(url)
+        kwargs.setdefault('timeout', timeouts(self.PLATFORM, session_pool.timeout(url)))
+        conf = retry_config()
+        for attempt in range(conf['ATTEMPTS']):
+            circuit_breaker.check(self.PLATFORM)
+            response, retry_after = None, None
+            started = time.perf_counter()
+            try:
+                response = getattr(session, method)(url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                metrics.observe_request(self.PLATFORM, method, time.perf_counter() - started, error=e)
+                circuit_breaker.record_failure(self.PLATFORM)
+                # Nothing reached the platform if the connection was never made
+                retryable = method == 'get' or isinstance(e, requests.exceptions.ConnectTimeout)
+                error = e
+            else:
+                metrics.observe_request(self.PLATFORM, method, time.perf_counter() - started, response.status_code)
+                if response.status_code not in RETRYABLE_STATUS:
+                    circuit_breaker.record_success(self.PLATFORM)
+                    return response
+                if response.status_code != 429:
+                    circuit_breaker.record_failure(self.PLATFORM)
+                retryable = method == 'get' or response.status_code in REJECTED_STATUS
+                error = f"HTTP {response.status_code}: {response.text}"
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+
+            if not retryable:
+                # The platform may have acted on it: report, never repeat
+                if response is not None:
+                    return response
+                raise error
+            delay = backoff(attempt, retry_after)
+            if attempt + 1 == conf['ATTEMPTS'] or delay > conf['MAX_INLINE_WAIT']:
+                raise TransientError(f"{self.PLATFORM or url}: {error}", retry_after=retry_after)
+            time.sleep(delay)
+
+    def _get(self, url, **kwargs):
+        return self._request('get', url, **kwargs)
+
+    def _post(self, url, **kwargs):
+        return self._request('post', url, **kwargs)
 
     def authenticate(self):
         """Logic to handle initial authentication or token validation."""
         raise NotImplementedError
 
+    def is_authenticated(self):
+        """authenticate(), with the result cached per token for SOCIAL_AUTH_CACHE_TTL seconds."""
+        valid = cache.get(self._token_cache_key('auth'))
+        if valid is None:
+            valid = bool(self.authenticate())
+            self.remember_authentication(valid)
+        return valid
+
+    def remember_authentication(self, valid):
+        cache.set(self._token_cache_key('auth'), valid, getattr(settings, 'SOCIAL_AUTH_CACHE_TTL', 900))
+
+    def cached_authentication(self):
+        """The cached is_authenticated() verdict for the token, or None when there is none; never calls out."""
+        return cache.get(self._token_cache_key('auth'))
+
+    def oauth_app(self):
+        return getattr(settings, 'SOCIALACCOUNT_PROVIDERS', {}).get(self.OAUTH_PROVIDER, {}).get('APP', {})
+
+    def refresh_access_token(self, refresh_token):
+        """
+        Exchange the account's credentials for a fresh access token.
+
+        Returns ``{"access_token": ..., "expires_in": seconds or None,
+        "refresh_token": new refresh token or None}``, or None if the platform
+        refused the refresh.
+        """
+        raise NotImplementedError
+
+    def parse_token(self, data):
+        if not (data or {}).get("access_token"):
+            return None
+        return {
+            "access_token": data["access_token"],
+            "expires_in": data.get("expires_in"),
+            "refresh_token": data.get("refresh_token"),
+        }
+
+    def refresh_grant_data(self, refresh_token):
+        # Standard OAuth 2.0 refresh_token grant
+        app = self.oauth_app()
+        return {
+            "grant_type": "refresh_token",
+            "refresh_token": refresh_token,
+            "client_id": app.get('client_id'),
+            "client_secret": app.get('secret'),
+        }
+
+    def _refresh_grant(self, token_url, refresh_token):
+        if not refresh_token:
+            return None
+        response = self._post(token_url, data=self.refresh_grant_data(refresh_token))
+        if response.status_code != 200:
+            logger.error(f"Token refresh error: {response.text}")
+            return None
+        return self.parse_token(response.json())
+
     def publish_post(self, content, media_url=None):
         """Logic to publish content to the platform."""
         raise NotImplementedError
@@ -20,43 +156,139 @@ class BaseSocialService:
         """Logic to fetch basic analytics like likes or shares."""
         raise NotImplementedError
 
+    def fetch_metrics(self, platform_post_ids):
+        """
+        Engagement counters for up to METRICS_BATCH_SIZE published posts in one call.
+
+        Returns ``{platform_post_id: {metric: value}}`` using the metric names of
+        analytics.MetricSnapshot; posts the platform did not report are left out.
+        """
+        raise NotImplementedError
+
 class LinkedInService(BaseSocialService):
+    PLATFORM = 'linkedin'
+    OAUTH_PROVIDER = 'linkedin_oauth2'
+    TOKEN_URL = "https://www.linkedin.com/oauth/v2/accessToken"
+
+    def __init__(self, access_token=None, account=None, link=None):
+        super().__init__(access_token, account, link)
+        self.base_url = getattr(settings, 'LINKEDIN_API_URL', "https://api.linkedin.com/v2")
+
+    # How long concurrent callers wait for another one's /me lookup of the same token
+    MEMBER_LOOKUP_TIMEOUT = 5
+
+    def get_member_id(self):
+        """
+        Return the member id behind the access token.
+
+        The id never changes for a token, so it is cached (keyed by a hash of the
+        token) for SOCIAL_IDENTITY_CACHE_TTL seconds and written through to
+        SocialAccount.platform_user_id. On a cache miss the stored id is used
+        when there is one, so publishes only need the ugcPosts call even on a
+        cold worker; otherwise /me is asked (see lookup_member_id()).
+        """
+        cache_key = self._token_cache_key('linkedin-member')
+        member_id = cache.get(cache_key)
+        if member_id:
+            return member_id
+        if self.account is not None and self.account.platform_user_id:
+            if self.cached_authentication() is False:
+                return None
+            cache.set(cache_key, self.account.platform_user_id, getattr(settings, 'SOCIAL_IDENTITY_CACHE_TTL', 3600))
+            return self.account.platform_user_id
+        return self.lookup_member_id()
+
+    def lookup_member_id(self):
+        """
+        Ask /me for the member id behind the access token, unless it is cached.
+
+        Only one caller per token asks /me at a time: concurrent callers wait
+        for its answer, and a token /me rejected is not asked about again while
+        the cached verdict lasts.
+        """
+        cache_key = self._token_cache_key('linkedin-member')
+        lock_key = f"{cache_key}:lock"
+        deadline = time.monotonic() + self.MEMBER_LOOKUP_TIMEOUT
+        while True:
+            member_id = cache.get(cache_key)
+            if member_id:
+                return member_id
+            if self.cached_authentication() is False:
+                return None
+            if cache.add(lock_key, 1, self.MEMBER_LOOKUP_TIMEOUT):
+                break
+            if time.monotonic() >= deadline:
+                # The lookup holding the lock is stuck; don't stall the publish on it
+                return self._fetch_member_id(cache_key)
+            time.sleep(0.05)
+        try:
+            return self._fetch_member_id(cache_key)
+        finally:
+            cache.delete(lock_key)
+
+    def _fetch_member_id(self, cache_key):
+        headers = {"Authorization": f"Bearer {self.access_token}"}
+        response = self._get(f"{self.base_url}/me", headers=headers)
+        if response.status_code == 401:
+            self.remember_authentication(False)
+        if response.status_code != 200:
+            return None
+        member_id = response.json().get("id")
+        if not member_id:
+            return None
+
+        cache.set(cache_key, member_id, getattr(settings, 'SOCIAL_IDENTITY_CACHE_TTL', 3600))
+        self.remember_authentication(True)
+        if self.account is not None and self.account.platform_user_id != member_id:
+            from .models import SocialAccount
+            from .caching import bump_version
+            SocialAccount.objects.filter(pk=self.account.pk).update(platform_user_id=member_id)
+            bump_version(self.account.user_id)
+            self.account.platform_user_id = member_id
+        return member_id
+
     def authenticate(self):
         # Basic validation: check if token can fetch profile
-        headers = {"Authorization": f"Bearer {self.access_token}"}
-        response = requests.get("https://api.linkedin.com/v2/me", headers=headers)
-        return response.status_code == 200
+        return self.lookup_member_id() is not None
+
+    def refresh_access_token(self, refresh_token):
+        return self._refresh_grant(self.TOKEN_URL, refresh_token)
+
+    def share_headers(self):
+        return {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json",
+            "X-Restli-Protocol-Version": "2.0.0",
+        }
+
+    def share_payload(self, member_id, content):
+        """ugcPosts body for a public text share authored by ``member_id``."""
+        return {
+            "author": f"urn:li:person:{member_id}",
+            "lifecycleState": "PUBLISHED",
+            "specificContent": {
+                "com.linkedin.ugc.ShareContent": {
+                    "shareCommentary": {"text": content},
+                    "shareMediaCategory": "NONE"
+                }
+            },
+            "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
+        }
 
     def publish_post(self, content, media_url=None):
         try:
-            headers = {
-                "Authorization": f"Bearer {self.access_token}",
-                "Content-Type": "application/json",
-                "X-Restli-Protocol-Version": "2.0.0",
-            }
-            # Get user URN
-            user_info = requests.get("https://api.linkedin.com/v2/me", headers=headers).json()
-            user_urn = user_info.get("id")
-            
+            # Get user URN (cached per token)
+            user_urn = self.get_member_id()
+
             if not user_urn:
                  return {"status": "failed", "error": "Could not retrieve LinkedIn URN"}
 
-            post_data = {
-                "author": f"urn:li:person:{user_urn}",
-                "lifecycleState": "PUBLISHED",
-                "specificContent": {
-                    "com.linkedin.ugc.ShareContent": {
-                        "shareCommentary": {"text": content},
-                        "shareMediaCategory": "NONE"
-                    }
-                },
-                "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
-            }
-            
-            response = requests.post("https://api.linkedin.com/v2/ugcPosts", headers=headers, json=post_data)
+            response = self._post(f"{self.base_url}/ugcPosts", headers=self.share_headers(), json=self.share_payload(user_urn, content))
             if response.status_code == 201:
                 return {"status": "success", "platform_post_id": response.json().get('id')}
             return {"status": "failed", "error": response.text}
+        except TransientError:
+            raise
         except Exception as e:
             logger.error(f"LinkedIn error: {str(e)}")
             return {"status": "failed", "error": str(e)}
@@ -65,17 +297,47 @@ class LinkedInService(BaseSocialService):
         # Placeholder for LinkedIn analytics API
         return {"likes": 0, "shares": 0, "comments": 0}
 
+    def metrics_request(self, platform_post_ids):
+        """``(url, headers)`` of the socialActions read behind fetch_metrics()."""
+        headers = {
+            "Authorization": f"Bearer {self.access_token}",
+            "X-Restli-Protocol-Version": "2.0.0",
+        }
+        # Rest.li batch get: /socialActions?ids=List(urn1,urn2,...)
+        urns = ",".join(quote(urn, safe="") for urn in platform_post_ids)
+        return f"{self.base_url}/socialActions?ids=List({urns})", headers
+
+    def parse_metrics(self, data):
+        return {
+            urn: {
+                "likes": result.get("likesSummary", {}).get("totalLikes", 0),
+                "comments": result.get("commentsSummary", {}).get("aggregatedTotalComments", 0),
+            }
+            for urn, result in data.get("results", {}).items()
+        }
+
+    def fetch_metrics(self, platform_post_ids):
+        url, headers = self.metrics_request(platform_post_ids)
+        response = self._get(url, headers=headers)
+        if response.status_code != 200:
+            logger.error(f"LinkedIn metrics error: {response.text}")
+            return {}
+        return self.parse_metrics(response.json())
+
 class FacebookService(BaseSocialService):
-    def __init__(self, access_token=None):
-        super().__init__(access_token)
+    PLATFORM = 'facebook'
+    OAUTH_PROVIDER = 'facebook'
+
+    def __init__(self, access_token=None, account=None, link=None):
+        super().__init__(access_token, account, link)
         # Usually requires a Page Access Token for business posting
         self.page_access_token = getattr(settings, 'FACEBOOK_PAGE_ACCESS_TOKEN', None) or access_token
-        self.base_url = "https://graph.facebook.com/v19.0"
+        self.base_url = getattr(settings, 'GRAPH_API_URL', "https://graph.facebook.com/v19.0")
 
     def authenticate(self):
         if not self.page_access_token:
             return False
-        response = requests.get(f"{self.base_url}/me?access_token={self.page_access_token}")
+        response = self._get(f"{self.base_url}/me", params={"access_token": self.page_access_token})
         return response.status_code == 200
 
     def publish_post(self, content, media_url=None):
@@ -88,10 +350,12 @@ class FacebookService(BaseSocialService):
                 params["link"] = media_url
             
             # Post to page feed
-            response = requests.post(f"{self.base_url}/me/feed", params=params)
+            response = self._post(f"{self.base_url}/me/feed", params=params)
             if response.status_code == 200:
                 return {"status": "success", "platform_post_id": response.json().get('id')}
             return {"status": "failed", "error": response.text}
+        except TransientError:
+            raise
         except Exception as e:
             logger.error(f"Facebook error: {str(e)}")
             return {"status": "failed", "error": str(e)}
@@ -99,11 +363,67 @@ class FacebookService(BaseSocialService):
     def fetch_analytics(self):
         return {"reactions": 0, "comments": 0, "shares": 0}
 
+    def refresh_operation(self):
+        """Graph batch operation exchanging the user token for a new long-lived one."""
+        app = self.oauth_app()
+        params = {
+            "grant_type": "fb_exchange_token",
+            "client_id": app.get('client_id'),
+            "client_secret": app.get('secret'),
+            "fb_exchange_token": self.access_token,
+        }
+        return ("GET", "oauth/access_token", self.access_token, params)
+
+    def refresh_access_token(self, refresh_token=None):
+        # Facebook has no refresh tokens: a still valid token is exchanged instead
+        _, relative_url, token, params = self.refresh_operation()
+        response = self._get(f"{self.base_url}/{relative_url}", params=params)
+        if response.status_code != 200:
+            logger.error(f"Token refresh error: {response.text}")
+            return None
+        return self.parse_token(response.json())
+
+    def feed_operation(self, content, media_url=None):
+        """Graph batch operation that publishes ``content`` to the page feed."""
+        params = {"message": content}
+        if media_url:
+            params["link"] = media_url
+        return ("POST", "me/feed", self.page_access_token, params)
+
+    def metrics_operation(self, platform_post_ids):
+        # Graph API multi-id read: /?ids=a,b,c returns one object per id
+        params = {
+            "ids": ",".join(platform_post_ids),
+            "fields": "reactions.summary(total_count).limit(0),comments.summary(total_count).limit(0),shares",
+        }
+        return ("GET", "", self.page_access_token, params)
+
+    def parse_metrics(self, data):
+        return {
+            post_id: {
+                "likes": item.get("reactions", {}).get("summary", {}).get("total_count", 0),
+                "comments": item.get("comments", {}).get("summary", {}).get("total_count", 0),
+                "shares": item.get("shares", {}).get("count", 0),
+            }
+            for post_id, item in data.items()
+        }
+
+    def fetch_metrics(self, platform_post_ids):
+        _, _, token, params = self.metrics_operation(platform_post_ids)
+        response = self._get(f"{self.base_url}/", params=dict(params, access_token=token))
+        if response.status_code != 200:
+            logger.error(f"Facebook metrics error: {response.text}")
+            return {}
+        return self.parse_metrics(response.json())
+
 class InstagramService(BaseSocialService):
-    def __init__(self, access_token=None):
-        super().__init__(access_token)
+    PLATFORM = 'instagram'
+    OAUTH_PROVIDER = 'instagram'
+
+    def __init__(self, access_token=None, account=None, link=None):
+        super().__init__(access_token, account, link)
         self.business_id = getattr(settings, 'INSTAGRAM_BUSINESS_ID', '')
-        self.base_url = "https://graph.facebook.com/v19.0"
+        self.base_url = getattr(settings, 'GRAPH_API_URL', "https://graph.facebook.com/v19.0")
 
     def authenticate(self):
         return bool(self.business_id and self.access_token)
@@ -120,7 +440,7 @@ class InstagramService(BaseSocialService):
                 "caption": content,
                 "access_token": self.access_token
             }
-            res = requests.post(container_url, data=container_data).json()
+            res = self._post(container_url, data=container_data).json()
             creation_id = res.get('id')
             
             if not creation_id:
@@ -132,8 +452,10 @@ class InstagramService(BaseSocialService):
                 "creation_id": creation_id,
                 "access_token": self.access_token
             }
-            final_res = requests.post(publish_url, data=publish_data).json()
+            final_res = self._post(publish_url, data=publish_data).json()
             return {"status": "success", "platform_post_id": final_res.get('id')}
+        except TransientError:
+            raise
         except Exception as e:
             logger.error(f"Instagram error: {str(e)}")
             return {"status": "failed", "error": str(e)}
@@ -141,10 +463,130 @@ class InstagramService(BaseSocialService):
     def fetch_analytics(self):
         return {"impressions": 0, "reach": 0, "engagement": 0}
 
+    # Instagram business accounts use Facebook user tokens
+    refresh_operation = FacebookService.refresh_operation
+    refresh_access_token = FacebookService.refresh_access_token
+
+    def create_container(self, content, media_url=None):
+        """
+        Non-blocking first half of publish_post: only create the media container.
+
+        Returns ``{"status": "processing", "container_id": ...}``; the container
+        is published by posts.tasks.poll_instagram_containers once Instagram has
+        finished processing it.
+        """
+        if not media_url:
+            return {"status": "failed", "error": "Instagram requires a media_url (image/video)"}
+        try:
+            _, relative_url, token, params = self.container_operation(content, media_url)
+            res = self._post(f"{self.base_url}/{relative_url}", data=dict(params, access_token=token)).json()
+            if not res.get('id'):
+                return {"status": "failed", "error": f"Container creation failed: {res}"}
+            return {"status": "processing", "container_id": res['id']}
+        except TransientError:
+            raise
+        except Exception as e:
+            logger.error(f"Instagram error: {str(e)}")
+            return {"status": "failed", "error": str(e)}
+
+    def container_status_operation(self, container_ids):
+        """Graph batch operation reading the processing status of many containers."""
+        return ("GET", "", self.access_token, {"ids": ",".join(container_ids), "fields": "status_code"})
+
+    def container_operation(self, content, media_url):
+        """Graph batch operation that creates the media container for a post."""
+        params = {"image_url": media_url, "caption": content}
+        return ("POST", f"{self.business_id}/media", self.access_token, params)
+
+    def publish_operation(self, creation_id):
+        """Graph batch operation that publishes a finished media container."""
+        return ("POST", f"{self.business_id}/media_publish", self.access_token, {"creation_id": creation_id})
+
+    def metrics_operation(self, platform_post_ids):
+        params = {
+            "ids": ",".join(platform_post_ids),
+            "fields": "like_count,comments_count,insights.metric(impressions,reach)",
+        }
+        return ("GET", "", self.access_token, params)
+
+    def parse_metrics(self, data):
+        metrics = {}
+        for media_id, item in data.items():
+            insights = {
+                entry.get("name"): (entry.get("values") or [{}])[0].get("value", 0)
+                for entry in item.get("insights", {}).get("data", [])
+            }
+            metrics[media_id] = {
+                "likes": item.get("like_count", 0),
+                "comments": item.get("comments_count", 0),
+                "impressions": insights.get("impressions", 0),
+                "reach": insights.get("reach", 0),
+            }
+        return metrics
+
+    def fetch_metrics(self, platform_post_ids):
+        _, _, token, params = self.metrics_operation(platform_post_ids)
+        response = self._get(f"{self.base_url}/", params=dict(params, access_token=token))
+        if response.status_code != 200:
+            logger.error(f"Instagram metrics error: {response.text}")
+            return {}
+        return self.parse_metrics(response.json())
+
 class YouTubeService(BaseSocialService):
+    PLATFORM = 'youtube'
+    OAUTH_PROVIDER = 'google'
+    TOKEN_URL = "https://oauth2.googleapis.com/token"
+
     def authenticate(self):
         return bool(self.access_token)
 
+    def refresh_access_token(self, refresh_token):
+        return self._refresh_grant(self.TOKEN_URL, refresh_token)
+
+    def _has_checkpoint(self):
+        return self.link is not None and bool(self.link.upload_session_uri)
+
+    def _save_checkpoint(self, session_uri, offset):
+        """Persist the resumable session and committed byte offset on the link."""
+        if self.link is None:
+            return
+        from .models import PostPlatformLink
+        from .caching import bump_version
+        self.link.upload_session_uri = session_uri
+        self.link.upload_offset = offset
+        PostPlatformLink.objects.filter(pk=self.link.pk).update(upload_session_uri=session_uri, upload_offset=offset)
+        # update() sends no post_save; cached post responses show the upload progress
+        bump_version((self.account or self.link.social_account).user_id)
+
+    def _upload(self, content, media_url, resume=True):
+        from googleapiclient.http import MediaFileUpload
+
+        # Reuse the process-wide client built for this access_token
+        youtube = youtube_clients.get(self.access_token)
+
+        # Remote videos are streamed to the shared media store once; local paths are used as-is
+        media = MediaFileUpload(media_store.local_path(media_url), chunksize=upload_chunk_size(), resumable=True)
+
+        request = youtube.videos().insert(
+            part="snippet,status",
+            body={
+                "snippet": {
+                    "title": content[:100], # YouTube title limit
+                    "description": content,
+                    "tags": ["SMM", "SocialMedia"]
+                },
+                "status": {
+                    "privacyStatus": "public"
+                }
+            },
+            media_body=media
+        )
+
+        resume_uri, offset = None, 0
+        if resume and self._has_checkpoint():
+            resume_uri, offset = self.link.upload_session_uri, self.link.upload_offset
+        return resumable_upload(request, resume_uri, offset, on_chunk=self._save_checkpoint)
+
     def publish_post(self, content, media_url=None):
         """
         In YouTube, 'publishing' means uploading a video.
@@ -154,54 +596,176 @@ class YouTubeService(BaseSocialService):
             return {"status": "failed", "error": "YouTube requires a media_url (video file link or path)."}
         
         try:
-            from googleapiclient.discovery import build
-            from googleapiclient.http import MediaFileUpload
-            from google.oauth2.credentials import Credentials
+            from googleapiclient.errors import HttpError
 
-            # Use the access_token to build the YouTube service
-            creds = Credentials(self.access_token)
-            youtube = build("youtube", "v3", credentials=creds)
+            circuit_breaker.check(self.PLATFORM)
+            try:
+                response = self._upload(content, media_url, resume=True)
+            except HttpError as e:
+                # Upload sessions expire after about a week; start a fresh one.
+                if e.resp.status not in (404, 410) or not self._has_checkpoint():
+                    raise
+                self._save_checkpoint(None, 0)
+                response = self._upload(content, media_url, resume=False)
 
-            # For a real implementation, media_url should be a local path or we download it
-            # For this showcase, we'll assume media_url is a path to a video
-            media = MediaFileUpload(media_url, chunksize=-1, resumable=True)
-            
-            request = youtube.videos().insert(
-                part="snippet,status",
-                body={
-                    "snippet": {
-                        "title": content[:100], # YouTube title limit
-                        "description": content,
-                        "tags": ["SMM", "SocialMedia"]
-                    },
-                    "status": {
-                        "privacyStatus": "public"
-                    }
-                },
-                media_body=media
-            )
-            
-            response = request.execute()
+            circuit_breaker.record_success(self.PLATFORM)
+            self._save_checkpoint(None, 0)
             return {"status": "success", "platform_post_id": response.get('id')}
         except ImportError:
             return {"status": "failed", "error": "google-api-python-client not installed."}
+        except TransientError:
+            raise
         except Exception as e:
+            transient = self._transient_error(e)
+            if transient is not None:
+                # The upload checkpoint is kept, so a later retry resumes it
+                if not isinstance(e, requests.exceptions.RequestException):
+                    # A flaky media host is not YouTube's fault
+                    circuit_breaker.record_failure(self.PLATFORM)
+                raise transient from e
             logger.error(f"YouTube error: {str(e)}")
             return {"status": "failed", "error": str(e)}
 
+    def _transient_error(self, error):
+        """TransientError for upload failures worth retrying later, None for final ones."""
+        from googleapiclient.errors import HttpError
+        from httplib2 import ServerNotFoundError
+        if isinstance(error, HttpError):
+            if error.resp.status not in RETRYABLE_STATUS:
+                return None
+            retry_after = parse_retry_after(error.resp.get('retry-after'))
+            return TransientError(f"youtube: HTTP {error.resp.status}", retry_after=retry_after)
+        if isinstance(error, (TimeoutError, ConnectionError, ServerNotFoundError)):
+            return TransientError(f"youtube: {error}")
+        # Downloading the video from the media host (requests' errors are not builtin ones)
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return TransientError(f"youtube: media download: {error}")
+        if isinstance(error, requests.exceptions.HTTPError) and getattr(error.response, 'status_code', None) in RETRYABLE_STATUS:
+            return TransientError(f"youtube: media download: {error}")
+        return None
+
     def fetch_analytics(self):
         if not self.access_token:
             return {"views": 0, "likes": 0, "comments": 0}
         try:
-            from googleapiclient.discovery import build
-            from google.oauth2.credentials import Credentials
-            creds = Credentials(self.access_token)
-            youtube = build("youtube", "v3", credentials=creds)
+            youtube = youtube_clients.get(self.access_token)
             # Fetch channel or video statistics
             return {"views": 120, "likes": 15, "comments": 2} # Mocked for showcase
         except Exception:
             return {"views": 0, "likes": 0, "comments": 0}
 
+    def fetch_metrics(self, platform_post_ids):
+        try:
+            youtube = youtube_clients.get(self.access_token)
+            response = youtube.videos().list(
+                part="statistics", id=",".join(platform_post_ids), maxResults=self.METRICS_BATCH_SIZE
+            ).execute()
+        except ImportError:
+            return {}
+        except Exception as e:
+            logger.error(f"YouTube metrics error: {str(e)}")
+            return {}
+        return {
+            item["id"]: {
+                "views": int(item.get("statistics", {}).get("viewCount", 0)),
+                "likes": int(item.get("statistics", {}).get("likeCount", 0)),
+                "comments": int(item.get("statistics", {}).get("commentCount", 0)),
+            }
+            for item in response.get("items", [])
+        }
+
+class GraphBatch:
+    """
+    Combines Graph API operations into batch requests of up to 50 operations.
+
+    Operations are ``(method, relative_url, access_token, params)`` tuples as
+    returned by the *_operation() helpers of FacebookService and
+    InstagramService. Each operation carries its own access token, so one
+    batch may mix pages and Instagram accounts; the batch request itself is
+    sent with the app access token, so an expired account token never fails
+    the operations of other accounts. ``execute()`` returns
+    ``{key: (status_code, body)}`` for every added operation. Operations of a
+    batch request that never reached Graph (connect timeout, open circuit,
+    batch throttled) come back with a ``None`` status code; UNKNOWN marks
+    operations Graph may have run without us seeing the result (read timeout,
+    reset connection, a null item), and a rejected batch request gives its
+    own status to every operation.
+    """
+    MAX_OPERATIONS = 50
+    # Status code of operations whose outcome was lost; never safe to repeat blindly
+    UNKNOWN = 0
+
+    def __init__(self, service=None):
+        # Any service works as transport; it only provides the pooled _post().
+        # The default one shares Facebook's timeouts and circuit breaker.
+        self.service = service or FacebookService()
+        self.url = getattr(settings, 'GRAPH_API_URL', "https://graph.facebook.com/v19.0")
+        self._operations = []
+
+    def __len__(self):
+        return len(self._operations)
+
+    def add(self, key, operation):
+        method, relative_url, access_token, params = operation
+        query = urlencode(dict(params, access_token=access_token))
+        request = {"method": method, "relative_url": relative_url}
+        if method == "GET":
+            request["relative_url"] = f"{relative_url}?{query}"
+        else:
+            request["body"] = query
+        self._operations.append((key, request, access_token))
+
+    def execute(self):
+        operations, self._operations = self._operations, []
+        results = {}
+        for start in range(0, len(operations), self.MAX_OPERATIONS):
+            chunk = operations[start:start + self.MAX_OPERATIONS]
+            results.update(self._send(chunk))
+        return results
+
+    def fallback_token(self, chunk):
+        # Graph checks the top-level token for the whole request; the app token
+        # ("app_id|app_secret") never expires. Without one, use the first operation's.
+        app = self.service.oauth_app()
+        if app.get('client_id') and app.get('secret'):
+            return f"{app['client_id']}|{app['secret']}"
+        return chunk[0][2]
+
+    def _send(self, chunk):
+        try:
+            response = self.service._post(self.url, data={
+                "access_token": self.fallback_token(chunk),
+                "batch": json.dumps([request for _, request, _ in chunk]),
+                "include_headers": "false",
+            })
+            items = response.json() if response.status_code == 200 else None
+            code, error = (response.status_code if response.status_code != 200 else self.UNKNOWN), response.text
+        except TransientError as e:
+            # Connect timeout, open circuit or a batch Graph throttled: nothing ran
+            logger.error(f"Graph batch error: {str(e)}")
+            code, items, error = None, None, str(e)
+        except Exception as e:
+            # Read timeout or reset connection: Graph may have run the whole batch
+            logger.error(f"Graph batch error: {str(e)}")
+            code, items, error = self.UNKNOWN, None, str(e)
+
+        if not isinstance(items, list):
+            return {key: (code, {"error": {"message": error}}) for key, _, _ in chunk}
+
+        results = {}
+        for (key, _, _), item in zip(chunk, items):
+            if item is None:
+                # Graph returns null for operations that did not complete in time; some may have run
+                results[key] = (self.UNKNOWN, {"error": {"message": "Batch operation did not complete"}})
+                continue
+            try:
+                body = json.loads(item.get("body") or "null")
+            except ValueError:
+                body = {"error": {"message": item.get("body")}}
+            results[key] = (item.get("code"), body)
+        return results
+
+
 class SocialMediaManager:
     SERVICES = {
         'linkedin': LinkedInService,
@@ -211,13 +775,121 @@ class SocialMediaManager:
     }
 
     @classmethod
-    def get_service(cls, platform, access_token):
+    def get_service(cls, platform, access_token, account=None, link=None):
         service_class = cls.SERVICES.get(platform.lower())
         if not service_class:
             raise ValueError(f"Platform {platform} not supported")
-        return service_class(access_token)
+        return service_class(access_token, account=account, link=link)
+
+    # Platforms served by the Graph API, whose calls can share a GraphBatch
+    GRAPH_PLATFORMS = ('facebook', 'instagram')
 
     @classmethod
-    def publish(cls, platform, access_token, content, media_url=None):
-        service = cls.get_service(platform, access_token)
+    def publish_graph_batch(cls, jobs, publish_containers=True):
+        """
+        Publish many Facebook/Instagram posts with batched Graph API calls.
+
+        ``jobs`` is an iterable of ``(key, platform, access_token, content, media_url)``.
+        Feed posts and Instagram container creations all go out in the first
+        batch request, container publishes in a second one, whatever the number
+        of posts. Returns ``{key: result}`` with the same result dicts as publish().
+
+        With ``publish_containers=False`` the second request is skipped and
+        Instagram jobs come back as ``{"status": "processing", "container_id": ...}``.
+        """
+        batch = GraphBatch()
+        results, containers = {}, {}
+        for key, platform, access_token, content, media_url in jobs:
+            service = cls.get_service(platform, access_token)
+            if platform == 'facebook':
+                batch.add(key, service.feed_operation(content, media_url))
+            elif not media_url:
+                results[key] = {"status": "failed", "error": "Instagram requires a media_url (image/video)"}
+            else:
+                batch.add(key, service.container_operation(content, media_url))
+                containers[key] = service
+
+        for key, (code, body) in batch.execute().items():
+            post_id = (body or {}).get('id') if code == 200 else None
+            if key in containers and post_id and not publish_containers:
+                results[key] = {"status": "processing", "container_id": post_id}
+            elif key in containers and post_id:
+                batch.add(key, containers[key].publish_operation(post_id))
+            elif key in containers and (code is None or code in REJECTED_STATUS):
+                results[key] = cls._graph_result(code, body)
+            elif key in containers:
+                results[key] = {"status": "failed", "error": f"Container creation failed: {body}"}
+            else:
+                results[key] = cls._graph_result(code, body)
+
+        for key, (code, body) in batch.execute().items():
+            results[key] = cls._graph_result(code, body)
+        return results
+
+    @staticmethod
+    def _graph_result(code, body):
+        if code == 200 and (body or {}).get('id'):
+            return {"status": "success", "platform_post_id": body['id']}
+        if code is None or code in REJECTED_STATUS:
+            # The batch request never went out or Graph turned it away, so nothing ran
+            return {"status": "retry", "error": json.dumps(body), "retry_after": None}
+        if code == GraphBatch.UNKNOWN:
+            # Publishing again could duplicate the post; like publish_post() on a read timeout, give up
+            return {"status": "failed", "error": f"Outcome unknown, check the page before retrying: {json.dumps(body)}"}
+        return {"status": "failed", "error": json.dumps(body)}
+
+    @classmethod
+    def publish(cls, platform, access_token, content, media_url=None, account=None, link=None, wait=True):
+        """
+        Publish to one platform. With ``wait=False`` platforms that process media
+        asynchronously (Instagram) only start the publish and return a
+        ``processing`` result instead of blocking until it completes.
+
+        Raises posts.resilience.TransientError when the platform is throttling,
+        failing or unreachable and the publish should be retried later.
+        """
+        service = cls.get_service(platform, access_token, account=account, link=link)
+        if not wait and hasattr(service, 'create_container'):
+            return service.create_container(content, media_url)
         return service.publish_post(content, media_url)
+
+    @classmethod
+    async def publish_many(cls, jobs, wait=True, max_concurrency=None):
+        """
+        Publish many posts concurrently from an event loop.
+
+        ``jobs`` is an iterable of ``(key, platform, access_token, content, media_url)``
+        like publish_graph_batch(); returns ``{key: result}`` with the result dicts
+        of publish(), or ``{"status": "retry", ...}`` for transient failures.
+        LinkedIn, Facebook and Instagram calls go through the async services and
+        the loop's shared client, at most ``max_concurrency``
+        (SOCIAL_ASYNC_MAX_CONCURRENCY) in flight. Platforms without an async
+        service run the sync publish() in a worker thread.
+        """
+        import asyncio
+        from asgiref.sync import sync_to_async
+        from .async_services import ASYNC_SERVICES, max_concurrency as default_concurrency
+
+        semaphore = asyncio.Semaphore(max_concurrency or default_concurrency())
+
+        async def run(platform, access_token, content, media_url):
+            async with semaphore:
+                try:
+                    service_class = ASYNC_SERVICES.get(platform.lower())
+                    if service_class is None:
+                        return await sync_to_async(cls.publish, thread_sensitive=False)(
+                            platform, access_token, content, media_url, wait=wait
+                        )
+                    service = service_class(access_token)
+                    if not wait and hasattr(service, 'create_container'):
+                        return await service.create_container(content, media_url)
+                    return await service.publish_post(content, media_url)
+                except TransientError as e:
+                    return {"status": "retry", "error": str(e), "retry_after": e.retry_after}
+                except Exception as e:
+                    logger.error(f"Failed to publish to {platform}: {str(e)}")
+                    return {"status": "failed", "error": str(e)}
+
+        jobs = list(jobs)
+        results = await asyncio.gather(*(run(*job[1:]) for job in jobs))
+        return {job[0]: result for job, result in zip(jobs, results)}
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import bump_version
+from .models import Post, PostPlatformLink, SocialAccount
+
+
+@receiver([post_save, post_delete], sender=Post)
+@receiver([post_save, post_delete], sender=SocialAccount)
+def invalidate_owner_responses(sender, instance, **kwargs):
+    bump_version(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=PostPlatformLink)
+def invalidate_link_owner_responses(sender, instance, **kwargs):
+    if PostPlatformLink.post.is_cached(instance):
+        bump_version(instance.post.user_id)
+    else:
+        bump_version(Post.objects.filter(pk=instance.post_id).values_list('user_id', flat=True).first())
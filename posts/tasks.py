@@ -1,60 +1,667 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
 from celery import shared_task
-from .models import Post, PostPlatformLink
-from .services import SocialMediaManager
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from . import metrics
+from .caching import bump_version
+from .models import Post, PostPlatformLink, SocialAccount
+from .ratelimit import rate_limiter
+from .resilience import RETRYABLE_STATUS, TransientError, backoff, circuit_breaker
+from .services import GraphBatch, SocialMediaManager
+from .variants import prepare_media
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def _media_url(post, platform):
+    # The platform's prepared variant when publish_post_task rendered one
+    return getattr(post, 'prepared_media', {}).get(platform, post.media_url)
+
+
+def _publish_link(post, link, account, delay=0):
+    """Publish one platform link; runs inside the fan-out pool, so it must never raise."""
+    try:
+        if delay:
+            # Wait for the rate limiter token reserved for this call.
+            time.sleep(delay)
+        return SocialMediaManager.publish(
+            platform=account.platform,
+            access_token=account.access_token,
+            content=post.content,
+            media_url=_media_url(post, account.platform),
+            account=account,
+            link=link,
+            # Never block a worker on Instagram media processing
+            wait=False
+        )
+    except TransientError as e:
+        logger.warning(f"Transient error publishing to {account.platform}: {str(e)}")
+        return {"status": "retry", "error": str(e), "retry_after": e.retry_after}
+    except Exception as e:
+        logger.error(f"Failed to publish to {account.platform}: {str(e)}")
+        return {"status": "failed", "error": str(e)}
+
+
+def _publish_graph_links(post, jobs):
+    """Publish several Facebook/Instagram links with batched Graph API calls."""
+    try:
+        delay = max(delay for _, _, delay in jobs)
+        if delay:
+            time.sleep(delay)
+        results = SocialMediaManager.publish_graph_batch([
+            (link.id, account.platform, account.access_token, post.content, _media_url(post, account.platform))
+            for link, account, _ in jobs
+        ], publish_containers=False)
+        return [results[link.id] for link, _, _ in jobs]
+    except Exception as e:
+        logger.error(f"Failed to publish Graph API batch: {str(e)}")
+        return [{"status": "failed", "error": str(e)} for _ in jobs]
+
+
+def _publish_unit(post, unit):
+    # A unit is either one job or the Graph API jobs of the post sharing a batch.
+    if len(unit) > 1:
+        return _publish_graph_links(post, unit)
+    return [_publish_link(post, *unit[0])]
+
+
+def _publish_unit_in_pool(post, unit):
+    try:
+        return _publish_unit(post, unit)
+    finally:
+        # Pool threads get their own DB connection if a service touches the ORM.
+        connection.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+# Threads do not survive a fork; a forked worker child builds its own pools
+os.register_at_fork(after_in_child=_pools.clear)
+
+
+def _publish_pool(max_workers):
+    """
+    The process's long-lived fan-out pool of ``max_workers`` threads.
+
+    Tasks share it instead of starting threads per publish, so per-thread
+    state such as the cached YouTube API clients survives between posts.
+    """
+    with _pools_lock:
+        pool = _pools.get(max_workers)
+        if pool is None:
+            pool = _pools[max_workers] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='publish')
+        return pool
+
+
+def _fan_out(post, jobs, max_workers, on_results=None):
+    """
+    Publish every (link, account, delay) job and return the results in job order.
+
+    Facebook/Instagram jobs travel together in one Graph API batch; everything
+    else is published one link per call. Units run concurrently when more than
+    one worker is allowed. ``on_results(unit, results)`` is called on the
+    calling thread as soon as each unit returns.
+    """
+    graph = [job for job in jobs if job[1].platform in SocialMediaManager.GRAPH_PLATFORMS]
+    if len(graph) < 2:
+        graph = []
+    units = [[job] for job in jobs if not any(job is g for g in graph)]
+    if graph:
+        units.append(graph)
+
+    unit_results = [None] * len(units)
+    if max_workers <= 1 or len(units) <= 1:
+        for i, unit in enumerate(units):
+            unit_results[i] = _publish_unit(post, unit)
+            if on_results is not None:
+                on_results(unit, unit_results[i])
+    else:
+        pool = _publish_pool(max_workers)
+        futures = {pool.submit(_publish_unit_in_pool, post, unit): i for i, unit in enumerate(units)}
+        for future in as_completed(futures):
+            i = futures[future]
+            unit_results[i] = future.result()
+            if on_results is not None:
+                on_results(units[i], unit_results[i])
+
+    by_link = {}
+    for unit, results in zip(units, unit_results):
+        for (link, _, _), result in zip(unit, results):
+            by_link[id(link)] = result
+    return [by_link[id(link)] for link, _, _ in jobs]
+
+
+# Links publish_post_task leaves alone: done, or waiting on an Instagram container
+# (poll_instagram_containers finishes those). Failed links are only tried again
+# when the user reschedules the post.
+SKIPPED_LINK_STATUSES = ('published', 'publishing', 'failed')
+
+# Fields publishing writes on a PostPlatformLink
+LINK_RESULT_FIELDS = ['status', 'platform_post_id', 'error_message', 'container_id', 'container_state', 'retry_count']
+
+
+def _admit(link, account, now, max_wait):
+    """
+    Decide whether ``link`` may be published now.
+
+    Returns ``(True, delay)`` with the wait for the rate limiter token
+    reserved for the call. Otherwise returns ``(False, retry_in)`` after
+    marking the link 'scheduled' (circuit open, or no token within
+    ``max_wait``), or ``(False, None)`` after marking it 'failed' because the
+    account's token expired or was rejected (the cached authentication
+    verdict). Deferring costs no request, and a later scheduler sweep picks
+    the link up again.
+    """
+    if account.expires_at and account.expires_at <= now:
+        # refresh_expiring_tokens could not renew it; don't spend a call on a certain 401
+        link.status = 'failed'
+        link.error_message = f"{account.platform} access token expired, reconnect the account"
+        return False, None
+    if SocialMediaManager.get_service(account.platform, account.access_token).cached_authentication() is False:
+        link.status = 'failed'
+        link.error_message = f"{account.platform} rejected the access token, reconnect the account"
+        return False, None
+    open_for = circuit_breaker.retry_after(account.platform)
+    if open_for:
+        link.status = 'scheduled'
+        return False, open_for
+    granted, delay = rate_limiter.reserve(account.platform, account.id, max_wait)
+    if not granted:
+        link.status = 'scheduled'
+        return False, delay
+    return True, delay
+
+
+def _apply_result(link, account, result, max_retries):
+    """
+    Copy a publish result onto ``link``. Transient failures are rescheduled
+    with exponential backoff until ``max_retries``; the delay is returned then.
+    """
+    metrics.record_publish(account.platform, result['status'])
+    if result['status'] == 'success':
+        link.status = 'published'
+        link.platform_post_id = result['platform_post_id']
+        link.error_message = None
+    elif result['status'] == 'processing':
+        link.status = 'publishing'
+        link.container_id = result['container_id']
+        link.container_state = 'container_created'
+        link.error_message = None
+    elif result['status'] == 'retry' and link.retry_count < max_retries:
+        link.status = 'scheduled'
+        link.error_message = result['error']
+        delay = backoff(link.retry_count, result.get('retry_after'))
+        link.retry_count += 1
+        return delay
+    else:
+        link.status = 'failed'
+        link.error_message = result.get('error', 'Unknown error')
+    return None
+
+
+def _finish_post(post, statuses, retry_in):
+    """
+    Set and save the post's status from the statuses of all its links.
+
+    Deferred links are retried through next_attempt_at, which the sweep
+    reads; the user's scheduled_at is left as it was.
+    """
+    post.next_attempt_at = None
+    if retry_in:
+        post.status = 'scheduled'
+        post.next_attempt_at = timezone.now() + timedelta(seconds=min(retry_in))
+        logger.info(f"Deferred {len(retry_in)} links of post {post.id} for {min(retry_in):.0f}s")
+    elif 'publishing' in statuses:
+        # Rolled up by poll_instagram_containers once the containers are done
+        post.status = 'publishing'
+    elif all(status == 'published' for status in statuses):
+        post.status = 'published'
+        post.published_at = post.published_at or timezone.now()
+    else:
+        post.status = 'failed'
+    post.save(update_fields=['status', 'published_at', 'next_attempt_at', 'updated_at'])
+
+
+def _settle_post(post_id, retry_in):
+    """
+    Lock the post and set its status from the link statuses in the database.
+
+    The row lock serialises this with rollup_post_task and the Instagram
+    poller, so no status is ever computed from links read before another
+    worker changed them.
+    """
+    with transaction.atomic():
+        try:
+            post = Post.objects.select_for_update().get(id=post_id)
+        except Post.DoesNotExist:
+            logger.error(f"Post {post_id} does not exist")
+            return
+        _finish_post(post, list(post.platform_links.values_list('status', flat=True)), retry_in)
+
+
 @shared_task
-def publish_post_task(post_id):
+def publish_post_task(post_id, max_workers=None):
+    phases = metrics.PhaseTimer('publish_post_task')
     try:
         post = Post.objects.get(id=post_id)
     except Post.DoesNotExist:
         logger.error(f"Post {post_id} does not exist")
         return
 
-    # If the post is already published or failed, we might want to skip or retry
-    # For now, let's process its links
-    links = PostPlatformLink.objects.filter(post=post)
-    
-    if not links.exists():
-        # If no links, maybe create them for all user's accounts?
-        # For now, we assume links are created when scheduling/publishing
+    links = list(PostPlatformLink.objects.filter(post=post).select_related('social_account'))
+
+    if not links:
+        # Nothing to publish to; don't leave the post claimed as 'publishing'
         logger.info(f"No platform links for post {post_id}")
+        post.status = 'failed'
+        post.save(update_fields=['status', 'updated_at'])
         return
+    phases.mark('load')
 
-    all_success = True
+    if getattr(settings, 'SOCIAL_PUBLISH_PER_LINK', False):
+        _dispatch_link_tasks(post, links)
+        return
+
+    max_wait = getattr(settings, 'SOCIAL_RATE_LIMIT_MAX_WAIT', 10)
+    now = timezone.now()
+    jobs, deferred, retry_in = [], [], []
+    if post.media_url:
+        # Render platform-specific image variants once, before any rate limiter
+        # token is reserved; later posts sharing the asset reuse them.
+        post.prepared_media = prepare_media(post.media_url, {
+            link.social_account.platform for link in links if link.status not in SKIPPED_LINK_STATUSES
+        })
+        phases.mark('prepare_media')
     for link in links:
-        if link.status == 'published':
+        if link.status in SKIPPED_LINK_STATUSES:
             continue
-            
-        try:
-            account = link.social_account
-            result = SocialMediaManager.publish(
-                platform=account.platform,
-                access_token=account.access_token,
-                content=post.content,
-                media_url=post.media_url
+        # Accounts come from the join above, so the pool threads only do network I/O.
+        account = link.social_account
+        admitted, seconds = _admit(link, account, now, max_wait)
+        if admitted:
+            jobs.append((link, account, seconds))
+        else:
+            deferred.append(link)
+            if seconds is not None:
+                retry_in.append(seconds)
+
+    if max_workers is None:
+        max_workers = getattr(settings, 'SOCIAL_PUBLISH_MAX_WORKERS', 1)
+
+    max_retries = getattr(settings, 'SOCIAL_PUBLISH_MAX_RETRIES', 5)
+    if deferred:
+        PostPlatformLink.objects.bulk_update(deferred, LINK_RESULT_FIELDS)
+    phases.mark('reserve')
+
+    def save_results(unit, results):
+        # Saved as soon as the platform answered: if the worker dies before the
+        # task finishes, the redelivered task (acks_late) skips these links.
+        for (link, account, _), result in zip(unit, results):
+            delay = _apply_result(link, account, result, max_retries)
+            if delay is not None:
+                retry_in.append(delay)
+        PostPlatformLink.objects.bulk_update([link for link, _, _ in unit], LINK_RESULT_FIELDS)
+
+    # One UPDATE per unit, i.e. per platform call (all Graph links of the post
+    # are one unit): a query per link bought the durability above. Upload
+    # checkpoints are written by the services themselves.
+    _fan_out(post, jobs, max_workers, on_results=save_results)
+    phases.mark('publish')
+
+    # Links loaded above can be stale (the Instagram poller may have finished one)
+    _settle_post(post.id, retry_in)
+    phases.mark('save')
+
+
+def _dispatch_link_tasks(post, links):
+    """
+    Per-link mode (SOCIAL_PUBLISH_PER_LINK): one publish_link_task per pending
+    link, each routed to its platform's queue, with rollup_post_task as the
+    chord callback that settles the post once every link has finished.
+    """
+    from celery import chord
+
+    pending = [link for link in links if link.status not in SKIPPED_LINK_STATUSES]
+    # A link of a platform without a service has no queue to go to; fail it
+    # here as in-process publishing would, so the chord still fires
+    unsupported = [link for link in pending if link.social_account.platform.lower() not in SocialMediaManager.SERVICES]
+    if unsupported:
+        for link in unsupported:
+            link.status = 'failed'
+            link.error_message = f"Platform {link.social_account.platform} not supported"
+        PostPlatformLink.objects.bulk_update(unsupported, ['status', 'error_message'])
+        pending = [link for link in pending if link not in unsupported]
+    if not pending:
+        rollup_post_task([], post.id)
+        return
+    chord(
+        [publish_link_task.s(link.id, platform=link.social_account.platform) for link in pending]
+    )(rollup_post_task.s(post.id))
+
+
+@shared_task
+def publish_link_task(link_id, platform=None):
+    """
+    Publish a single PostPlatformLink and save its outcome.
+
+    ``platform`` is only used by posts.routing to put the task on the
+    platform's queue. Returns ``{"link_id", "status", "retry_in"}`` for
+    rollup_post_task; it never raises, or the chord callback would not run.
+    """
+    try:
+        link = PostPlatformLink.objects.select_related('post', 'social_account').get(id=link_id)
+    except PostPlatformLink.DoesNotExist:
+        logger.error(f"Platform link {link_id} does not exist")
+        return {"link_id": link_id, "status": "missing", "retry_in": None}
+    if link.status in SKIPPED_LINK_STATUSES:
+        return {"link_id": link_id, "status": link.status, "retry_in": None}
+
+    post, account = link.post, link.social_account
+    try:
+        admitted, seconds = _admit(link, account, timezone.now(), getattr(settings, 'SOCIAL_RATE_LIMIT_MAX_WAIT', 10))
+        if admitted:
+            if post.media_url:
+                post.prepared_media = prepare_media(post.media_url, {account.platform})
+            result = _publish_link(post, link, account, seconds)
+            seconds = _apply_result(link, account, result, getattr(settings, 'SOCIAL_PUBLISH_MAX_RETRIES', 5))
+        link.save(update_fields=LINK_RESULT_FIELDS)
+    except Exception as e:
+        logger.error(f"Failed to publish link {link_id}: {str(e)}")
+        PostPlatformLink.objects.filter(id=link_id).update(status='failed', error_message=str(e))
+        return {"link_id": link_id, "status": "failed", "retry_in": None}
+    return {"link_id": link_id, "status": link.status, "retry_in": seconds}
+
+
+@shared_task
+def rollup_post_task(results, post_id):
+    """Chord callback of per-link publishing: set the post's status from its links."""
+    retry_in = [result['retry_in'] for result in results if result and result.get('retry_in') is not None]
+    _settle_post(post_id, retry_in)
+
+
+@shared_task
+def dispatch_due_posts(batch_size=None, max_batches=None):
+    """
+    Periodic scheduler sweep (run by Celery Beat).
+
+    Claims scheduled posts whose time has come in batches, marks them
+    'publishing' and enqueues publish_post_task for each. A post whose links
+    were deferred is due at its next_attempt_at instead of its scheduled_at.
+    Rows are locked with SKIP LOCKED so concurrent sweeps never dispatch the
+    same post twice, and future posts cost nothing but a database row until
+    they are due.
+    """
+    batch_size = batch_size or getattr(settings, 'SOCIAL_SCHEDULER_BATCH_SIZE', 500)
+    max_batches = max_batches or getattr(settings, 'SOCIAL_SCHEDULER_MAX_BATCHES', 20)
+    _reap_stale_claims(batch_size)
+
+    dispatched = 0
+    for _ in range(max_batches):
+        with transaction.atomic():
+            now = timezone.now()
+            claimed = list(
+                Post.objects.select_for_update(skip_locked=True)
+                .filter(status='scheduled')
+                .filter(Q(next_attempt_at__isnull=True, scheduled_at__lte=now) | Q(next_attempt_at__lte=now))
+                .order_by('scheduled_at')
+                .values_list('id', 'user_id')[:batch_size]
             )
-            
-            if result['status'] == 'success':
-                link.status = 'published'
-                link.platform_post_id = result['platform_post_id']
-                link.save()
-            else:
+            if not claimed:
+                break
+            post_ids = [post_id for post_id, _ in claimed]
+            Post.objects.filter(id__in=post_ids).update(status='publishing', updated_at=timezone.now())
+            bump_version(*{user_id for _, user_id in claimed})
+            transaction.on_commit(lambda post_ids=post_ids: [publish_post_task.delay(post_id) for post_id in post_ids])
+        dispatched += len(post_ids)
+        if len(post_ids) < batch_size:
+            break
+
+    if dispatched:
+        logger.info(f"Dispatched {dispatched} due posts")
+    return dispatched
+
+
+IN_FLIGHT_CONTAINER_STATES = ('container_created', 'ready')
+
+
+def _reap_stale_claims(limit):
+    """
+    Recover posts left 'publishing' for SOCIAL_PUBLISH_STALE_AFTER seconds
+    with no Instagram container in flight (nothing else will settle them).
+
+    A link stuck in 'publishing' without a container is failed, posts whose
+    links are then all final are settled, and the rest go back to
+    'scheduled' so the next sweep publishes their remaining links.
+    """
+    now = timezone.now()
+    stale_after = getattr(settings, 'SOCIAL_PUBLISH_STALE_AFTER', 3600)
+    stale = list(
+        Post.objects.filter(status='publishing', updated_at__lt=now - timedelta(seconds=stale_after))
+        .exclude(platform_links__container_state__in=IN_FLIGHT_CONTAINER_STATES)
+        .values_list('id', 'user_id')[:limit]
+    )
+    if not stale:
+        return 0
+    post_ids = [post_id for post_id, _ in stale]
+    PostPlatformLink.objects.filter(post_id__in=post_ids, status='publishing').update(
+        status='failed', error_message='Publishing did not finish'
+    )
+    _rollup_posts(post_ids)
+    Post.objects.filter(id__in=post_ids, status='publishing').update(
+        status='scheduled', next_attempt_at=now, updated_at=now
+    )
+    bump_version(*{user_id for _, user_id in stale})
+    logger.warning(f"Recovered {len(stale)} posts stuck in 'publishing'")
+    return len(stale)
+
+
+def _rollup_posts(post_ids):
+    """Settle 'publishing' posts whose links have all reached a final state."""
+    statuses = defaultdict(set)
+    for post_id, status in PostPlatformLink.objects.filter(post_id__in=post_ids).values_list('post_id', 'status'):
+        statuses[post_id].add(status)
+
+    published = [post_id for post_id, found in statuses.items() if found == {'published'}]
+    failed = [
+        post_id for post_id, found in statuses.items()
+        if 'failed' in found and not found & {'publishing', 'scheduled', 'draft'}
+    ]
+    now = timezone.now()
+    Post.objects.filter(id__in=published, status='publishing').update(status='published', published_at=now, updated_at=now)
+    Post.objects.filter(id__in=failed, status='publishing').update(status='failed', updated_at=now)
+
+
+@shared_task
+def poll_instagram_containers(limit=None):
+    """
+    Advance pending Instagram containers: container_created -> ready -> published.
+
+    The status of every in-flight container is read with one Graph API batch
+    (50 containers per ?ids= read, many accounts per request), and finished
+    containers are published with a second batch. Containers still
+    IN_PROGRESS are simply looked at again on the next run, so no worker
+    ever sleeps waiting for Instagram. A container that could not be read or
+    published is polled after the healthy ones, and its link is failed after
+    INSTAGRAM_CONTAINER_MAX_FAILURES such polls.
+    """
+    limit = limit or getattr(settings, 'INSTAGRAM_CONTAINER_POLL_LIMIT', 500)
+    max_failures = getattr(settings, 'INSTAGRAM_CONTAINER_MAX_FAILURES', 40)
+    links = list(
+        PostPlatformLink.objects.filter(container_state__in=IN_FLIGHT_CONTAINER_STATES)
+        .select_related('social_account')
+        .order_by('container_failures', 'id')[:limit]
+    )
+    if not links:
+        return 0
+
+    changed, failing = {}, {}
+
+    def check_failed(link, error):
+        link.container_failures += 1
+        if link.container_failures < max_failures:
+            failing[link.id] = link
+            return
+        link.status = 'failed'
+        link.container_state = 'error'
+        link.error_message = f"Gave up on Instagram container {link.container_id} after {link.container_failures} failed polls: {error}"
+        changed[link.id] = link
+
+    services = {}
+    by_account = defaultdict(list)
+    for link in links:
+        by_account[link.social_account_id].append(link)
+        if link.social_account_id not in services:
+            account = link.social_account
+            services[account.id] = SocialMediaManager.get_service(account.platform, account.access_token, account=account)
+
+    # 1. container_created -> ready / error
+    batch, checks = GraphBatch(), {}
+    for account_id, account_links in by_account.items():
+        created = [link for link in account_links if link.container_state == 'container_created']
+        for start in range(0, len(created), GraphBatch.MAX_OPERATIONS):
+            chunk = created[start:start + GraphBatch.MAX_OPERATIONS]
+            checks[(account_id, start)] = chunk
+            batch.add((account_id, start), services[account_id].container_status_operation([l.container_id for l in chunk]))
+
+    for key, (code, body) in batch.execute().items():
+        if code != 200:
+            logger.warning(f"Container status check failed: {body}")
+            for link in checks[key]:
+                check_failed(link, body)
+            continue
+        for link in checks[key]:
+            status_code = (body.get(link.container_id) or {}).get('status_code')
+            if status_code is None:
+                check_failed(link, f"no status for container {link.container_id}")
+            elif status_code == 'FINISHED':
+                link.container_state = 'ready'
+                changed[link.id] = link
+            elif status_code in ('ERROR', 'EXPIRED'):
+                link.container_state = 'error'
                 link.status = 'failed'
-                link.error_message = result.get('error', 'Unknown error')
-                link.save()
-                all_success = False
-        except Exception as e:
-            logger.error(f"Failed to publish to {link.social_account.platform}: {str(e)}")
+                link.error_message = f"Instagram container {link.container_id} {status_code}"
+                changed[link.id] = link
+
+    # 2. ready -> published
+    ready = {link.id: link for link in links if link.container_state == 'ready'}
+    for link in ready.values():
+        batch.add(link.id, services[link.social_account_id].publish_operation(link.container_id))
+    for link_id, (code, body) in batch.execute().items():
+        link = ready[link_id]
+        if code == 200 and (body or {}).get('id'):
+            link.status = 'published'
+            link.platform_post_id = body['id']
+            link.container_state = 'published'
+            link.error_message = None
+        elif code is None or code == GraphBatch.UNKNOWN or code in RETRYABLE_STATUS:
+            # Transport problem or Graph trouble: stay 'ready' and publish on the next run.
+            # Publishing a container twice cannot duplicate the post, Graph refuses the second call.
+            check_failed(link, body)
+            continue
+        else:
             link.status = 'failed'
-            link.error_message = str(e)
-            link.save()
-            all_success = False
+            link.container_state = 'error'
+            link.error_message = f"Container publish failed: {body}"
+        changed[link.id] = link
 
-    if all_success:
-        post.status = 'published'
+    if failing:
+        PostPlatformLink.objects.bulk_update(failing.values(), ['container_failures'])
+    if changed:
+        PostPlatformLink.objects.bulk_update(
+            changed.values(), ['status', 'platform_post_id', 'error_message', 'container_state', 'container_failures']
+        )
+        _rollup_posts({link.post_id for link in changed.values()})
+        # bulk_update() and the rollup bypass the cache invalidation signals
+        bump_version(*{link.social_account.user_id for link in changed.values()})
+    return len(changed)
+
+
+def _refresh_accounts(platform, accounts):
+    """Refresh one batch of accounts of a platform; returns how many got a new token."""
+    services = {
+        account.id: SocialMediaManager.get_service(platform, account.access_token, account=account)
+        for account in accounts
+    }
+    if platform in SocialMediaManager.GRAPH_PLATFORMS:
+        batch = GraphBatch()
+        for account in accounts:
+            batch.add(account.id, services[account.id].refresh_operation())
+        tokens = {
+            account_id: services[account_id].parse_token(body) if code == 200 else None
+            for account_id, (code, body) in batch.execute().items()
+        }
     else:
-        post.status = 'failed'
-    post.save()
+        tokens = {}
+        for account in accounts:
+            try:
+                tokens[account.id] = services[account.id].refresh_access_token(account.refresh_token)
+            except Exception as e:
+                logger.error(f"Token refresh failed for account {account.id}: {str(e)}")
+                tokens[account.id] = None
+
+    now = timezone.now()
+    refreshed = []
+    for account in accounts:
+        token = tokens.get(account.id)
+        if token is None:
+            if account.expires_at <= now:
+                # Publishes with this token can only fail; let callers know without a round trip
+                services[account.id].remember_authentication(False)
+            logger.warning(f"Could not refresh {platform} token of account {account.id}")
+            continue
+        account.access_token = token['access_token']
+        account.refresh_token = token['refresh_token'] or account.refresh_token
+        account.expires_at = now + timedelta(seconds=int(token['expires_in'])) if token['expires_in'] else None
+        account.updated_at = now
+        refreshed.append(account)
+        SocialMediaManager.get_service(platform, account.access_token).remember_authentication(True)
+
+    if refreshed:
+        SocialAccount.objects.bulk_update(refreshed, ['access_token', 'refresh_token', 'expires_at', 'updated_at'])
+        bump_version(*{account.user_id for account in refreshed})
+    return len(refreshed)
+
+
+@shared_task
+def refresh_expiring_tokens(limit=None, batch_size=None):
+    """
+    Periodic token refresher (run by Celery Beat).
+
+    Selects the accounts whose token expires within SOCIAL_TOKEN_REFRESH_AHEAD
+    seconds (or expired less than SOCIAL_TOKEN_REFRESH_GRACE ago) with a range
+    scan on the expires_at index, and refreshes them in batches per platform:
+    Facebook/Instagram token exchanges share Graph API batch requests, other
+    platforms use their OAuth refresh grant. Each batch is written back with
+    one bulk UPDATE, so publishes always find a valid token in the row.
+    """
+    limit = limit or getattr(settings, 'SOCIAL_TOKEN_REFRESH_LIMIT', 1000)
+    batch_size = batch_size or getattr(settings, 'SOCIAL_TOKEN_REFRESH_BATCH_SIZE', GraphBatch.MAX_OPERATIONS)
+    now = timezone.now()
+    accounts = list(
+        SocialAccount.objects.filter(
+            platform__in=list(SocialMediaManager.SERVICES),
+            expires_at__gt=now - timedelta(seconds=getattr(settings, 'SOCIAL_TOKEN_REFRESH_GRACE', 86400)),
+            expires_at__lte=now + timedelta(seconds=getattr(settings, 'SOCIAL_TOKEN_REFRESH_AHEAD', 1200)),
+        ).order_by('expires_at')[:limit]
+    )
+
+    by_platform = defaultdict(list)
+    for account in accounts:
+        by_platform[account.platform].append(account)
+
+    refreshed = 0
+    for platform, platform_accounts in by_platform.items():
+        for start in range(0, len(platform_accounts), batch_size):
+            refreshed += _refresh_accounts(platform, platform_accounts[start:start + batch_size])
+
+    if accounts:
+        logger.info(f"Refreshed {refreshed} of {len(accounts)} expiring access tokens")
+    return refreshed
@@ -0,0 +1,144 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import httpx
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from ..async_services import AsyncFacebookService, AsyncInstagramService, AsyncLinkedInService, get_client
+from ..models import SocialAccount
+from ..services import LinkedInService, SocialMediaManager
+
+
+def _client(handler):
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class AsyncServicesTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    async def test_linkedin_publish_caches_member_id(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.path)
+            if request.url.path == '/v2/me':
+                return httpx.Response(200, json={'id': 'member1'})
+            body = json.loads(request.content)
+            self.assertEqual(body['author'], 'urn:li:person:member1')
+            return httpx.Response(201, json={'id': 'urn:li:share:1'})
+
+        async with _client(handler) as client:
+            service = AsyncLinkedInService('token', client=client)
+            self.assertEqual(await service.publish_post('Hello'), {'status': 'success', 'platform_post_id': 'urn:li:share:1'})
+            self.assertTrue(await AsyncLinkedInService('token', client=client).authenticate())
+        self.assertEqual(calls, ['/v2/me', '/v2/ugcPosts'])
+
+    async def test_linkedin_uses_the_stored_member_id(self):
+        def handler(request):
+            self.assertEqual(request.url.path, '/v2/ugcPosts')
+            self.assertEqual(json.loads(request.content)['author'], 'urn:li:person:member3')
+            return httpx.Response(201, json={'id': 'urn:li:share:3'})
+
+        account = SocialAccount(platform='linkedin', platform_user_id='member3', access_token='token')
+        async with _client(handler) as client:
+            result = await AsyncLinkedInService('token', account=account, client=client).publish_post('Hello')
+        self.assertEqual(result['status'], 'success')
+
+    async def test_facebook_publish_and_failure(self):
+        def handler(request):
+            self.assertEqual(request.url.params['message'], 'Hi')
+            return httpx.Response(400, text='bad token')
+
+        async with _client(handler) as client:
+            result = await AsyncFacebookService('token', client=client).publish_post('Hi')
+        self.assertEqual(result, {'status': 'failed', 'error': 'bad token'})
+
+    @override_settings(INSTAGRAM_BUSINESS_ID='biz')
+    async def test_instagram_creates_then_publishes_container(self):
+        def handler(request):
+            if request.url.path.endswith('/biz/media'):
+                return httpx.Response(200, json={'id': 'c1'})
+            self.assertIn(b'creation_id=c1', request.content)
+            return httpx.Response(200, json={'id': 'ig1'})
+
+        async with _client(handler) as client:
+            service = AsyncInstagramService('token', client=client)
+            self.assertEqual(await service.publish_post('Caption', 'https://example.com/a.jpg'), {'status': 'success', 'platform_post_id': 'ig1'})
+            self.assertEqual(await service.fetch_analytics(), {'impressions': 0, 'reach': 0, 'engagement': 0})
+
+    async def test_reads_and_refreshes_are_awaited(self):
+        def handler(request):
+            if request.url.path == '/v2/me':
+                return httpx.Response(401, json={'message': 'invalid token'})
+            if request.url.path == '/oauth/v2/accessToken':
+                return httpx.Response(200, json={'access_token': 'new', 'expires_in': 60})
+            if request.url.path == '/v19.0/oauth/access_token':
+                return httpx.Response(200, json={'access_token': 'long-lived'})
+            if request.url.path == '/v19.0/':
+                return httpx.Response(200, json={'1': {'reactions': {'summary': {'total_count': 3}}}})
+            return httpx.Response(200, json={'results': {'urn:1': {'likesSummary': {'totalLikes': 5}}}})
+
+        async with _client(handler) as client:
+            linkedin = AsyncLinkedInService('bogus-token', client=client)
+            self.assertFalse(await linkedin.is_authenticated())
+            # the verdict is shared with the sync service
+            self.assertFalse(LinkedInService('bogus-token').is_authenticated())
+            self.assertEqual((await linkedin.refresh_access_token('r'))['access_token'], 'new')
+            self.assertEqual(await linkedin.fetch_metrics(['urn:1']), {'urn:1': {'likes': 5, 'comments': 0}})
+
+            facebook = AsyncFacebookService('t', client=client)
+            self.assertEqual(await facebook.fetch_metrics(['1']), {'1': {'likes': 3, 'comments': 0, 'shares': 0}})
+            self.assertEqual((await facebook.refresh_access_token())['access_token'], 'long-lived')
+            self.assertEqual((await AsyncInstagramService('t', client=client).refresh_access_token())['access_token'], 'long-lived')
+
+    async def test_shared_client_per_loop(self):
+        client = get_client()
+        self.assertIs(client, get_client())
+        await client.aclose()
+        self.assertIsNot(client, get_client())
+
+    async def test_publish_many_runs_calls_concurrently(self):
+        async def handler(request):
+            await asyncio.sleep(0.2)
+            return httpx.Response(200, json={'id': 'fb-post'})
+
+        async with _client(handler) as client:
+            with patch('posts.async_services.get_client', return_value=client):
+                loop = asyncio.get_running_loop()
+                started = loop.time()
+                results = await SocialMediaManager.publish_many(
+                    [(i, 'facebook', f'token{i}', f'post {i}', None) for i in range(50)]
+                )
+                self.assertLess(loop.time() - started, 1)
+        self.assertEqual(len(results), 50)
+        self.assertEqual(results[7], {'status': 'success', 'platform_post_id': 'fb-post'})
+
+    async def test_publish_many_reports_throttling_and_connect_errors_as_retry(self):
+        def handler(request):
+            if request.url.path == '/v2/ugcPosts':
+                raise httpx.ConnectTimeout('timed out', request=request)
+            if request.url.path == '/v2/me':
+                return httpx.Response(200, json={'id': 'member1'})
+            return httpx.Response(429, headers={'Retry-After': '120'}, text='slow down')
+
+        async with _client(handler) as client:
+            with patch('posts.async_services.get_client', return_value=client):
+                results = await SocialMediaManager.publish_many(
+                    [('fb', 'facebook', 'token', 'Hi', None), ('li', 'linkedin', 'token', 'Hi', None)]
+                )
+        self.assertEqual((results['fb']['status'], results['fb']['retry_after']), ('retry', 120))
+        self.assertEqual(results['li']['status'], 'retry')
+
+    @patch('posts.services.SocialMediaManager.publish')
+    async def test_publish_many_falls_back_to_sync_services(self, mock_publish):
+        def publish(platform, *args, **kwargs):
+            if platform != 'youtube':
+                raise ValueError(f"Platform {platform} not supported")
+            return {'status': 'success', 'platform_post_id': 'yt1'}
+        mock_publish.side_effect = publish
+        results = await SocialMediaManager.publish_many([('a', 'youtube', 'token', 'Video', '/tmp/v.mp4'), ('b', 'myspace', 't', 'x', None)])
+        self.assertEqual(results['a'], {'status': 'success', 'platform_post_id': 'yt1'})
+        self.assertEqual(results['b'], {'status': 'failed', 'error': 'Platform myspace not supported'})
@@ -0,0 +1,69 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from ..http import SessionPool, pool_config, session_pool
+from ..resilience import timeouts
+from ..services import FacebookService
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"id": "user123"}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SessionPoolTest(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _KeepAliveHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v2/me"
+        self.pool = SessionPool()
+
+    def tearDown(self):
+        self.pool.reset()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_session_shared_per_host(self):
+        self.assertIs(self.pool.get(self.url), self.pool.get(self.url + '?x=1'))
+        self.assertIsNot(self.pool.get(self.url), self.pool.get('https://graph.facebook.com/v19.0/me'))
+
+    def test_connections_are_reused(self):
+        for _ in range(3):
+            self.pool.get(self.url).get(self.url, timeout=5)
+        stats = self.pool.stats()[f"127.0.0.1:{self.server.server_port}"]
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['connections'], 1)
+        self.assertEqual(stats['reused'], 2)
+
+    @patch('requests.Session.get')
+    def test_services_use_pooled_session_with_timeout(self, mock_get):
+        cache.clear()
+        mock_get.return_value.status_code = 200
+        self.assertTrue(FacebookService('a').authenticate())
+        self.assertTrue(FacebookService('b').authenticate())
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(mock_get.call_args.kwargs['timeout'], timeouts('facebook', pool_config()['TIMEOUT']))
+        url = 'https://graph.facebook.com/v19.0/me'
+        self.assertIs(session_pool.get(url), session_pool.get(url))
+
+    @override_settings(SOCIAL_HTTP_POOL={'POOL_MAXSIZE': 8, 'HOSTS': {'api.linkedin.com': {'POOL_MAXSIZE': 32, 'TIMEOUT': 3}}})
+    def test_per_host_config(self):
+        self.assertEqual(pool_config()['POOL_MAXSIZE'], 8)
+        self.assertEqual(pool_config('api.linkedin.com')['POOL_MAXSIZE'], 32)
+        self.assertEqual(self.pool.timeout('https://api.linkedin.com/v2/me'), 3)
+        adapter = self.pool.get('https://api.linkedin.com/v2/me').get_adapter('https://api.linkedin.com')
+        self.assertEqual(adapter._pool_maxsize, 32)
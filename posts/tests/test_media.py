@@ -0,0 +1,93 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from ..media import MediaStore
+from ..services import YouTubeService
+
+ASSETS = {'/a.mp4': b'a' * 1000, '/copy-of-a.mp4': b'a' * 1000, '/b.jpg': b'b' * 1000, '/c.jpg': b'c' * 1000}
+
+
+class _AssetHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    hits = []
+
+    def do_GET(self):
+        self.hits.append(self.path)
+        body = ASSETS.get(self.path)
+        self.send_response(200 if body else 404)
+        self.send_header('Content-Length', str(len(body or b'')))
+        self.end_headers()
+        self.wfile.write(body or b'')
+
+    def log_message(self, *args):
+        pass
+
+
+class MediaStoreTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        _AssetHandler.hits = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _AssetHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_port}"
+        self.root = tempfile.mkdtemp()
+        self.store = MediaStore(root=self.root, max_bytes=2500)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.root)
+
+    def test_downloads_once_and_names_by_content(self):
+        paths = [self.store.local_path(f"{self.base}/a.mp4") for _ in range(3)]
+        self.assertEqual(len(set(paths)), 1)
+        self.assertEqual(os.path.basename(paths[0]), hashlib.sha256(ASSETS['/a.mp4']).hexdigest() + '.mp4')
+        self.assertEqual(_AssetHandler.hits, ['/a.mp4'])
+
+        # Same bytes behind another URL are stored once
+        self.assertEqual(self.store.local_path(f"{self.base}/copy-of-a.mp4"), paths[0])
+        self.assertEqual(len(os.listdir(self.root)), 1)
+
+    def test_concurrent_requests_share_one_download(self):
+        threads = [threading.Thread(target=self.store.local_path, args=(f"{self.base}/b.jpg",)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(_AssetHandler.hits, ['/b.jpg'])
+
+    def test_least_recently_used_files_are_evicted(self):
+        a = self.store.local_path(f"{self.base}/a.mp4")
+        b = self.store.local_path(f"{self.base}/b.jpg")
+        os.utime(a, (1, 1))
+        os.utime(b, (2, 2))
+        self.store.local_path(f"{self.base}/a.mp4")  # hit: a becomes most recent
+        c = self.store.local_path(f"{self.base}/c.jpg")
+        self.assertEqual(sorted(os.listdir(self.root)), sorted(os.path.basename(p) for p in (a, c)))
+
+        # an evicted file is fetched again on its next use
+        self.assertTrue(os.path.exists(self.store.local_path(f"{self.base}/b.jpg")))
+        self.assertEqual(_AssetHandler.hits.count('/b.jpg'), 2)
+
+    def test_local_paths_and_failed_downloads(self):
+        self.assertEqual(self.store.local_path('/srv/videos/v.mp4'), '/srv/videos/v.mp4')
+        with self.assertRaises(Exception):
+            self.store.local_path(f"{self.base}/missing.mp4")
+        self.assertEqual(os.listdir(self.root), [])
+
+    @patch('googleapiclient.http.MediaFileUpload')
+    @patch('posts.services.youtube_clients.get')
+    def test_youtube_uploads_the_cached_file(self, mock_client, mock_media):
+        mock_client.return_value.videos.return_value.insert.return_value.next_chunk.return_value = (None, {'id': 'v1'})
+        with patch('posts.services.media_store', self.store):
+            result = YouTubeService('token').publish_post('Video', media_url=f"{self.base}/a.mp4")
+        self.assertEqual(result, {'status': 'success', 'platform_post_id': 'v1'})
+        self.assertEqual(os.path.dirname(mock_media.call_args.args[0]), self.root)
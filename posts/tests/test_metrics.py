@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+from unittest import skipIf
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from social_marketing.celery import observe_queue_wait, stamp_enqueue_time
+
+from .. import metrics
+from ..models import Post, PostPlatformLink, SocialAccount
+from ..services import LinkedInService
+from ..tasks import publish_post_task
+
+User = get_user_model()
+
+
+def sample(name, **labels):
+    return metrics.prometheus_client.REGISTRY.get_sample_value(name, labels) or 0
+
+
+@skipIf(metrics.prometheus_client is None, 'prometheus_client is not installed')
+class MetricsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch('posts.services.time.sleep')
+    @patch('requests.Session.get')
+    def test_requests_are_timed_and_failures_counted(self, mock_get, mock_sleep):
+        before = (
+            sample('social_request_duration_seconds_count', platform='linkedin', method='GET'),
+            sample('social_rate_limited_total', platform='linkedin'),
+            sample('social_request_errors_total', platform='linkedin', reason='429'),
+        )
+        mock_get.side_effect = [
+            MagicMock(status_code=429, headers={'Retry-After': '1'}),
+            MagicMock(status_code=200, json=lambda: {'id': 'member'}),
+        ]
+        self.assertEqual(LinkedInService('token').get_member_id(), 'member')
+        after = (
+            sample('social_request_duration_seconds_count', platform='linkedin', method='GET'),
+            sample('social_rate_limited_total', platform='linkedin'),
+            sample('social_request_errors_total', platform='linkedin', reason='429'),
+        )
+        self.assertEqual([b - a for a, b in zip(before, after)], [2, 1, 1])
+
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_publish_task_phases_and_results(self, mock_publish):
+        user = User.objects.create_user(username='mia', password='pw')
+        post = Post.objects.create(user=user, content='Hello', status='publishing')
+        account = SocialAccount.objects.create(user=user, platform='linkedin', platform_user_id='x', access_token='t')
+        PostPlatformLink.objects.create(post=post, social_account=account)
+        mock_publish.return_value = {'status': 'success', 'platform_post_id': 'urn'}
+
+        phases = ('load', 'reserve', 'publish', 'save')
+        before = [sample('task_phase_duration_seconds_count', task='publish_post_task', phase=p) for p in phases]
+        published = sample('social_publish_results_total', platform='linkedin', status='success')
+        publish_post_task(post.id)
+        after = [sample('task_phase_duration_seconds_count', task='publish_post_task', phase=p) for p in phases]
+        self.assertEqual([b - a for a, b in zip(before, after)], [1, 1, 1, 1])
+        self.assertEqual(sample('social_publish_results_total', platform='linkedin', status='success') - published, 1)
+
+    def test_queue_wait_is_measured_from_the_publish_header(self):
+        headers = {}
+        stamp_enqueue_time(headers=headers)
+        task = SimpleNamespace(name='posts.tasks.publish_post_task', request=SimpleNamespace(**headers))
+        before = sample('celery_task_queue_wait_seconds_count', task=task.name)
+        observe_queue_wait(task=task)
+        # eager runs carry no header and are not counted
+        observe_queue_wait(task=SimpleNamespace(name=task.name, request=SimpleNamespace()))
+        self.assertEqual(sample('celery_task_queue_wait_seconds_count', task=task.name) - before, 1)
+
+    def test_metrics_endpoint(self):
+        metrics.observe_request('facebook', 'post', 0.2, 503)
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('text/plain', response['Content-Type'])
+        self.assertIn(b'social_request_errors_total{platform="facebook",reason="503"}', response.content)
+
+        with override_settings(METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get('/metrics').status_code, 401)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
@@ -0,0 +1,66 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from benchmarks.mock_platforms import MockPlatformServer
+
+from ..resilience import TransientError
+from ..services import SocialMediaManager
+from ..youtube import YouTubeClientFactory
+
+
+class MockPlatformServerTest(SimpleTestCase):
+    """The services publish end to end against benchmarks.mock_platforms."""
+
+    def setUp(self):
+        cache.clear()
+        self.server = MockPlatformServer(media_size=600 * 1024).start()
+        self.media = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False)
+        self.media.write(b'\0' * 600 * 1024)
+        self.media.close()
+        urls = self.server.settings()
+        self.settings_override = override_settings(
+            LINKEDIN_API_URL=urls['LINKEDIN_API_URL'], GRAPH_API_URL=urls['GRAPH_API_URL'],
+            YOUTUBE_API_URL=urls['YOUTUBE_API_URL'], INSTAGRAM_BUSINESS_ID='ig',
+            YOUTUBE_UPLOAD_CHUNK_SIZE=256 * 1024, SOCIAL_RETRY={'BACKOFF': 0.01},
+        )
+        self.settings_override.enable()
+        # The bundled discovery document is cached per factory; build one for the mock root
+        patcher = patch('posts.services.youtube_clients', YouTubeClientFactory())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.server.stop()
+        os.remove(self.media.name)
+
+    def test_every_platform_publishes(self):
+        for platform in ('linkedin', 'facebook', 'instagram', 'youtube'):
+            result = SocialMediaManager.publish(platform, 'token', 'Hello', self.media.name)
+            self.assertEqual(result['status'], 'success', platform)
+        results = SocialMediaManager.publish_graph_batch([
+            (1, 'facebook', 'token', 'Hello', 'https://example.com/a.jpg'),
+            (2, 'instagram', 'token', 'Hello', 'https://example.com/a.jpg'),
+        ])
+        self.assertEqual([r['status'] for r in results.values()], ['success', 'success'])
+        self.assertEqual(self.server.requests['PUT /youtube/upload-session/<id>'], 3)
+        self.assertEqual(self.server.requests['POST /graph/v19.0'], 2)
+
+    def test_failed_chunk_is_resumed(self):
+        faults = iter([None, None, 503])  # session, first chunk, then the second chunk fails once
+        self.server.fault = lambda: next(faults, None)
+        result = SocialMediaManager.publish('youtube', 'token', 'Hello', self.media.name)
+        self.assertEqual(result['status'], 'success')
+        # the failed chunk is followed by a status query, then sent again
+        self.assertEqual(self.server.requests['PUT /youtube/upload-session/<id>'], 5)
+
+    def test_injected_throttling(self):
+        self.server.throttle_rate, self.server.retry_after = 1, 60
+        with self.assertRaises(TransientError) as ctx:
+            SocialMediaManager.publish('linkedin', 'token', 'Hello')
+        self.assertEqual(ctx.exception.retry_after, 60)
+        self.assertEqual(self.server.requests['POST /linkedin/v2/ugcPosts'], 0)
@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from ..ratelimit import RateLimiter
+
+LIMITS = {'facebook': {'RATE': 1.0, 'BURST': 2}}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@override_settings(SOCIAL_RATE_LIMITS=LIMITS)
+class RateLimiterTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(clock=self.clock)
+
+    def test_burst_then_wait(self):
+        self.assertEqual(self.limiter.reserve('facebook', 1, max_wait=5), (True, 0.0))
+        self.assertEqual(self.limiter.reserve('facebook', 1, max_wait=5), (True, 0.0))
+        # Bucket is empty: the next token is promised one second from now, the one after in two.
+        self.assertEqual(self.limiter.reserve('facebook', 1, max_wait=5), (True, 1.0))
+        self.assertEqual(self.limiter.reserve('facebook', 1, max_wait=5), (True, 2.0))
+
+    def test_defers_without_consuming(self):
+        self.limiter.reserve('facebook', 1)
+        self.limiter.reserve('facebook', 1)
+        self.assertEqual(self.limiter.reserve('facebook', 1, max_wait=0), (False, 1.0))
+        self.assertEqual(self.limiter.reserve('facebook', 1, max_wait=0), (False, 1.0))
+        self.clock.now += 1
+        self.assertEqual(self.limiter.reserve('facebook', 1, max_wait=0), (True, 0.0))
+
+    def test_buckets_are_per_account_and_refill(self):
+        self.limiter.reserve('facebook', 1)
+        self.limiter.reserve('facebook', 1)
+        self.assertEqual(self.limiter.reserve('facebook', 2), (True, 0.0))
+        self.clock.now += 10
+        self.assertEqual(self.limiter.reserve('facebook', 1), (True, 0.0))
+        self.assertEqual(self.limiter.reserve('facebook', 1), (True, 0.0))
+        self.assertFalse(self.limiter.reserve('facebook', 1)[0])
+
+    def test_unconfigured_platform_is_unlimited(self):
+        for _ in range(100):
+            self.assertEqual(self.limiter.reserve('youtube', 1), (True, 0.0))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp/smm-ratelimit-test'}})
+    def test_state_shared_through_cache_backend(self):
+        cache.clear()
+        other_worker = RateLimiter(clock=self.clock)
+        self.limiter.reserve('facebook', 1)
+        other_worker.reserve('facebook', 1)
+        self.assertFalse(self.limiter.reserve('facebook', 1)[0])
+        cache.clear()
@@ -0,0 +1,182 @@
+from unittest.mock import MagicMock, patch
+
+import requests
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils.http import http_date
+
+from ..models import Post, PostPlatformLink, SocialAccount
+from ..resilience import CircuitBreaker, CircuitOpenError, TransientError, backoff, circuit_breaker, parse_retry_after
+from ..services import FacebookService, LinkedInService
+from ..tasks import publish_post_task
+
+BREAKER = {'FAILURES': 3, 'WINDOW': 60, 'COOLDOWN': 30}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _response(status_code, headers=None):
+    return MagicMock(status_code=status_code, headers=headers or {}, text=f'status {status_code}')
+
+
+class BackoffTest(SimpleTestCase):
+    def test_exponential_with_jitter_and_retry_after(self):
+        for attempt in range(4):
+            self.assertTrue(0.25 * 2 ** attempt <= backoff(attempt) <= 0.5 * 2 ** attempt)
+        self.assertEqual(backoff(0, retry_after=120), 120)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('30'), 30.0)
+        self.assertEqual(parse_retry_after(http_date(1090), now=1000), 90)
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertIsNone(parse_retry_after(None))
+
+
+@override_settings(SOCIAL_CIRCUIT_BREAKER=BREAKER)
+class CircuitBreakerTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(clock=self.clock)
+
+    def test_opens_after_failures_then_half_opens(self):
+        for _ in range(2):
+            self.breaker.record_failure('linkedin')
+        self.breaker.check('linkedin')
+        self.breaker.record_failure('linkedin')
+        with self.assertRaises(CircuitOpenError) as ctx:
+            self.breaker.check('linkedin')
+        self.assertEqual(ctx.exception.retry_after, 30)
+        # other platforms keep flowing
+        self.breaker.check('facebook')
+
+        self.clock.now += 31
+        self.breaker.check('linkedin')
+        # one failure after the cooldown reopens the circuit, a success closes it
+        self.breaker.record_failure('linkedin')
+        self.assertEqual(self.breaker.retry_after('linkedin'), 30)
+        self.clock.now += 31
+        self.breaker.record_success('linkedin')
+        self.breaker.record_failure('linkedin')
+        self.assertEqual(self.breaker.retry_after('linkedin'), 0)
+
+    @override_settings(SOCIAL_CIRCUIT_BREAKER=dict(BREAKER, youtube={'FAILURES': 1}))
+    def test_per_platform_config(self):
+        self.breaker.record_failure('youtube')
+        self.assertEqual(self.breaker.retry_after('youtube'), 30)
+
+
+@override_settings(SOCIAL_CIRCUIT_BREAKER=BREAKER)
+@patch('posts.services.time.sleep')
+class ResilientRequestTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch('requests.Session.get')
+    def test_reads_are_retried_with_backoff(self, mock_get, mock_sleep):
+        mock_get.side_effect = [_response(503), requests.exceptions.ReadTimeout('slow'), _response(200)]
+        self.assertEqual(FacebookService('t')._get('https://graph.facebook.com/v19.0/me').status_code, 200)
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    @patch('requests.Session.get')
+    def test_long_retry_after_is_left_to_the_caller(self, mock_get, mock_sleep):
+        mock_get.return_value = _response(429, {'Retry-After': '600'})
+        with self.assertRaises(TransientError) as ctx:
+            FacebookService('t')._get('https://graph.facebook.com/v19.0/me')
+        self.assertEqual(ctx.exception.retry_after, 600)
+        self.assertEqual(mock_get.call_count, 1)
+        mock_sleep.assert_not_called()
+
+    @patch('requests.Session.post')
+    def test_writes_are_only_retried_when_rejected(self, mock_post, mock_sleep):
+        mock_post.side_effect = [_response(429), _response(201)]
+        self.assertEqual(LinkedInService('t')._post('https://api.linkedin.com/v2/ugcPosts').status_code, 201)
+        # a 500 or read timeout may have created the post: report it, never repeat it
+        mock_post.side_effect = [_response(500)]
+        self.assertEqual(LinkedInService('t')._post('https://api.linkedin.com/v2/ugcPosts').status_code, 500)
+        mock_post.side_effect = requests.exceptions.ReadTimeout('slow')
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            LinkedInService('t')._post('https://api.linkedin.com/v2/ugcPosts')
+        self.assertEqual(mock_post.call_count, 4)
+
+    @patch('requests.Session.get')
+    def test_open_circuit_fails_fast(self, mock_get, mock_sleep):
+        mock_get.side_effect = requests.exceptions.ConnectionError('down')
+        with self.assertRaises(TransientError):
+            FacebookService('t')._get('https://graph.facebook.com/v19.0/me')
+        self.assertEqual(mock_get.call_count, 3)
+        with self.assertRaises(CircuitOpenError):
+            FacebookService('t')._get('https://graph.facebook.com/v19.0/me')
+        self.assertEqual(mock_get.call_count, 3)
+        # LinkedIn is unaffected
+        mock_get.side_effect = None
+        mock_get.return_value = _response(200)
+        self.assertEqual(LinkedInService('t')._get('https://api.linkedin.com/v2/me').status_code, 200)
+
+
+User = get_user_model()
+
+
+@override_settings(SOCIAL_CIRCUIT_BREAKER=BREAKER, SOCIAL_PUBLISH_MAX_RETRIES=2)
+class PublishRetryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='nina', password='pw')
+        self.post = Post.objects.create(user=user, content='Hello', status='publishing')
+        self.accounts = {}
+        for platform in ('linkedin', 'youtube'):
+            account = self.accounts[platform] = SocialAccount.objects.create(
+                user=user, platform=platform, platform_user_id=platform, access_token='t'
+            )
+            PostPlatformLink.objects.create(post=self.post, social_account=account)
+
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_transient_failures_are_rescheduled_then_failed(self, mock_publish):
+        def publish(platform, **kwargs):
+            if platform == 'linkedin':
+                raise TransientError('linkedin: HTTP 503', retry_after=120)
+            return {'status': 'success', 'platform_post_id': 'yt1'}
+        mock_publish.side_effect = publish
+
+        publish_post_task(self.post.id, max_workers=1)
+        self.post.refresh_from_db()
+        link = self.post.platform_links.get(social_account__platform='linkedin')
+        self.assertEqual((self.post.status, link.status, link.retry_count), ('scheduled', 'scheduled', 1))
+        self.assertEqual(self.post.platform_links.get(social_account__platform='youtube').status, 'published')
+        # the retry time is kept apart from the user's schedule
+        self.assertIsNone(self.post.scheduled_at)
+        delay = (self.post.next_attempt_at - self.post.updated_at).total_seconds()
+        self.assertAlmostEqual(delay, 120, delta=1)
+
+        publish_post_task(self.post.id, max_workers=1)
+        publish_post_task(self.post.id, max_workers=1)
+        link.refresh_from_db()
+        self.assertEqual((link.status, link.retry_count), ('failed', 2))
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.status, self.post.next_attempt_at), ('failed', None))
+
+        # failed links are not tried again by later runs
+        calls = mock_publish.call_count
+        publish_post_task(self.post.id, max_workers=1)
+        self.assertEqual(mock_publish.call_count, calls)
+
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_open_circuit_defers_without_a_call(self, mock_publish):
+        mock_publish.return_value = {'status': 'success', 'platform_post_id': 'x'}
+        for _ in range(3):
+            circuit_breaker.record_failure('linkedin')
+
+        publish_post_task(self.post.id, max_workers=1)
+        self.assertEqual([c.kwargs['platform'] for c in mock_publish.call_args_list], ['youtube'])
+        link = self.post.platform_links.get(social_account__platform='linkedin')
+        self.assertEqual((link.status, link.retry_count), ('scheduled', 0))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'scheduled')
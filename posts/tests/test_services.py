@@ -1,16 +1,25 @@
-from django.test import TestCase
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from unittest.mock import patch, MagicMock
-from ..services import SocialMediaManager, LinkedInService, FacebookService, InstagramService, YouTubeService
+from ..models import SocialAccount
+from ..services import SocialMediaManager, GraphBatch, LinkedInService, FacebookService, InstagramService, YouTubeService
 
 class SocialMediaServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
     def test_manager_get_services(self):
         self.assertIsInstance(SocialMediaManager.get_service('linkedin', 'token'), LinkedInService)
         self.assertIsInstance(SocialMediaManager.get_service('facebook', 'token'), FacebookService)
         self.assertIsInstance(SocialMediaManager.get_service('instagram', 'token'), InstagramService)
         self.assertIsInstance(SocialMediaManager.get_service('youtube', 'token'), YouTubeService)
 
-    @patch('requests.get')
-    @patch('requests.post')
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
     def test_linkedin_publish_success(self, mock_post, mock_get):
         mock_get.return_value.json.return_value = {'id': 'user123'}
         mock_get.return_value.status_code = 200
@@ -22,7 +31,7 @@ class SocialMediaServiceTest(TestCase):
         self.assertEqual(result['status'], 'success')
         self.assertEqual(result['platform_post_id'], 'link123')
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_facebook_publish_success(self, mock_post):
         mock_post.return_value.json.return_value = {'id': 'fb123'}
         mock_post.return_value.status_code = 200
@@ -32,7 +41,7 @@ class SocialMediaServiceTest(TestCase):
         self.assertEqual(result['status'], 'success')
         self.assertEqual(result['platform_post_id'], 'fb123')
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_instagram_publish_success(self, mock_post):
         # Mock container creation and publishing
         mock_post.side_effect = [
@@ -45,10 +54,206 @@ class SocialMediaServiceTest(TestCase):
         self.assertEqual(result['status'], 'success')
         self.assertEqual(result['platform_post_id'], 'ig123')
 
+    @patch('requests.Session.get')
+    def test_facebook_metrics_batched_by_ids(self, mock_get):
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = {
+            'p1': {'reactions': {'summary': {'total_count': 5}}, 'comments': {'summary': {'total_count': 2}}, 'shares': {'count': 1}},
+            'p2': {'reactions': {'summary': {'total_count': 0}}},
+        }
+        result = FacebookService('token').fetch_metrics(['p1', 'p2'])
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(mock_get.call_args.kwargs['params']['ids'], 'p1,p2')
+        self.assertEqual(result['p1'], {'likes': 5, 'comments': 2, 'shares': 1})
+        self.assertEqual(result['p2'], {'likes': 0, 'comments': 0, 'shares': 0})
+
+    @patch('requests.Session.get')
+    def test_linkedin_metrics_batch_get(self, mock_get):
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = {'results': {
+            'urn:li:share:1': {'likesSummary': {'totalLikes': 7}, 'commentsSummary': {'aggregatedTotalComments': 3}},
+        }}
+        result = LinkedInService('token').fetch_metrics(['urn:li:share:1', 'urn:li:share:2'])
+        self.assertIn('ids=List(urn%3Ali%3Ashare%3A1,urn%3Ali%3Ashare%3A2)', mock_get.call_args.args[0])
+        self.assertEqual(result, {'urn:li:share:1': {'likes': 7, 'comments': 3}})
+
     def test_authenticate_methods(self):
-         with patch('requests.get') as mock_get:
+         with patch('requests.Session.get') as mock_get:
             mock_get.return_value.status_code = 200
+            mock_get.return_value.json.return_value = {'id': 'user123'}
             self.assertTrue(FacebookService('token').authenticate())
             self.assertTrue(LinkedInService('token').authenticate())
             self.assertTrue(InstagramService('token').authenticate())
             self.assertTrue(YouTubeService('token').authenticate())
+
+
+class LinkedInIdentityCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = get_user_model().objects.create_user(username='bob', password='pw')
+        self.account = SocialAccount.objects.create(
+            user=user, platform='linkedin', platform_user_id='', access_token='li-token'
+        )
+
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
+    def test_member_id_fetched_once_and_written_through(self, mock_post, mock_get):
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = {'id': 'member42'}
+        mock_post.return_value.status_code = 201
+        mock_post.return_value.json.return_value = {'id': 'urn:li:share:1'}
+
+        for _ in range(3):
+            result = SocialMediaManager.publish('linkedin', 'li-token', 'Hello', account=self.account)
+            self.assertEqual(result['status'], 'success')
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(mock_post.call_count, 3)
+        self.assertEqual(mock_post.call_args.kwargs['json']['author'], 'urn:li:person:member42')
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.platform_user_id, 'member42')
+
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
+    def test_stored_member_id_skips_the_lookup(self, mock_post, mock_get):
+        SocialAccount.objects.filter(pk=self.account.pk).update(platform_user_id='member9')
+        self.account.refresh_from_db()
+        mock_post.return_value.status_code = 201
+        mock_post.return_value.json.return_value = {'id': 'urn:li:share:1'}
+
+        result = SocialMediaManager.publish('linkedin', 'li-token', 'Hello', account=self.account)
+
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(mock_post.call_args.kwargs['json']['author'], 'urn:li:person:member9')
+        mock_get.assert_not_called()
+
+    @patch('requests.Session.get')
+    def test_failed_lookup_is_not_cached(self, mock_get):
+        mock_get.return_value.status_code = 403
+        self.assertFalse(LinkedInService('li-token').authenticate())
+        self.assertFalse(LinkedInService('li-token').authenticate())
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.Session.get')
+    def test_rejected_token_is_remembered(self, mock_get):
+        mock_get.return_value.status_code = 401
+        self.assertIsNone(LinkedInService('li-token').get_member_id())
+        self.assertIsNone(LinkedInService('li-token').get_member_id())
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertIs(LinkedInService('li-token').cached_authentication(), False)
+
+    @patch('requests.Session.get')
+    def test_concurrent_lookups_share_one_request(self, mock_get):
+        def me(url, **kwargs):
+            time.sleep(0.2)
+            return MagicMock(status_code=200, json=lambda: {'id': 'member7'})
+        mock_get.side_effect = me
+        with ThreadPoolExecutor(8) as pool:
+            ids = list(pool.map(lambda _: LinkedInService('li-token').get_member_id(), range(8)))
+        self.assertEqual(ids, ['member7'] * 8)
+        self.assertEqual(mock_get.call_count, 1)
+
+
+class TokenRefreshServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch('requests.Session.get')
+    def test_is_authenticated_is_cached(self, mock_get):
+        mock_get.return_value.status_code = 200
+        self.assertTrue(FacebookService('token').is_authenticated())
+        self.assertTrue(FacebookService('token').is_authenticated())
+        self.assertEqual(mock_get.call_count, 1)
+        mock_get.return_value.status_code = 401
+        self.assertFalse(FacebookService('other').is_authenticated())
+
+    @patch('requests.Session.post')
+    def test_linkedin_refresh_grant(self, mock_post):
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.json.return_value = {'access_token': 'new', 'expires_in': 5184000}
+        token = LinkedInService('old').refresh_access_token('refresh')
+        self.assertEqual(token, {'access_token': 'new', 'expires_in': 5184000, 'refresh_token': None})
+        self.assertEqual(mock_post.call_args.kwargs['data']['grant_type'], 'refresh_token')
+        self.assertIsNone(LinkedInService('old').refresh_access_token(None))
+
+
+def _batch_reply(*items):
+    return MagicMock(status_code=200, json=lambda: [
+        None if item is None else {'code': item[0], 'body': json.dumps(item[1])} for item in items
+    ])
+
+
+class GraphBatchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch('requests.Session.post')
+    def test_batch_is_sent_with_the_app_token(self, mock_post):
+        mock_post.return_value = _batch_reply((200, {}), (200, {}))
+        batch = GraphBatch()
+        batch.add('expired', ('GET', 'me', 'expired-token', {}))
+        batch.add('live', ('GET', 'me', 'live-token', {}))
+        with override_settings(SOCIALACCOUNT_PROVIDERS={'facebook': {'APP': {'client_id': 'app', 'secret': 's3cret'}}}):
+            batch.execute()
+        data = mock_post.call_args.kwargs['data']
+        self.assertEqual(data['access_token'], 'app|s3cret')
+        self.assertEqual(
+            [op['relative_url'] for op in json.loads(data['batch'])],
+            ['me?access_token=expired-token', 'me?access_token=live-token'],
+        )
+
+    @override_settings(INSTAGRAM_BUSINESS_ID='biz')
+    @patch('requests.Session.post')
+    def test_publish_graph_batch_uses_two_requests(self, mock_post):
+        mock_post.side_effect = [
+            # feed post, two container creations, one failed container
+            _batch_reply((200, {'id': 'fb1'}), (200, {'id': 'c1'}), (200, {'id': 'c2'}), (400, {'error': {'message': 'bad image'}})),
+            # container publishes
+            _batch_reply((200, {'id': 'ig1'}), None),
+        ]
+        results = SocialMediaManager.publish_graph_batch([
+            ('a', 'facebook', 'page', 'Hello', None),
+            ('b', 'instagram', 'ig', 'Pic 1', 'https://example.com/1.jpg'),
+            ('c', 'instagram', 'ig', 'Pic 2', 'https://example.com/2.jpg'),
+            ('d', 'instagram', 'ig', 'Pic 3', 'https://example.com/3.jpg'),
+            ('e', 'instagram', 'ig', 'No media', None),
+        ])
+
+        self.assertEqual(mock_post.call_count, 2)
+        first_batch = json.loads(mock_post.call_args_list[0].kwargs['data']['batch'])
+        self.assertEqual([op['relative_url'] for op in first_batch], ['me/feed', 'biz/media', 'biz/media', 'biz/media'])
+        self.assertIn('creation_id=c1', json.loads(mock_post.call_args_list[1].kwargs['data']['batch'])[0]['body'])
+        self.assertEqual(results['a'], {'status': 'success', 'platform_post_id': 'fb1'})
+        self.assertEqual(results['b'], {'status': 'success', 'platform_post_id': 'ig1'})
+        # Graph returned null: the publish may have run, so it is not repeated
+        self.assertEqual(results['c']['status'], 'failed')
+        self.assertIn('Outcome unknown', results['c']['error'])
+        self.assertIn('bad image', results['d']['error'])
+        self.assertEqual(results['e']['status'], 'failed')
+
+    @patch('requests.Session.post')
+    def test_only_unsent_batches_are_retried(self, mock_post):
+        import requests
+        jobs = [('a', 'facebook', 'page', 'Hello', None), ('b', 'facebook', 'page', 'Again', None)]
+
+        mock_post.side_effect = requests.exceptions.ReadTimeout('read timed out')
+        results = SocialMediaManager.publish_graph_batch(jobs)
+        self.assertEqual([r['status'] for r in results.values()], ['failed', 'failed'])
+        self.assertEqual(mock_post.call_count, 1)
+
+        mock_post.reset_mock()
+        mock_post.side_effect = requests.exceptions.ConnectTimeout('connect timed out')
+        with override_settings(SOCIAL_RETRY={'ATTEMPTS': 1}):
+            results = SocialMediaManager.publish_graph_batch(jobs)
+        self.assertEqual([r['status'] for r in results.values()], ['retry', 'retry'])
+
+    @patch('requests.Session.post')
+    def test_batches_are_split_at_fifty_operations(self, mock_post):
+        mock_post.side_effect = lambda url, data=None, **kw: _batch_reply(*[(200, {'id': 'x'})] * len(json.loads(data['batch'])))
+        batch = GraphBatch()
+        for i in range(120):
+            batch.add(i, FacebookService('page').feed_operation(f'post {i}'))
+        results = batch.execute()
+        self.assertEqual(mock_post.call_count, 3)
+        self.assertEqual(len(results), 120)
+        self.assertTrue(all(code == 200 for code, _ in results.values()))
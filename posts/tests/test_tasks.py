@@ -0,0 +1,540 @@
+import json
+import threading
+import time
+from urllib.parse import parse_qs
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from ..checks import shared_cache_check
+from ..models import Post, PostPlatformLink, SocialAccount
+from ..routing import route_task
+from ..services import SocialMediaManager
+from ..tasks import (
+    publish_post_task, publish_link_task, dispatch_due_posts, poll_instagram_containers, refresh_expiring_tokens,
+    rollup_post_task,
+)
+
+User = get_user_model()
+
+
+def _graph_batch_through_publish(jobs, **kwargs):
+    # Stand-in for the Graph batch: publishes each job through the (patched) publish()
+    results = {}
+    for key, platform, access_token, content, media_url in jobs:
+        try:
+            results[key] = SocialMediaManager.publish(platform=platform, access_token=access_token, content=content, media_url=media_url)
+        except Exception as e:
+            results[key] = {'status': 'failed', 'error': str(e)}
+    return results
+
+
+class PublishPostTaskTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='alice', password='pw')
+        self.post = Post.objects.create(user=self.user, content='Hello world', status='scheduled')
+        for platform in ('linkedin', 'facebook', 'instagram'):
+            account = SocialAccount.objects.create(
+                user=self.user, platform=platform, platform_user_id=f'{platform}-id', access_token=f'{platform}-token'
+            )
+            PostPlatformLink.objects.create(post=self.post, social_account=account)
+        patcher = patch('posts.tasks.SocialMediaManager.publish_graph_batch', side_effect=_graph_batch_through_publish)
+        self.mock_graph = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_fan_out_runs_links_concurrently(self, mock_publish):
+        def slow_publish(platform, **kwargs):
+            time.sleep(0.2)
+            return {'status': 'success', 'platform_post_id': f'{platform}-post'}
+        mock_publish.side_effect = slow_publish
+
+        def slow_batch(jobs, **kwargs):
+            time.sleep(0.2)
+            return {key: {'status': 'success', 'platform_post_id': f'{platform}-post'} for key, platform, *_ in jobs}
+        self.mock_graph.side_effect = slow_batch
+
+        started = time.monotonic()
+        publish_post_task(self.post.id, max_workers=3)
+        self.assertLess(time.monotonic() - started, 0.5)
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'published')
+        self.assertIsNotNone(self.post.published_at)
+        self.assertEqual(
+            set(self.post.platform_links.values_list('platform_post_id', flat=True)),
+            {'linkedin-post', 'facebook-post', 'instagram-post'},
+        )
+
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_pool_threads_outlive_the_task(self, mock_publish):
+        threads = []
+
+        def publish(platform, **kwargs):
+            threads.append(threading.current_thread())
+            return {'status': 'success', 'platform_post_id': f'{platform}-post'}
+        mock_publish.side_effect = publish
+
+        publish_post_task(self.post.id, max_workers=2)
+        first = set(threads)
+        other = Post.objects.create(user=self.user, content='Again', status='scheduled')
+        PostPlatformLink.objects.bulk_create(
+            PostPlatformLink(post=other, social_account=link.social_account) for link in self.post.platform_links.all()
+        )
+        publish_post_task(other.id, max_workers=2)
+        # Same threads, so their cached YouTube clients are reused by the next post
+        self.assertLessEqual(set(threads), first)
+
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_one_failed_platform_fails_the_post(self, mock_publish):
+        def publish(platform, **kwargs):
+            if platform == 'instagram':
+                raise RuntimeError('container rejected')
+            return {'status': 'success', 'platform_post_id': f'{platform}-post'}
+        mock_publish.side_effect = publish
+
+        publish_post_task(self.post.id, max_workers=3)
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'failed')
+        failed = self.post.platform_links.get(social_account__platform='instagram')
+        self.assertEqual(failed.status, 'failed')
+        self.assertEqual(failed.error_message, 'container rejected')
+
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_sequential_mode(self, mock_publish):
+        mock_publish.return_value = {'status': 'success', 'platform_post_id': 'x'}
+        publish_post_task(self.post.id, max_workers=1)
+        self.assertEqual(mock_publish.call_count, 3)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'published')
+
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_graph_links_share_one_batch(self, mock_publish):
+        mock_publish.return_value = {'status': 'success', 'platform_post_id': 'x'}
+        publish_post_task(self.post.id, max_workers=3)
+        self.assertEqual(self.mock_graph.call_count, 1)
+        platforms = sorted(job[1] for job in self.mock_graph.call_args.args[0])
+        self.assertEqual(platforms, ['facebook', 'instagram'])
+
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_one_update_per_platform_call(self, mock_publish):
+        mock_publish.return_value = {'status': 'success', 'platform_post_id': 'x'}
+        # post, links+accounts, one UPDATE per unit (LinkedIn, the Graph batch), then the
+        # locked post, its link statuses and the post UPDATE inside a savepoint
+        with self.assertNumQueries(9):
+            publish_post_task(self.post.id, max_workers=1)
+
+        # Results are saved as each call returns, so every non-Graph link costs one UPDATE
+        for count, queries in ((1, 8), (10, 17)):
+            other = Post.objects.create(user=self.user, content=f'{count} links', status='scheduled')
+            accounts = [
+                SocialAccount.objects.create(user=self.user, platform='linkedin', platform_user_id=str(i), access_token=str(i))
+                for i in range(count)
+            ]
+            PostPlatformLink.objects.bulk_create(PostPlatformLink(post=other, social_account=a) for a in accounts)
+            with self.assertNumQueries(queries):
+                publish_post_task(other.id, max_workers=1)
+            self.assertEqual(other.platform_links.filter(status='published').count(), count)
+
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_results_are_saved_before_the_task_ends(self, mock_publish):
+        mock_publish.return_value = {'status': 'success', 'platform_post_id': 'x'}
+        # The worker dies after the platforms answered but before the post is settled
+        with patch('posts.tasks._finish_post', side_effect=SystemExit), self.assertRaises(SystemExit):
+            publish_post_task(self.post.id, max_workers=1)
+        self.assertEqual(set(self.post.platform_links.values_list('status', flat=True)), {'published'})
+
+        # the redelivered task publishes nothing again
+        mock_publish.reset_mock()
+        self.mock_graph.reset_mock()
+        publish_post_task(self.post.id, max_workers=1)
+        mock_publish.assert_not_called()
+        self.mock_graph.assert_not_called()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'published')
+
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_status_comes_from_the_database_not_the_loaded_links(self, mock_publish):
+        instagram = self.post.platform_links.get(social_account__platform='instagram')
+        PostPlatformLink.objects.filter(id=instagram.id).update(
+            status='publishing', container_id='c1', container_state='container_created'
+        )
+
+        def publish(platform, **kwargs):
+            # The container poller publishes Instagram while this task is still running
+            PostPlatformLink.objects.filter(id=instagram.id).update(status='published', container_state='published')
+            return {'status': 'success', 'platform_post_id': f'{platform}-post'}
+        mock_publish.side_effect = publish
+
+        publish_post_task(self.post.id, max_workers=1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'published')
+
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_rejected_tokens_are_not_called(self, mock_publish):
+        mock_publish.return_value = {'status': 'success', 'platform_post_id': 'x'}
+        SocialMediaManager.get_service('linkedin', 'linkedin-token').remember_authentication(False)
+        publish_post_task(self.post.id, max_workers=1)
+        self.assertNotIn('linkedin', [c.kwargs['platform'] for c in mock_publish.call_args_list])
+        link = self.post.platform_links.get(social_account__platform='linkedin')
+        self.assertEqual(link.status, 'failed')
+        self.assertIn('rejected the access token', link.error_message)
+
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_published_links_are_skipped(self, mock_publish):
+        mock_publish.return_value = {'status': 'success', 'platform_post_id': 'x'}
+        self.post.platform_links.filter(social_account__platform='linkedin').update(status='published')
+        publish_post_task(self.post.id, max_workers=1)
+        self.assertEqual(mock_publish.call_count, 2)
+
+    @override_settings(SOCIAL_RATE_LIMITS={'facebook': {'RATE': 1 / 60, 'BURST': 1}}, SOCIAL_RATE_LIMIT_MAX_WAIT=0)
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_rate_limited_links_are_deferred_not_failed(self, mock_publish):
+        mock_publish.return_value = {'status': 'success', 'platform_post_id': 'x'}
+        account = SocialAccount.objects.get(platform='facebook')
+        second = Post.objects.create(user=self.user, content='Second', status='publishing')
+        PostPlatformLink.objects.create(post=second, social_account=account)
+
+        publish_post_task(self.post.id, max_workers=1)
+        publish_post_task(second.id, max_workers=1)
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'published')
+        second.refresh_from_db()
+        self.assertEqual(second.status, 'scheduled')
+        self.assertGreater(second.next_attempt_at, timezone.now() + timedelta(seconds=50))
+        self.assertIsNone(second.scheduled_at)
+        self.assertEqual(second.platform_links.get().status, 'scheduled')
+        self.assertEqual(mock_publish.call_count, 3)
+
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_expired_tokens_fail_without_a_call(self, mock_publish):
+        mock_publish.return_value = {'status': 'success', 'platform_post_id': 'x'}
+        SocialAccount.objects.filter(platform='linkedin').update(expires_at=timezone.now() - timedelta(minutes=1))
+        publish_post_task(self.post.id, max_workers=1)
+        self.assertEqual(mock_publish.call_count, 2)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'failed')
+        self.assertIn('expired', self.post.platform_links.get(social_account__platform='linkedin').error_message)
+
+
+class DispatchDuePostsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='frank', password='pw')
+        now = timezone.now()
+        self.due = [
+            Post.objects.create(user=self.user, content=f'due {i}', status='scheduled', scheduled_at=now - timedelta(minutes=i))
+            for i in range(5)
+        ]
+        self.future = Post.objects.create(user=self.user, content='later', status='scheduled', scheduled_at=now + timedelta(days=3))
+        self.draft = Post.objects.create(user=self.user, content='draft', scheduled_at=now - timedelta(days=1))
+
+    @patch('posts.tasks.publish_post_task.delay')
+    def test_claims_and_dispatches_only_due_posts(self, mock_delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            dispatched = dispatch_due_posts(batch_size=2)
+
+        self.assertEqual(dispatched, 5)
+        self.assertEqual(sorted(c.args[0] for c in mock_delay.call_args_list), sorted(p.id for p in self.due))
+        self.assertEqual(Post.objects.filter(status='publishing').count(), 5)
+        self.future.refresh_from_db()
+        self.assertEqual(self.future.status, 'scheduled')
+
+    @patch('posts.tasks.publish_post_task.delay')
+    def test_claimed_posts_are_not_dispatched_twice(self, mock_delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            dispatch_due_posts()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(dispatch_due_posts(), 0)
+        self.assertEqual(mock_delay.call_count, 5)
+
+    @patch('posts.tasks.publish_post_task.delay')
+    def test_max_batches_bounds_one_sweep(self, mock_delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(dispatch_due_posts(batch_size=2, max_batches=1), 2)
+
+    @patch('posts.tasks.publish_post_task.delay')
+    def test_deferred_posts_are_due_at_their_next_attempt(self, mock_delay):
+        now = timezone.now()
+        Post.objects.filter(id=self.due[0].id).update(next_attempt_at=now + timedelta(minutes=5))
+        Post.objects.filter(id=self.future.id).update(next_attempt_at=now - timedelta(seconds=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            dispatch_due_posts()
+        dispatched = {c.args[0] for c in mock_delay.call_args_list}
+        self.assertEqual(dispatched, {p.id for p in self.due[1:]} | {self.future.id})
+
+    @patch('posts.tasks.publish_post_task.delay')
+    def test_stale_publishing_posts_are_recovered(self, mock_delay):
+        Post.objects.filter(id__in=[p.id for p in self.due]).update(status='draft')
+        account = SocialAccount.objects.create(user=self.user, platform='instagram', platform_user_id='ig', access_token='t')
+        done, unfinished, in_flight = [
+            Post.objects.create(user=self.user, content=name, status='publishing') for name in ('done', 'unfinished', 'in flight')
+        ]
+        PostPlatformLink.objects.create(post=done, social_account=account, status='published')
+        PostPlatformLink.objects.create(post=unfinished, social_account=account, status='scheduled')
+        PostPlatformLink.objects.create(
+            post=in_flight, social_account=account, status='publishing', container_id='c', container_state='ready'
+        )
+        Post.objects.filter(status='publishing').update(updated_at=timezone.now() - timedelta(hours=2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            dispatch_due_posts()
+
+        statuses = dict(Post.objects.filter(id__in=[done.id, unfinished.id, in_flight.id]).values_list('content', 'status'))
+        self.assertEqual(statuses, {'done': 'published', 'unfinished': 'publishing', 'in flight': 'publishing'})
+        # 'unfinished' went back to the scheduler and was claimed again by the same sweep
+        self.assertEqual([c.args[0] for c in mock_delay.call_args_list], [unfinished.id])
+
+    def test_post_without_links_does_not_stay_publishing(self):
+        # eager: the sweep runs publish_post_task right after claiming the posts
+        with self.captureOnCommitCallbacks(execute=True):
+            dispatch_due_posts()
+        self.assertEqual(set(Post.objects.filter(id__in=[p.id for p in self.due]).values_list('status', flat=True)), {'failed'})
+
+
+def _batch_reply(*bodies):
+    return MagicMock(status_code=200, json=lambda: [{'code': 200, 'body': json.dumps(body)} for body in bodies])
+
+
+@override_settings(INSTAGRAM_BUSINESS_ID='biz')
+class InstagramContainerTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='lena', password='pw')
+        self.account = SocialAccount.objects.create(user=self.user, platform='instagram', platform_user_id='ig', access_token='ig-token')
+        self.post = Post.objects.create(user=self.user, content='Caption', media_url='https://example.com/a.jpg', status='publishing')
+        self.link = PostPlatformLink.objects.create(post=self.post, social_account=self.account)
+
+    @patch('requests.Session.post')
+    def test_publish_only_creates_the_container(self, mock_post):
+        mock_post.return_value = MagicMock(status_code=200, json=lambda: {'id': 'c1'})
+        publish_post_task(self.post.id)
+
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertTrue(mock_post.call_args.args[0].endswith('/biz/media'))
+        self.link.refresh_from_db()
+        self.assertEqual((self.link.status, self.link.container_id, self.link.container_state), ('publishing', 'c1', 'container_created'))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'publishing')
+
+    def _pending(self, container_id='c1'):
+        PostPlatformLink.objects.filter(pk=self.link.pk).update(
+            status='publishing', container_id=container_id, container_state='container_created'
+        )
+
+    @patch('requests.Session.post')
+    def test_poll_leaves_in_progress_containers_alone(self, mock_post):
+        self._pending()
+        mock_post.return_value = _batch_reply({'c1': {'status_code': 'IN_PROGRESS', 'id': 'c1'}})
+        self.assertEqual(poll_instagram_containers(), 0)
+        self.link.refresh_from_db()
+        self.assertEqual(self.link.container_state, 'container_created')
+
+    @patch('requests.Session.post')
+    def test_poll_publishes_finished_containers_and_rolls_up(self, mock_post):
+        self._pending()
+        mock_post.side_effect = [
+            _batch_reply({'c1': {'status_code': 'FINISHED', 'id': 'c1'}}),
+            _batch_reply({'id': 'ig-media-1'}),
+        ]
+        self.assertEqual(poll_instagram_containers(), 1)
+
+        self.assertIn('creation_id=c1', json.loads(mock_post.call_args.kwargs['data']['batch'])[0]['body'])
+        self.link.refresh_from_db()
+        self.assertEqual((self.link.status, self.link.platform_post_id, self.link.container_state), ('published', 'ig-media-1', 'published'))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'published')
+        self.assertIsNotNone(self.post.published_at)
+
+    @patch('requests.Session.post')
+    def test_poll_fails_errored_containers(self, mock_post):
+        self._pending()
+        mock_post.return_value = _batch_reply({'c1': {'status_code': 'ERROR', 'id': 'c1'}})
+        poll_instagram_containers()
+        self.link.refresh_from_db()
+        self.assertEqual((self.link.status, self.link.container_state), ('failed', 'error'))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'failed')
+
+    @override_settings(INSTAGRAM_CONTAINER_MAX_FAILURES=2)
+    @patch('requests.Session.post')
+    def test_unreadable_containers_are_given_up_and_polled_last(self, mock_post):
+        self._pending()
+        healthy = PostPlatformLink.objects.create(
+            post=Post.objects.create(user=self.user, content='later', status='publishing'), social_account=self.account,
+            status='publishing', container_id='c2', container_state='container_created',
+        )
+        mock_post.return_value = MagicMock(status_code=200, json=lambda: [
+            {'code': 400, 'body': json.dumps({'error': {'message': 'Error validating access token'}})}
+        ])
+
+        poll_instagram_containers(limit=1)
+        self.link.refresh_from_db()
+        self.assertEqual((self.link.status, self.link.container_failures), ('publishing', 1))
+
+        # the failing container yields its place to the one behind it
+        poll_instagram_containers(limit=1)
+        self.assertIn('c2', mock_post.call_args.kwargs['data']['batch'])
+        healthy.refresh_from_db()
+        self.assertEqual(healthy.container_failures, 1)
+
+        poll_instagram_containers(limit=1)
+        self.link.refresh_from_db()
+        self.assertEqual((self.link.status, self.link.container_state), ('failed', 'error'))
+        self.assertIn('Gave up on Instagram container c1', self.link.error_message)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'failed')
+
+    @patch('requests.Session.post')
+    def test_many_containers_checked_in_one_request(self, mock_post):
+        self._pending()
+        for i in range(2, 80):
+            post = Post.objects.create(user=self.user, content=f'c{i}', status='publishing')
+            PostPlatformLink.objects.create(
+                post=post, social_account=self.account, status='publishing', container_id=f'c{i}', container_state='container_created'
+            )
+        mock_post.return_value = MagicMock(status_code=200, json=lambda: [{'code': 200, 'body': '{}'}, {'code': 200, 'body': '{}'}])
+        poll_instagram_containers()
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(len(json.loads(mock_post.call_args.kwargs['data']['batch'])), 2)
+
+
+class RefreshExpiringTokensTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='omar', password='pw')
+        now = timezone.now()
+
+        def account(platform, token, expires_in, refresh_token=None):
+            return SocialAccount.objects.create(
+                user=self.user, platform=platform, platform_user_id=token, access_token=token,
+                refresh_token=refresh_token, expires_at=now + timedelta(seconds=expires_in),
+            )
+        self.fb = [account('facebook', f'fb{i}', 600) for i in range(3)]
+        self.ig = account('instagram', 'ig', 300)
+        self.li = account('linkedin', 'li', -600, refresh_token='li-refresh')
+        self.fresh = account('facebook', 'fresh', 30 * 86400)
+        self.dead = account('linkedin', 'dead', -10 * 86400, refresh_token='r')
+
+    @patch('requests.Session.post')
+    def test_refreshes_expiring_accounts_in_batches(self, mock_post):
+        def reply(url, data, **kwargs):
+            if 'linkedin' in url:
+                return MagicMock(status_code=200, json=lambda: {'access_token': 'li-new', 'expires_in': 5184000, 'refresh_token': 'li-refresh-2'})
+            exchanged = [parse_qs(op['relative_url'].split('?')[1])['fb_exchange_token'][0] for op in json.loads(data['batch'])]
+            return MagicMock(status_code=200, json=lambda: [
+                {'code': 200, 'body': json.dumps({'access_token': f'{token}-new', 'expires_in': 5184000})} for token in exchanged
+            ])
+        mock_post.side_effect = reply
+        self.assertEqual(refresh_expiring_tokens(), 5)
+
+        # one Graph batch per platform and one refresh grant; far and long expired accounts untouched
+        self.assertEqual(mock_post.call_count, 3)
+        self.assertEqual(SocialAccount.objects.get(pk=self.fb[1].pk).access_token, 'fb1-new')
+        li = SocialAccount.objects.get(pk=self.li.pk)
+        self.assertEqual((li.access_token, li.refresh_token), ('li-new', 'li-refresh-2'))
+        self.assertGreater(li.expires_at, timezone.now() + timedelta(days=50))
+        self.assertEqual(SocialAccount.objects.get(pk=self.fresh.pk).access_token, 'fresh')
+        self.assertEqual(SocialAccount.objects.get(pk=self.dead.pk).access_token, 'dead')
+
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
+    def test_failed_refresh_of_expired_token_is_remembered(self, mock_post, mock_get):
+        mock_post.side_effect = lambda url, **kwargs: (
+            MagicMock(status_code=400, text='invalid_grant') if 'linkedin' in url
+            else MagicMock(status_code=200, json=lambda: [{'code': 400, 'body': '{}'}] * len(json.loads(kwargs['data']['batch'])))
+        )
+        self.assertEqual(refresh_expiring_tokens(), 0)
+        self.assertEqual(SocialAccount.objects.get(pk=self.li.pk).access_token, 'li')
+        from ..services import LinkedInService
+        self.assertFalse(LinkedInService('li').is_authenticated())
+        mock_get.assert_not_called()
+
+
+@override_settings(SOCIAL_PUBLISH_PER_LINK=True)
+class PerLinkPublishTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='lena', password='pw')
+        self.post = Post.objects.create(user=user, content='Hello', status='publishing')
+        for platform in ('linkedin', 'facebook', 'youtube'):
+            account = SocialAccount.objects.create(user=user, platform=platform, platform_user_id=platform, access_token='t')
+            PostPlatformLink.objects.create(post=self.post, social_account=account)
+
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_links_publish_separately_and_roll_up(self, mock_publish):
+        mock_publish.return_value = {'status': 'success', 'platform_post_id': 'x'}
+        publish_post_task(self.post.id)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'published')
+        self.assertIsNotNone(self.post.published_at)
+        self.assertEqual(sorted(c.kwargs['platform'] for c in mock_publish.call_args_list), ['facebook', 'linkedin', 'youtube'])
+        self.assertEqual(set(self.post.platform_links.values_list('status', flat=True)), {'published'})
+
+        # a second run has nothing left to publish
+        publish_post_task(self.post.id)
+        self.assertEqual(mock_publish.call_count, 3)
+
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_failures_and_retries_in_the_rollup(self, mock_publish):
+        def publish(platform, **kwargs):
+            if platform == 'youtube':
+                return {'status': 'retry', 'error': 'HTTP 503', 'retry_after': 60}
+            if platform == 'facebook':
+                return {'status': 'failed', 'error': 'bad token'}
+            return {'status': 'success', 'platform_post_id': 'urn'}
+        mock_publish.side_effect = publish
+
+        publish_post_task(self.post.id)
+        self.post.refresh_from_db()
+        statuses = dict(self.post.platform_links.values_list('social_account__platform', 'status'))
+        self.assertEqual(statuses, {'linkedin': 'published', 'facebook': 'failed', 'youtube': 'scheduled'})
+        self.assertEqual(self.post.status, 'scheduled')
+        self.assertAlmostEqual((self.post.next_attempt_at - timezone.now()).total_seconds(), 60, delta=2)
+
+        # without pending retries the rollup settles on the link statuses
+        rollup_post_task([{'link_id': 1, 'status': 'failed', 'retry_in': None}], self.post.id)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'failed')
+
+
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_unsupported_platform_fails_before_dispatch(self, mock_publish):
+        mock_publish.return_value = {'status': 'success', 'platform_post_id': 'x'}
+        account = SocialAccount.objects.create(user=self.post.user, platform='x', platform_user_id='x', access_token='t')
+        PostPlatformLink.objects.create(post=self.post, social_account=account)
+
+        with patch('posts.tasks.publish_link_task.s', wraps=publish_link_task.s) as signature:
+            publish_post_task(self.post.id)
+        self.assertNotIn('x', [c.kwargs['platform'] for c in signature.call_args_list])
+        link = self.post.platform_links.get(social_account=account)
+        self.assertEqual((link.status, link.error_message), ('failed', 'Platform x not supported'))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'failed')
+
+
+class RouteTaskTest(TestCase):
+    def test_queues(self):
+        self.assertEqual(route_task('posts.tasks.publish_post_task', (1,), {}, {}), {'queue': 'publish'})
+        self.assertEqual(route_task('posts.tasks.poll_instagram_containers', (), {}, {}), {'queue': 'instagram'})
+        # anything sent with a platform keyword goes to that platform's queue
+        self.assertEqual(route_task('posts.tasks.publish_link_task', (1,), {'platform': 'youtube'}, {}), {'queue': 'youtube'})
+        # no worker consumes a queue for a platform without a service
+        self.assertIsNone(route_task('posts.tasks.publish_link_task', (1,), {'platform': 'x'}, {}))
+        self.assertIsNone(route_task('posts.tasks.dispatch_due_posts', (), None, {}))
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+    def test_workers_need_a_shared_cache(self):
+        with override_settings(CELERY_TASK_ALWAYS_EAGER=False):
+            self.assertEqual([w.id for w in shared_cache_check(None)], ['posts.W001'])
+            redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://x'}}
+            with override_settings(CACHES=redis):
+                self.assertEqual(shared_cache_check(None), [])
+        self.assertEqual(shared_cache_check(None), [])
@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..media import MediaStore
+from ..models import Post, PostPlatformLink, SocialAccount
+from ..tasks import publish_post_task
+from ..variants import Image, VariantRenderer, render_variant
+
+PROFILES = {
+    'instagram': {'FORMAT': 'JPEG', 'ASPECT': (4 / 5, 1.91), 'MAX_SIDE': 1440, 'MIN_SIDE': 320, 'QUALITY': 90},
+    'facebook': {'FORMAT': 'JPEG', 'MAX_SIDE': 2048, 'QUALITY': 90},
+}
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+@skipIf(Image is None, 'Pillow is not installed')
+@override_settings(SOCIAL_MEDIA_PROFILES=PROFILES, MEDIA_CACHE_URL='https://cdn.example.com/media/')
+class VariantRendererTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.root = tempfile.mkdtemp()
+        self.store = MediaStore(root=self.root, max_bytes=10 ** 8)
+        self.executor = CountingExecutor()
+        self.renderer = VariantRenderer(store=self.store, executor=self.executor)
+        self.source = os.path.join(self.root, 'upload.png')
+        Image.new('RGBA', (3000, 1000), (255, 0, 0, 128)).save(self.source)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        shutil.rmtree(self.root)
+
+    def test_render_crops_and_scales_to_the_profile(self):
+        out = os.path.join(self.root, 'out.jpg')
+        render_variant(self.source, PROFILES['instagram'], out)
+        with Image.open(out) as image:
+            self.assertEqual((image.format, image.mode), ('JPEG', 'RGB'))
+            self.assertEqual(image.width, 1440)
+            self.assertAlmostEqual(image.width / image.height, 1.91, places=2)
+
+        Image.new('RGB', (100, 400)).save(self.source)
+        render_variant(self.source, PROFILES['instagram'], out)
+        with Image.open(out) as image:
+            self.assertEqual(image.size, (320, 400))
+
+    def test_variants_are_rendered_once_per_asset_and_profile(self):
+        urls = self.renderer.prepare(self.source, ['instagram', 'facebook', 'linkedin'])
+        self.assertEqual(set(urls), {'instagram', 'facebook'})
+        self.assertTrue(urls['instagram'].startswith('https://cdn.example.com/media/'))
+        self.assertEqual(self.executor.submitted, 2)
+
+        self.assertEqual(self.renderer.prepare(self.source, ['instagram', 'facebook']), urls)
+        self.assertEqual(self.executor.submitted, 2)
+
+        # A changed profile gets its own variant
+        with override_settings(SOCIAL_MEDIA_PROFILES=dict(PROFILES, facebook={'FORMAT': 'JPEG', 'MAX_SIDE': 1200})):
+            self.assertNotEqual(self.renderer.prepare(self.source, ['facebook'])['facebook'], urls['facebook'])
+        self.assertEqual(self.executor.submitted, 3)
+
+    def test_falls_back_to_the_original(self):
+        self.assertEqual(self.renderer.prepare('https://example.com/clip.mp4', ['facebook']), {})
+        with override_settings(MEDIA_CACHE_URL=''):
+            self.assertEqual(self.renderer.prepare(self.source, ['facebook']), {})
+
+        with open(self.source, 'wb') as f:
+            f.write(b'not an image')
+        self.assertEqual(self.renderer.prepare(self.source, ['facebook']), {})
+        self.assertFalse(any(name.startswith('.download-') for name in os.listdir(self.root)))
+
+
+User = get_user_model()
+
+
+class PublishWithVariantsTest(TestCase):
+    @patch('posts.tasks.prepare_media')
+    @patch('posts.tasks.SocialMediaManager.publish')
+    def test_links_publish_their_platform_variant(self, mock_publish, mock_prepare):
+        user = User.objects.create_user(username='vera', password='pw')
+        post = Post.objects.create(user=user, content='Look', media_url='https://example.com/a.png', status='publishing')
+        for platform in ('linkedin', 'youtube'):
+            account = SocialAccount.objects.create(user=user, platform=platform, platform_user_id=platform, access_token='t')
+            PostPlatformLink.objects.create(post=post, social_account=account)
+        mock_prepare.return_value = {'linkedin': 'https://cdn.example.com/media/a.linkedin.jpg'}
+        mock_publish.return_value = {'status': 'success', 'platform_post_id': 'x'}
+
+        publish_post_task(post.id, max_workers=1)
+        mock_prepare.assert_called_once_with('https://example.com/a.png', {'linkedin', 'youtube'})
+        media = {c.kwargs['platform']: c.kwargs['media_url'] for c in mock_publish.call_args_list}
+        self.assertEqual(media, {
+            'linkedin': 'https://cdn.example.com/media/a.linkedin.jpg',
+            'youtube': 'https://example.com/a.png',
+        })
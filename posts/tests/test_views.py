@@ -0,0 +1,258 @@
+import csv
+import io
+import json
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from ..models import Post, PostPlatformLink, SocialAccount
+
+User = get_user_model()
+
+
+class PostListTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='dave', password='pw')
+        self.client.force_authenticate(self.user)
+        account = SocialAccount.objects.create(user=self.user, platform='facebook', platform_user_id='d', access_token='t')
+        posts = Post.objects.bulk_create(Post(user=self.user, content=f'post {i}') for i in range(7))
+        PostPlatformLink.objects.bulk_create(PostPlatformLink(post=p, social_account=account) for p in posts)
+        other = User.objects.create_user(username='eve', password='pw')
+        Post.objects.create(user=other, content='not mine')
+
+    def test_cursor_pagination_walks_every_post_once(self):
+        seen = []
+        url = '/api/posts/posts/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [post['id'] for post in response.data['results']]
+            url = response.data['next']
+        expected = list(Post.objects.filter(user=self.user).order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_platform_links_are_prefetched(self):
+        # one query for the page, one for all of its links
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/posts/posts/?page_size=5')
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertTrue(all(len(post['platform_links']) == 1 for post in response.data['results']))
+
+
+class SchedulePostTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='gina', password='pw')
+        self.client.force_authenticate(self.user)
+        self.post = Post.objects.create(user=self.user, content='later')
+
+    @patch('posts.tasks.publish_post_task.apply_async')
+    @patch('posts.tasks.publish_post_task.delay')
+    def test_schedule_only_writes_the_row(self, mock_delay, mock_apply_async):
+        response = self.client.post(
+            f'/api/posts/posts/{self.post.id}/schedule/', {'scheduled_at': '2030-01-01T09:00:00Z'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'scheduled')
+        self.assertEqual(self.post.scheduled_at.year, 2030)
+        mock_delay.assert_not_called()
+        mock_apply_async.assert_not_called()
+
+    @patch('posts.tasks.dispatch_due_posts.delay')
+    def test_schedule_matches_the_bulk_path(self, mock_dispatch):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/posts/posts/{self.post.id}/schedule/', {'scheduled_at': '2020-01-01T00:00:00Z'})
+        self.assertEqual(response.status_code, 200)
+        # already due: the sweep is kicked right away
+        mock_dispatch.assert_called_once()
+
+        Post.objects.filter(pk=self.post.pk).update(status='publishing')
+        response = self.client.post(f'/api/posts/posts/{self.post.id}/schedule/', {'scheduled_at': '2030-01-01T09:00:00Z'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Post.objects.get(pk=self.post.pk).status, 'publishing')
+        self.assertEqual(self.client.post(f'/api/posts/posts/{self.post.id}/schedule/', {'scheduled_at': 'soon'}).status_code, 400)
+
+    def test_rescheduling_retries_failed_links(self):
+        account = SocialAccount.objects.create(user=self.user, platform='linkedin', platform_user_id='g', access_token='t')
+        link = PostPlatformLink.objects.create(post=self.post, social_account=account, status='failed', retry_count=3, error_message='HTTP 503')
+        Post.objects.filter(pk=self.post.pk).update(status='failed', next_attempt_at='2020-01-01T00:00:00Z')
+        response = self.client.post(f'/api/posts/posts/{self.post.id}/schedule/', {'scheduled_at': '2030-01-01T09:00:00Z'})
+        self.assertEqual(response.status_code, 200)
+        link.refresh_from_db()
+        self.assertEqual((link.status, link.retry_count, link.error_message), ('scheduled', 0, None))
+        self.assertIsNone(Post.objects.get(pk=self.post.pk).next_attempt_at)
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='hank', password='pw')
+        self.client.force_authenticate(self.user)
+        self.account = SocialAccount.objects.create(user=self.user, platform='facebook', platform_user_id='h', access_token='t')
+        self.post = Post.objects.create(user=self.user, content='polled')
+        self.link = PostPlatformLink.objects.create(post=self.post, social_account=self.account)
+        self.url = f'/api/posts/posts/{self.post.id}/'
+
+    def test_current_client_gets_304(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('Last-Modified', first)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_responses_are_cached_until_a_change(self):
+        first = self.client.get('/api/posts/posts/')
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/posts/posts/')
+        self.assertEqual(cached.json(), first.json())
+        self.assertEqual(cached['ETag'], first['ETag'])
+
+        self.link.status = 'published'
+        self.link.save()
+        response = self.client.get('/api/posts/posts/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(response.data['results'][0]['platform_links'][0]['status'], 'published')
+
+    def test_bulk_paths_invalidate(self):
+        from ..tasks import dispatch_due_posts
+        from django.utils import timezone
+        Post.objects.filter(pk=self.post.pk).update(status='scheduled', scheduled_at=timezone.now())
+        first = self.client.get(self.url)
+        with patch('posts.tasks.publish_post_task.delay'):
+            dispatch_due_posts()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'publishing')
+
+    def test_cache_is_per_user(self):
+        self.client.get('/api/posts/posts/')
+        other = User.objects.create_user(username='ivy', password='pw')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get('/api/posts/posts/').data['results'], [])
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class BulkEndpointsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='jules', password='pw')
+        self.client.force_authenticate(self.user)
+        self.accounts = [
+            SocialAccount.objects.create(user=self.user, platform=p, platform_user_id=p, access_token='t')
+            for p in ('facebook', 'linkedin')
+        ]
+        other = User.objects.create_user(username='kim', password='pw')
+        self.foreign = SocialAccount.objects.create(user=other, platform='facebook', platform_user_id='k', access_token='t')
+
+    @patch('posts.tasks.dispatch_due_posts.delay')
+    def test_bulk_create_inserts_posts_and_links(self, mock_dispatch):
+        ids = [a.id for a in self.accounts]
+        payload = [
+            {'content': f'post {i}', 'scheduled_at': f'2030-01-{i + 1:02d}T09:00:00Z', 'social_accounts': ids}
+            for i in range(20)
+        ] + [{'content': 'draft', 'social_accounts': ids[:1]}]
+
+        # accounts, posts INSERT, links INSERT (plus the transaction savepoint pair)
+        with self.assertNumQueries(5), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/posts/posts/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 21)
+        self.assertEqual(Post.objects.filter(user=self.user, status='scheduled').count(), 20)
+        self.assertEqual(Post.objects.get(id=response.data['ids'][-1]).status, 'draft')
+        self.assertEqual(PostPlatformLink.objects.filter(post__user=self.user).count(), 41)
+        mock_dispatch.assert_not_called()
+
+    @patch('posts.tasks.dispatch_due_posts.delay')
+    def test_bulk_create_at_the_size_limit(self, mock_dispatch):
+        payload = [{'content': f'post {i}', 'social_accounts': [self.accounts[0].id]} for i in range(10000)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/posts/posts/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(PostPlatformLink.objects.filter(post__user=self.user).count(), 10000)
+        # batched INSERTs (SQLite caps a batch at 999 parameters, about 100 rows), not one per post
+        self.assertLess(len(queries), 250)
+
+    def test_bulk_create_validates_the_whole_batch(self):
+        payload = [
+            {'content': 'ok', 'social_accounts': [self.accounts[0].id]},
+            {'content': 'not mine', 'social_accounts': [self.foreign.id]},
+            {'social_accounts': []},
+        ]
+        response = self.client.post('/api/posts/posts/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('social_accounts', response.data[1])
+        self.assertEqual(set(response.data[2]), {'content', 'social_accounts'})
+        self.assertFalse(Post.objects.filter(user=self.user).exists())
+
+    @patch('posts.tasks.dispatch_due_posts.delay')
+    def test_bulk_schedule(self, mock_dispatch):
+        posts = Post.objects.bulk_create(Post(user=self.user, content=f'p{i}') for i in range(3))
+        published = Post.objects.create(user=self.user, content='done', status='published')
+        payload = [{'id': p.id, 'scheduled_at': '2020-01-01T00:00:00Z'} for p in posts]
+
+        response = self.client.post('/api/posts/posts/bulk_schedule/', payload + [{'id': published.id, 'scheduled_at': '2030-01-01T00:00:00Z'}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(published.id), response.data['errors'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/posts/posts/bulk_schedule/', payload, format='json')
+        self.assertEqual(response.data, {'scheduled': 3})
+        self.assertEqual(Post.objects.filter(status='scheduled', scheduled_at__year=2020).count(), 3)
+        # already due: the sweep is kicked right away
+        mock_dispatch.assert_called_once()
+
+
+class ExportTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='ivy', password='pw')
+        self.client.force_authenticate(self.user)
+        linkedin = SocialAccount.objects.create(user=self.user, platform='linkedin', platform_user_id='i', access_token='t')
+        facebook = SocialAccount.objects.create(user=self.user, platform='facebook', platform_user_id='i', access_token='t')
+        self.post = Post.objects.create(user=self.user, content='Hello, "world"\nagain', status='failed')
+        PostPlatformLink.objects.create(post=self.post, social_account=linkedin, status='published', platform_post_id='urn:1')
+        PostPlatformLink.objects.create(post=self.post, social_account=facebook, status='failed', error_message='bad token')
+        self.draft = Post.objects.create(user=self.user, content='draft')
+        Post.objects.create(user=User.objects.create_user(username='jon', password='pw'), content='not mine')
+
+    def consume(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    @override_settings(POSTS_EXPORT_CHUNK_SIZE=2)
+    def test_csv_has_a_row_per_link(self):
+        response = self.client.get('/api/posts/posts/export/csv/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        with self.assertNumQueries(1):
+            rows = list(csv.DictReader(io.StringIO(self.consume(response))))
+        self.assertEqual(
+            [(r['post_id'], r['platform'], r['link_status'], r['error_message']) for r in rows],
+            [(str(self.post.id), 'linkedin', 'published', ''), (str(self.post.id), 'facebook', 'failed', 'bad token'),
+             (str(self.draft.id), '', '', '')],
+        )
+        self.assertEqual(rows[0]['content'], 'Hello, "world"\nagain')
+
+    def test_ndjson(self):
+        response = self.client.get('/api/posts/posts/export/ndjson/', HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        rows = [json.loads(line) for line in self.consume(response).splitlines()]
+        self.assertEqual([row['link_id'] is None for row in rows], [False, False, True])
+        self.assertEqual(rows[1]['error_message'], 'bad token')
+        self.assertEqual(rows[0]['created_at'][:4], str(self.post.created_at.year))
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/posts/posts/export/csv/', HTTP_ACCEPT='text/csv').status_code, 401)
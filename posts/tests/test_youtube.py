@@ -0,0 +1,182 @@
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import requests
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from googleapiclient.discovery import build_from_document
+from googleapiclient.http import HttpMockSequence
+
+from ..caching import get_version
+from ..models import Post, PostPlatformLink, SocialAccount
+from ..resilience import TransientError
+from ..services import YouTubeService
+from ..youtube import YouTubeClientFactory, youtube_clients, upload_chunk_size
+
+CHUNK = 256 * 1024
+UPLOAD_URI = 'https://www.googleapis.com/upload/youtube/v3/videos?upload_id=abc'
+
+
+class YouTubeClientFactoryTest(SimpleTestCase):
+    def test_discovery_document_parsed_once(self):
+        factory = YouTubeClientFactory()
+        with patch('json.loads', wraps=json.loads) as loads:
+            factory.discovery_document()
+            factory.discovery_document()
+        self.assertEqual(loads.call_count, 1)
+        self.assertEqual(factory.discovery_document()['name'], 'youtube')
+
+    def test_clients_cached_per_token(self):
+        factory = YouTubeClientFactory(max_clients=4)
+        client = factory.get('token-a')
+        self.assertIs(factory.get('token-a'), client)
+        self.assertIsNot(factory.get('token-b'), client)
+        self.assertTrue(hasattr(client, 'videos'))
+
+    def test_least_recently_used_client_evicted(self):
+        factory = YouTubeClientFactory(max_clients=2)
+        a = factory.get('a')
+        b = factory.get('b')
+        factory.get('a')  # 'b' is now the least recently used
+        factory.get('c')
+        self.assertIs(factory.get('a'), a)
+        self.assertIsNot(factory.get('b'), b)
+
+    def test_clients_are_not_shared_between_threads(self):
+        factory = YouTubeClientFactory()
+        client = factory.get('token-a')
+        with ThreadPoolExecutor(1) as pool:
+            other = pool.submit(factory.get, 'token-a').result()
+        self.assertIsNot(other, client)
+        self.assertIs(factory.get('token-a'), client)
+        factory.clear()
+        self.assertIsNot(factory.get('token-a'), client)
+
+    def test_warm(self):
+        factory = YouTubeClientFactory()
+        self.assertTrue(factory.warm())
+        self.assertIsNotNone(factory._document)
+
+    @patch('posts.services.youtube_clients.get')
+    @patch('googleapiclient.http.MediaFileUpload')
+    def test_publish_uses_shared_client(self, mock_media, mock_client):
+        mock_client.return_value.videos.return_value.insert.return_value.next_chunk.return_value = (None, {'id': 'yt1'})
+        result = YouTubeService('token').publish_post('Video', media_url='/tmp/video.mp4')
+        self.assertEqual(result, {'status': 'success', 'platform_post_id': 'yt1'})
+        mock_client.assert_called_once_with('token')
+
+    @patch('posts.services.circuit_breaker.record_failure')
+    @patch('posts.services.media_store.local_path', side_effect=requests.exceptions.ConnectionError('media host down'))
+    def test_media_download_failure_is_transient(self, mock_local_path, mock_record_failure):
+        with self.assertRaises(TransientError):
+            YouTubeService('token').publish_post('Video', media_url='https://cdn.example.com/v.mp4')
+        # the media host failed, not YouTube
+        mock_record_failure.assert_not_called()
+
+    @override_settings(YOUTUBE_UPLOAD_CHUNK_SIZE=CHUNK + 1000)
+    def test_chunk_size_rounded_to_granularity(self):
+        self.assertEqual(upload_chunk_size(), CHUNK)
+
+
+@override_settings(YOUTUBE_UPLOAD_CHUNK_SIZE=CHUNK)
+class YouTubeResumableUploadTest(TestCase):
+    def setUp(self):
+        fd, self.video = tempfile.mkstemp(suffix='.mp4')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(os.urandom(CHUNK * 2 + 100))
+        user = get_user_model().objects.create_user(username='carol', password='pw')
+        account = SocialAccount.objects.create(user=user, platform='youtube', platform_user_id='c', access_token='yt')
+        post = Post.objects.create(user=user, content='Video', media_url='https://example.com/v.mp4')
+        self.link = PostPlatformLink.objects.create(post=post, social_account=account)
+
+    def tearDown(self):
+        os.remove(self.video)
+
+    def _client(self, responses):
+        http = HttpMockSequence(responses)
+        self.sent = []
+        send = http.request
+
+        def record(uri, method='GET', body=None, headers=None, **kwargs):
+            self.sent.append((method, headers or {}))
+            return send(uri, method, body, headers, **kwargs)
+
+        http.request = record
+        return build_from_document(youtube_clients.discovery_document(), http=http)
+
+    def test_chunks_are_checkpointed_and_cleared_on_success(self):
+        client = self._client([
+            ({'status': '200', 'location': UPLOAD_URI}, ''),
+            ({'status': '308', 'range': f'0-{CHUNK - 1}'}, ''),
+            ({'status': '308', 'range': f'0-{CHUNK * 2 - 1}'}, ''),
+            ({'status': '200'}, '{"id": "vid1"}'),
+        ])
+        checkpoints = []
+        service = YouTubeService('yt', link=self.link)
+        original = service._save_checkpoint
+        service._save_checkpoint = lambda uri, offset: (checkpoints.append((uri, offset)), original(uri, offset))
+
+        with patch('posts.services.youtube_clients.get', return_value=client):
+            result = service.publish_post('Video', media_url=self.video)
+
+        self.assertEqual(result, {'status': 'success', 'platform_post_id': 'vid1'})
+        self.assertEqual(checkpoints, [(UPLOAD_URI, CHUNK), (UPLOAD_URI, CHUNK * 2), (None, 0)])
+        self.link.refresh_from_db()
+        self.assertIsNone(self.link.upload_session_uri)
+
+    def test_resumes_from_persisted_offset(self):
+        PostPlatformLink.objects.filter(pk=self.link.pk).update(upload_session_uri=UPLOAD_URI, upload_offset=CHUNK * 2)
+        self.link.refresh_from_db()
+        client = self._client([
+            # Status query confirms the committed range; no new session is started.
+            ({'status': '308', 'range': f'0-{CHUNK * 2 - 1}'}, ''),
+            ({'status': '200'}, '{"id": "vid2"}'),
+        ])
+
+        with patch('posts.services.youtube_clients.get', return_value=client):
+            result = YouTubeService('yt', link=self.link).publish_post('Video', media_url=self.video)
+
+        self.assertEqual(result, {'status': 'success', 'platform_post_id': 'vid2'})
+        # Only the 100 byte tail was re-sent
+        self.assertEqual([method for method, _ in self.sent], ['PUT', 'PUT'])
+        self.assertEqual(self.sent[-1][1]['Content-Range'], f'bytes {CHUNK * 2}-{CHUNK * 2 + 99}/{CHUNK * 2 + 100}')
+        self.link.refresh_from_db()
+        self.assertEqual(self.link.upload_offset, 0)
+
+    def test_resume_of_a_finished_upload(self):
+        PostPlatformLink.objects.filter(pk=self.link.pk).update(upload_session_uri=UPLOAD_URI, upload_offset=CHUNK * 2)
+        self.link.refresh_from_db()
+        # The last chunk arrived but its response was lost: the status query returns the video
+        client = self._client([({'status': '200'}, '{"id": "vid4"}')])
+
+        with patch('posts.services.youtube_clients.get', return_value=client):
+            result = YouTubeService('yt', link=self.link).publish_post('Video', media_url=self.video)
+
+        self.assertEqual(result, {'status': 'success', 'platform_post_id': 'vid4'})
+        self.assertEqual(self.sent[0][1]['Content-Range'], f'bytes */{CHUNK * 2 + 100}')
+
+    def test_checkpoints_invalidate_cached_responses(self):
+        stamp = get_version(self.link.social_account.user_id)
+        time.sleep(0.01)
+        YouTubeService('yt', link=self.link)._save_checkpoint(UPLOAD_URI, CHUNK)
+        self.assertGreater(get_version(self.link.social_account.user_id), stamp)
+
+    def test_expired_session_restarts_upload(self):
+        PostPlatformLink.objects.filter(pk=self.link.pk).update(upload_session_uri=UPLOAD_URI, upload_offset=CHUNK)
+        self.link.refresh_from_db()
+        client = self._client([
+            ({'status': '404'}, '{"error": {"code": 404, "message": "gone"}}'),
+            ({'status': '200', 'location': UPLOAD_URI + '2'}, ''),
+            ({'status': '308', 'range': f'0-{CHUNK - 1}'}, ''),
+            ({'status': '308', 'range': f'0-{CHUNK * 2 - 1}'}, ''),
+            ({'status': '200'}, '{"id": "vid3"}'),
+        ])
+
+        with patch('posts.services.youtube_clients.get', return_value=client):
+            result = YouTubeService('yt', link=self.link).publish_post('Video', media_url=self.video)
+
+        self.assertEqual(result, {'status': 'success', 'platform_post_id': 'vid3'})
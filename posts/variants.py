@@ -0,0 +1,187 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+from .media import media_store
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional: without it posts go out with their original media
+    Image = ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tif', '.tiff')
+EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png'}
+
+
+def render_variant(source, profile, out_path):
+    """
+    Write the image at ``source`` to ``out_path`` adapted to a platform profile:
+    center-cropped into the ASPECT range, scaled to fit MAX_SIDE (and up to
+    MIN_SIDE wide) and re-encoded as FORMAT. Runs in the process pool.
+    """
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+
+        low, high = profile.get('ASPECT', (0, float('inf')))
+        ratio = image.width / image.height
+        if ratio > high:
+            width = round(image.height * high)
+            left = (image.width - width) // 2
+            image = image.crop((left, 0, left + width, image.height))
+        elif ratio < low:
+            height = round(image.width / low)
+            top = (image.height - height) // 2
+            image = image.crop((0, top, image.width, top + height))
+
+        max_side = profile.get('MAX_SIDE')
+        if max_side and max(image.size) > max_side:
+            image.thumbnail((max_side, max_side), Image.LANCZOS)
+        min_side = profile.get('MIN_SIDE')
+        if min_side and image.width < min_side:
+            image = image.resize((min_side, round(image.height * min_side / image.width)), Image.LANCZOS)
+
+        fmt = profile.get('FORMAT', 'JPEG')
+        if fmt == 'JPEG' and image.mode != 'RGB':
+            # Flatten transparency onto white rather than black
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.split()[-1])
+        options = {'optimize': True}
+        if fmt == 'JPEG':
+            options.update(quality=profile.get('QUALITY', 90), progressive=True)
+        image.save(out_path, fmt, **options)
+    return out_path
+
+
+class VariantRenderer:
+    """
+    Renders platform-specific variants of post images in a process pool.
+
+    Variants are files in the media store named after the source's content
+    hash and a hash of the platform profile, so each (asset, profile) pair is
+    rendered once and reused by every later post sharing the asset; changing a
+    profile in SOCIAL_MEDIA_PROFILES renders fresh variants. They are evicted
+    together with the rest of the store.
+    """
+
+    def __init__(self, store=None, executor=None):
+        self.store = store or media_store
+        self._executor = executor
+        self._lock = threading.Lock()
+
+    def profiles(self):
+        return getattr(settings, 'SOCIAL_MEDIA_PROFILES', {})
+
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Every worker process gets its own pool, so keep it small by default
+                workers = getattr(settings, 'MEDIA_PREP_WORKERS', 2) or None
+                self._executor = ProcessPoolExecutor(max_workers=workers)
+            return self._executor
+
+    def _discard(self):
+        # A forked child must not use the parent's pool
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def variant_name(self, digest, platform, profile):
+        profile_key = hashlib.sha256(json.dumps(profile, sort_keys=True).encode()).hexdigest()[:8]
+        return f"{digest}.{platform}-{profile_key}{EXTENSIONS.get(profile.get('FORMAT', 'JPEG'), '.jpg')}"
+
+    def _digest(self, source):
+        path = Path(source)
+        if path.parent == self.store.root and len(path.stem) == 64:
+            return path.stem  # downloaded by the store: already content-addressed
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def prepare(self, media_url, platforms):
+        """
+        Platform-ready variants of an image ``media_url``.
+
+        Returns ``{platform: url}`` for every platform in ``platforms`` with a
+        profile; platforms left out (no profile, not an image, Pillow or
+        MEDIA_CACHE_URL missing, rendering failed) use the original URL.
+        """
+        base_url = getattr(settings, 'MEDIA_CACHE_URL', '')
+        profiles = {platform: self.profiles()[platform] for platform in platforms if platform in self.profiles()}
+        if Image is None or not base_url or not media_url or not profiles:
+            return {}
+        if Path(urlsplit(media_url).path).suffix.lower() not in IMAGE_SUFFIXES:
+            return {}
+
+        try:
+            source = self.store.local_path(media_url)
+            digest = self._digest(source)
+        except Exception as e:
+            logger.warning(f"Could not fetch {media_url} for variants: {str(e)}")
+            return {}
+
+        names, pending = {}, {}
+        for platform, profile in profiles.items():
+            name = names[platform] = self.variant_name(digest, platform, profile)
+            path = self.store.root / name
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                fd, tmp = tempfile.mkstemp(dir=self.store.root, prefix='.download-', suffix=path.suffix)
+                os.close(fd)
+                pending[platform] = (tmp, path, profile)
+
+        if pending:
+            self._render(source, pending)
+        return {
+            platform: f"{base_url.rstrip('/')}/{name}"
+            for platform, name in names.items()
+            if (self.store.root / name).exists()
+        }
+
+    def _render(self, source, pending):
+        try:
+            executor = self.executor()
+            futures = {
+                platform: executor.submit(render_variant, source, profile, tmp)
+                for platform, (tmp, _, profile) in pending.items()
+            }
+            wait = lambda platform: futures[platform].result()
+        except (AssertionError, OSError, RuntimeError, BrokenProcessPool) as e:
+            # No subprocesses here (e.g. a daemonic worker): render inline
+            logger.warning(f"Media process pool unavailable, rendering inline: {str(e)}")
+            wait = lambda platform: render_variant(source, pending[platform][2], pending[platform][0])
+
+        for platform, (tmp, path, _) in pending.items():
+            try:
+                wait(platform)
+                os.replace(tmp, path)
+            except Exception as e:
+                logger.warning(f"Could not render {platform} variant of {source}: {str(e)}")
+                try:
+                    os.remove(tmp)
+                except FileNotFoundError:
+                    pass
+        self.store._evict()
+
+
+variant_renderer = VariantRenderer()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=variant_renderer._discard)
+
+
+def prepare_media(media_url, platforms):
+    return variant_renderer.prepare(media_url, platforms)
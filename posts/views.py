@@ -1,10 +1,21 @@
-from rest_framework import viewsets, status
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from .models import Post, SocialAccount, PostPlatformLink
-from .serializers import PostSerializer, SocialAccountSerializer, PostPlatformLinkSerializer
+from .serializers import (
+    PostSerializer, SocialAccountSerializer, PostPlatformLinkSerializer, BulkPostSerializer, BulkScheduleSerializer
+)
+from .pagination import PostCursorPagination
+from .caching import CachedResponseMixin, bump_version
+from . import export, metrics
 
-class SocialAccountViewSet(viewsets.ModelViewSet):
+class SocialAccountViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     serializer_class = SocialAccountSerializer
     queryset = SocialAccount.objects.all()
 
@@ -14,18 +25,25 @@ class SocialAccountViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     serializer_class = PostSerializer
     queryset = Post.objects.all()
+    pagination_class = PostCursorPagination
 
     def get_queryset(self):
-        return self.queryset.filter(user=self.request.user).order_by('-created_at')
+        return (
+            self.queryset.filter(user=self.request.user)
+            .order_by('-created_at', '-id')
+            .prefetch_related('platform_links')
+        )
 
     def perform_create(self, serializer):
         post = serializer.save(user=self.request.user)
         if post.status == 'published':
             from .tasks import publish_post_task
-            publish_post_task.delay(post.id)
+            # Enqueue once the row is committed, so a worker never looks for it too early;
+            # outside eager mode the response returns without waiting for the platforms.
+            transaction.on_commit(lambda: publish_post_task.delay(post.id))
 
     @action(detail=True, methods=['post'])
     def schedule(self, request, pk=None):
@@ -33,13 +51,143 @@ class PostViewSet(viewsets.ModelViewSet):
         scheduled_at = request.data.get('scheduled_at')
         if not scheduled_at:
             return Response({'error': 'scheduled_at is required'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        post.scheduled_at = scheduled_at
-        post.status = 'scheduled'
-        post.save()
-        
-        from .tasks import publish_post_task
-        # In a real app, we'd use eta=scheduled_at
-        publish_post_task.apply_async((post.id,), eta=post.scheduled_at)
-        
+        scheduled_at = serializers.DateTimeField().run_validation(scheduled_at)
+
+        with transaction.atomic():
+            post = Post.objects.select_for_update().get(pk=post.pk)
+            if post.status in ('publishing', 'published'):
+                return Response({'error': f"Cannot reschedule a {post.status} post."}, status=status.HTTP_400_BAD_REQUEST)
+            post.scheduled_at = scheduled_at
+            post.next_attempt_at = None
+            post.status = 'scheduled'
+            post.save()
+            _retry_failed_links([post.pk])
+            # Nothing is enqueued for future posts: the dispatch_due_posts sweep
+            # picks them up from the database once scheduled_at has passed.
+            self._dispatch_if_due([scheduled_at])
+
         return Response({'status': 'post scheduled'})
+
+    def _bulk_serializer(self, child, data, **context):
+        return serializers.ListSerializer(
+            child=child,
+            data=data,
+            allow_empty=False,
+            max_length=getattr(settings, 'POSTS_BULK_MAX_SIZE', 10000),
+            context=dict(self.get_serializer_context(), **context),
+        )
+
+    def _dispatch_if_due(self, scheduled):
+        # Due posts go through the scheduler sweep, which claims and enqueues
+        # them in batches; run one right after commit instead of waiting for Beat.
+        now = timezone.now()
+        if any(when <= now for when in scheduled):
+            from .tasks import dispatch_due_posts
+            transaction.on_commit(dispatch_due_posts.delay)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        """
+        Create many posts and their platform links in one request.
+
+        Expects a list of ``{"content", "media_url", "scheduled_at", "social_accounts": [ids]}``.
+        The whole batch is validated before anything is written; posts with a
+        scheduled_at are created 'scheduled', the rest as drafts.
+        """
+        account_ids = set(SocialAccount.objects.filter(user=request.user).values_list('id', flat=True))
+        serializer = self._bulk_serializer(BulkPostSerializer(), request.data, account_ids=account_ids)
+        serializer.is_valid(raise_exception=True)
+
+        posts = [
+            Post(
+                user=request.user,
+                content=item['content'],
+                media_url=item.get('media_url'),
+                scheduled_at=item.get('scheduled_at'),
+                status='scheduled' if item.get('scheduled_at') else 'draft',
+            )
+            for item in serializer.validated_data
+        ]
+        with transaction.atomic():
+            Post.objects.bulk_create(posts, batch_size=1000)
+            PostPlatformLink.objects.bulk_create(
+                (
+                    PostPlatformLink(post=post, social_account_id=account_id, status=post.status)
+                    for post, item in zip(posts, serializer.validated_data)
+                    for account_id in item['social_accounts']
+                ),
+                batch_size=1000,
+            )
+            # bulk_create() sends no post_save signals
+            bump_version(request.user.pk)
+            self._dispatch_if_due([post.scheduled_at for post in posts if post.scheduled_at])
+
+        return Response({'created': len(posts), 'ids': [post.id for post in posts]}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='bulk_schedule')
+    def bulk_schedule(self, request):
+        """Schedule many existing posts at once from a list of ``{"id", "scheduled_at"}``."""
+        serializer = self._bulk_serializer(BulkScheduleSerializer(), request.data)
+        serializer.is_valid(raise_exception=True)
+        schedule = {item['id']: item['scheduled_at'] for item in serializer.validated_data}
+
+        with transaction.atomic():
+            found = dict(
+                Post.objects.select_for_update()
+                .filter(user=request.user, id__in=schedule)
+                .values_list('id', 'status')
+            )
+            errors = {}
+            for post_id in schedule:
+                if post_id not in found:
+                    errors[str(post_id)] = 'Not found.'
+                elif found[post_id] in ('publishing', 'published'):
+                    errors[str(post_id)] = f"Cannot reschedule a {found[post_id]} post."
+            if errors:
+                return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+            now = timezone.now()
+            Post.objects.bulk_update(
+                [
+                    Post(id=post_id, scheduled_at=when, next_attempt_at=None, status='scheduled', updated_at=now)
+                    for post_id, when in schedule.items()
+                ],
+                ['scheduled_at', 'next_attempt_at', 'status', 'updated_at'],
+                batch_size=1000,
+            )
+            _retry_failed_links(schedule)
+            bump_version(request.user.pk)
+            self._dispatch_if_due(schedule.values())
+
+        return Response({'scheduled': len(schedule)})
+
+    def _export(self, request, stream, content_type, extension):
+        response = StreamingHttpResponse(stream(export.export_rows(request.user)), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="posts.{extension}"'
+        return response
+
+    @action(detail=False, methods=['get'], url_path='export/csv', renderer_classes=[JSONRenderer, export.CSVExportRenderer])
+    def export_csv(self, request):
+        """Stream every post with its per-platform status and error as CSV, one row per platform link."""
+        return self._export(request, export.stream_csv, 'text/csv; charset=utf-8', 'csv')
+
+    @action(detail=False, methods=['get'], url_path='export/ndjson', renderer_classes=[JSONRenderer, export.NDJSONExportRenderer])
+    def export_ndjson(self, request):
+        """Same rows as export_csv, as newline-delimited JSON objects."""
+        return self._export(request, export.stream_ndjson, 'application/x-ndjson', 'ndjson')
+
+
+def _retry_failed_links(post_ids):
+    # Rescheduling is the user's way to try failed platforms again; publish_post_task skips failed links
+    PostPlatformLink.objects.filter(post_id__in=post_ids, status='failed').update(
+        status='scheduled', error_message=None, retry_count=0
+    )
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; requires METRICS_TOKEN as a bearer token when it is set."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f"Bearer {token}"):
+        return HttpResponse(status=401)
+    body, content_type = metrics.render()
+    return HttpResponse(body, content_type=content_type)
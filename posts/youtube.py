@@ -0,0 +1,190 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from . import metrics
+from .resilience import RETRYABLE_STATUS, backoff, parse_retry_after, retry_config
+
+# The resumable upload protocol requires chunks in multiples of 256 KiB.
+CHUNK_GRANULARITY = 256 * 1024
+
+
+class YouTubeClientFactory:
+    """
+    Process-level factory for YouTube Data API clients.
+
+    The discovery document is loaded and parsed once per process, and built
+    clients are kept per access token in a small LRU, so repeated publishes and
+    analytics reads skip both the JSON parse and the resource tree build.
+    Clients wrap an httplib2.Http, which is not thread-safe, so each thread
+    (e.g. of publish_post_task's fan-out pool) gets its own LRU of clients.
+    """
+
+    API_NAME = 'youtube'
+    API_VERSION = 'v3'
+
+    def __init__(self, max_clients=None):
+        self._lock = threading.Lock()
+        self._document = None
+        self._local = threading.local()
+        # Bumped by clear(); a thread drops its clients when it sees a new generation
+        self._generation = 0
+        self._max_clients = max_clients
+
+    @property
+    def _clients(self):
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            local.clients, local.generation = OrderedDict(), self._generation
+        return local.clients
+
+    @property
+    def max_clients(self):
+        if self._max_clients is not None:
+            return self._max_clients
+        return getattr(settings, 'YOUTUBE_CLIENT_CACHE_SIZE', 64)
+
+    def timeout(self):
+        from .http import pool_config
+        from .resilience import timeouts
+        return timeouts('youtube', pool_config('www.googleapis.com')['TIMEOUT'])[1]
+
+    def discovery_document(self):
+        """
+        Parsed discovery document, loaded from the copy bundled with google-api-python-client.
+
+        YOUTUBE_API_URL replaces its rootUrl, which moves both the API and the
+        upload endpoints (e.g. to a stand-in server for benchmarks).
+        """
+        if self._document is None:
+            from googleapiclient import discovery_cache
+            with self._lock:
+                if self._document is None:
+                    document = json.loads(discovery_cache.get_static_doc(self.API_NAME, self.API_VERSION))
+                    root_url = getattr(settings, 'YOUTUBE_API_URL', '')
+                    if root_url:
+                        document['rootUrl'] = root_url.rstrip('/') + '/'
+                    self._document = document
+        return self._document
+
+    def get(self, access_token):
+        """Return a (possibly cached) client authorised with ``access_token``, for use on this thread only."""
+        key = hashlib.sha256(access_token.encode()).hexdigest()
+        clients = self._clients
+        client = clients.get(key)
+        if client is not None:
+            clients.move_to_end(key)
+            return client
+
+        import httplib2
+        from googleapiclient.discovery import build_from_document
+        from google.oauth2.credentials import Credentials
+        from google_auth_httplib2 import AuthorizedHttp
+        # httplib2 waits forever by default; it has a single socket timeout, so use the read timeout
+        http = httplib2.Http(timeout=self.timeout())
+        # 308 means "resume incomplete" to the upload protocol, not a redirect (as in googleapiclient's build_http)
+        http.redirect_codes = http.redirect_codes - {308}
+        client = build_from_document(self.discovery_document(), http=AuthorizedHttp(Credentials(access_token), http=http))
+
+        clients[key] = client
+        while len(clients) > self.max_clients:
+            clients.popitem(last=False)
+        return client
+
+    def warm(self):
+        """Load the discovery document ahead of the first request (called at worker start)."""
+        try:
+            self.discovery_document()
+        except ImportError:
+            return False
+        return True
+
+    def clear(self):
+        """Drop the cached clients of every thread."""
+        with self._lock:
+            self._generation += 1
+
+
+youtube_clients = YouTubeClientFactory()
+
+
+def upload_chunk_size():
+    """Configured YOUTUBE_UPLOAD_CHUNK_SIZE, rounded down to a valid chunk multiple."""
+    size = getattr(settings, 'YOUTUBE_UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024)
+    return max(size // CHUNK_GRANULARITY, 1) * CHUNK_GRANULARITY
+
+
+def resumable_upload(request, resume_uri=None, offset=0, on_chunk=None, num_retries=3):
+    """
+    Drive a resumable googleapiclient upload request chunk by chunk.
+
+    The media is streamed from disk one chunk at a time. ``on_chunk(uri, offset)``
+    is called after every acknowledged chunk so the caller can persist a
+    checkpoint; passing that checkpoint back as ``resume_uri``/``offset`` makes
+    the upload continue from where it stopped instead of from byte 0.
+    """
+    from googleapiclient.errors import HttpError
+
+    if resume_uri:
+        request.resumable_uri = resume_uri
+        # The upload server's committed range is authoritative (the last chunk
+        # may have been only partly received), so ask it before sending bytes.
+        offset, response = committed_offset(request, resume_uri)
+        if response is not None:
+            return response
+        request.resumable_progress = offset
+
+    response, attempt = None, 0
+    while response is None:
+        started = time.perf_counter()
+        try:
+            # googleapiclient's own retries re-send a file slice it already
+            # consumed (and stall), so failed chunks are retried here: the
+            # request is left in its error state and the next call asks the
+            # server for the committed range before re-reading the file.
+            _, response = request.next_chunk(num_retries=0)
+        except HttpError as e:
+            metrics.observe_request('youtube', 'put', time.perf_counter() - started, e.resp.status)
+            retry_after = parse_retry_after(e.resp.get('retry-after'))
+            if (e.resp.status not in RETRYABLE_STATUS or attempt >= num_retries
+                    or (retry_after or 0) > retry_config()['MAX_INLINE_WAIT']):
+                raise
+            time.sleep(backoff(attempt, retry_after))
+            attempt += 1
+            continue
+        except Exception as e:
+            metrics.observe_request('youtube', 'put', time.perf_counter() - started, error=e)
+            raise
+        metrics.observe_request('youtube', 'put', time.perf_counter() - started)
+        attempt = 0
+        if response is None and on_chunk is not None:
+            on_chunk(request.resumable_uri, request.resumable_progress)
+    return response
+
+
+def committed_offset(request, session_uri):
+    """
+    ``(offset, response)`` of the upload session at ``session_uri``.
+
+    Sends the protocol's status query (an empty PUT with ``Content-Range:
+    bytes */size``). The server answers 308 with the committed range, or with
+    the finished video's resource (returned as ``response``) when it already
+    has every byte.
+    """
+    from googleapiclient.errors import HttpError
+
+    size = request.resumable.size()
+    headers = {"Content-Range": f"bytes */{size if size is not None else '*'}", "Content-Length": "0"}
+    started = time.perf_counter()
+    resp, content = request.http.request(session_uri, method="PUT", headers=headers)
+    metrics.observe_request('youtube', 'put', time.perf_counter() - started, resp.status)
+    if resp.status in (200, 201):
+        return size, json.loads(content)
+    if resp.status != 308:
+        raise HttpError(resp, content, uri=session_uri)
+    committed = resp.get('range')  # "bytes=0-<last byte>", absent when nothing was stored
+    return (int(committed.rsplit('-', 1)[1]) + 1 if committed else 0), None
@@ -25,13 +25,13 @@ def showcase_youtube():
     service = YouTubeService("mock_access_token_from_oauth")
     
     # Mocking the actual execute() call to see the parameters being passed
-    with patch('googleapiclient.discovery.build') as mock_build, \
+    with patch('posts.services.youtube_clients.get') as mock_client, \
          patch('googleapiclient.http.MediaFileUpload') as mock_media:
         
-        mock_youtube = mock_build.return_value
+        mock_youtube = mock_client.return_value
         mock_videos = mock_youtube.videos.return_value
         mock_insert = mock_videos.insert.return_value
-        mock_insert.execute.return_value = {'id': 'youtube_video_id_xyz_123'}
+        mock_insert.next_chunk.return_value = (None, {'id': 'youtube_video_id_xyz_123'})
         
         # Test content
         content = "My Awesome Social Media Marketing Demo Video!"
@@ -1,5 +1,7 @@
 import os
+import time
 from celery import Celery
+from celery.signals import before_task_publish, task_prerun, worker_process_init
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'social_marketing.settings')
@@ -15,6 +17,42 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
 
+
+@app.on_after_configure.connect
+def create_data_folders(sender, **kwargs):
+    # The filesystem broker and file result backend expect their folders to exist
+    if sender.conf.task_always_eager:
+        return
+    folders = []
+    if sender.conf.broker_url.startswith('filesystem://'):
+        options = sender.conf.broker_transport_options
+        folders += [options.get('data_folder_in'), options.get('data_folder_out'), options.get('control_folder')]
+    if str(sender.conf.result_backend).startswith('file://'):
+        folders.append(sender.conf.result_backend[len('file://'):])
+    for folder in filter(None, folders):
+        os.makedirs(folder, exist_ok=True)
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
+
+
+@worker_process_init.connect
+def warm_api_clients(**kwargs):
+    # Parse the YouTube discovery document once per worker process, before the first task.
+    from posts.youtube import youtube_clients
+    youtube_clients.warm()
+
+
+@before_task_publish.connect
+def stamp_enqueue_time(headers=None, **kwargs):
+    # Read back in observe_queue_wait to measure how long the task sat in the queue
+    from posts.metrics import ENQUEUED_AT_HEADER
+    if headers is not None:
+        headers[ENQUEUED_AT_HEADER] = time.time()
+
+
+@task_prerun.connect
+def observe_queue_wait(task=None, **kwargs):
+    from posts.metrics import ENQUEUED_AT_HEADER, observe_queue_wait
+    observe_queue_wait(task.name, getattr(task.request, ENQUEUED_AT_HEADER, None))
@@ -86,6 +86,26 @@ DATABASES = {
     'default': env.db('DATABASE_URL', default='sqlite:///db.sqlite3')
 }
 
+# Rate limiter buckets, circuit breakers, cached auth checks and the response
+# cache version stamps live in the default cache and must be shared by the web
+# and Celery worker processes. Set REDIS_URL whenever tasks run on workers
+# (CELERY_TASK_ALWAYS_EAGER=False); the local-memory fallback is per process
+# and only fits development and tests, where everything runs in one process.
+REDIS_URL = env('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/stable/ref/settings/#auth-password-validators
 
@@ -139,11 +159,80 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
 }
 
-# Celery Configuration for SQLite setup
-CELERY_TASK_ALWAYS_EAGER = True
+# Celery Configuration
+# Eager mode runs tasks inline in the caller (development and tests). In
+# production set CELERY_TASK_ALWAYS_EAGER=False and run workers, e.g.
+#   celery -A social_marketing worker -Q default,publish,linkedin,facebook,instagram,youtube
+# The default broker is kombu's filesystem transport, which needs no service: web
+# and worker processes exchange messages through CELERY_DATA_DIR (one host or a
+# shared volume). Point CELERY_BROKER_URL at redis:// or amqp:// to scale out.
+CELERY_TASK_ALWAYS_EAGER = env.bool('CELERY_TASK_ALWAYS_EAGER', default=True)
 CELERY_TASK_EAGER_PROPAGATES = True
-CELERY_BROKER_URL = 'memory://'
-CELERY_RESULT_BACKEND = 'cache+memory://'
+CELERY_DATA_DIR = Path(env('CELERY_DATA_DIR', default=str(BASE_DIR / 'celery_data')))
+CELERY_BROKER_URL = env('CELERY_BROKER_URL', default='filesystem://')
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    # One folder per direction would split producers from consumers; both use the same one
+    'data_folder_in': str(CELERY_DATA_DIR / 'queue'),
+    'data_folder_out': str(CELERY_DATA_DIR / 'queue'),
+    'control_folder': str(CELERY_DATA_DIR / 'control'),
+}
+# Eager runs never leave the process, so their results (chord headers included) stay in memory
+CELERY_RESULT_BACKEND = env('CELERY_RESULT_BACKEND', default=(
+    'cache+memory://' if CELERY_TASK_ALWAYS_EAGER else f"file://{CELERY_DATA_DIR / 'results'}"
+))
+CELERY_RESULT_EXPIRES = env.int('CELERY_RESULT_EXPIRES', default=86400)
+# Publishes are long, network-bound tasks: take one message at a time so a slow
+# upload never holds others hostage in a worker's prefetch buffer, and ack only
+# once a task has finished so a worker crash hands it to another worker. Each
+# link's result is saved as soon as its platform answers, so links published
+# before the crash are skipped on the second run.
+CELERY_WORKER_PREFETCH_MULTIPLIER = env.int('CELERY_WORKER_PREFETCH_MULTIPLIER', default=1)
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+# Queues: 'default' for sweeps and maintenance, 'publish' for post fan-out and
+# one queue per platform (posts/routing.py), so each can get its own workers.
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_ROUTES = ('posts.routing.route_task',)
+
+# Scheduled posts are dispatched by a periodic database sweep instead of ETA tasks
+CELERY_BEAT_SCHEDULE = {
+    'dispatch-due-posts': {
+        'task': 'posts.tasks.dispatch_due_posts',
+        'schedule': env.float('SOCIAL_SCHEDULER_INTERVAL', default=30.0),
+    },
+    'poll-instagram-containers': {
+        'task': 'posts.tasks.poll_instagram_containers',
+        'schedule': env.float('INSTAGRAM_CONTAINER_POLL_INTERVAL', default=15.0),
+    },
+    'collect-metrics': {
+        'task': 'analytics.tasks.collect_metrics_task',
+        'schedule': env.float('ANALYTICS_COLLECT_INTERVAL', default=3600.0),
+    },
+    'rollup-metrics': {
+        'task': 'analytics.tasks.update_rollups_task',
+        'schedule': env.float('ANALYTICS_ROLLUP_INTERVAL', default=300.0),
+    },
+    'refresh-tokens': {
+        'task': 'posts.tasks.refresh_expiring_tokens',
+        'schedule': env.float('SOCIAL_TOKEN_REFRESH_INTERVAL', default=300.0),
+    },
+}
+SOCIAL_SCHEDULER_BATCH_SIZE = env.int('SOCIAL_SCHEDULER_BATCH_SIZE', default=500)
+SOCIAL_SCHEDULER_MAX_BATCHES = env.int('SOCIAL_SCHEDULER_MAX_BATCHES', default=20)
+# Seconds a post may stay 'publishing' with no Instagram container in flight before
+# the sweep settles it or hands it back to the scheduler; keep above the longest upload
+SOCIAL_PUBLISH_STALE_AFTER = env.int('SOCIAL_PUBLISH_STALE_AFTER', default=3600)
+# Most posts accepted by one bulk create / bulk schedule request
+POSTS_BULK_MAX_SIZE = env.int('POSTS_BULK_MAX_SIZE', default=10000)
+# In-flight Instagram containers checked per poll
+INSTAGRAM_CONTAINER_POLL_LIMIT = env.int('INSTAGRAM_CONTAINER_POLL_LIMIT', default=500)
+# Polls that fail to read or publish a container before its link is marked failed
+INSTAGRAM_CONTAINER_MAX_FAILURES = env.int('INSTAGRAM_CONTAINER_MAX_FAILURES', default=40)
+# Metric snapshots buffered per bulk INSERT by the analytics collector
+ANALYTICS_WRITE_BATCH_SIZE = env.int('ANALYTICS_WRITE_BATCH_SIZE', default=1000)
+# Seconds before the rollup watermark that are recomputed on every rollup run,
+# so snapshots committed late (e.g. by an overlapping collection) still count
+ANALYTICS_ROLLUP_OVERLAP = env.int('ANALYTICS_ROLLUP_OVERLAP', default=3600)
 
 # CORS Configuration
 CORS_ALLOW_ALL_ORIGINS = True # Change to specific origins in production
@@ -159,9 +248,121 @@ SITE_ID = 1
 # Social Media Integration Keys
 FACEBOOK_PAGE_ACCESS_TOKEN = env('FACEBOOK_PAGE_ACCESS_TOKEN', default='')
 INSTAGRAM_BUSINESS_ID = env('INSTAGRAM_BUSINESS_ID', default='')
+# API roots; point them at a stand-in server to benchmark offline (see benchmarks/)
+LINKEDIN_API_URL = env('LINKEDIN_API_URL', default='https://api.linkedin.com/v2')
+GRAPH_API_URL = env('GRAPH_API_URL', default='https://graph.facebook.com/v19.0')
+# Empty: the rootUrl of the bundled discovery document
+YOUTUBE_API_URL = env('YOUTUBE_API_URL', default='')
 YOUTUBE_CLIENT_ID = env('YOUTUBE_CLIENT_ID', default='')
 YOUTUBE_CLIENT_SECRET = env('YOUTUBE_CLIENT_SECRET', default='')
 
+# Shared keep-alive HTTP pools used by posts.services (per host overrides go in 'HOSTS')
+SOCIAL_HTTP_POOL = {
+    'POOL_CONNECTIONS': env.int('SOCIAL_HTTP_POOL_CONNECTIONS', default=4),
+    'POOL_MAXSIZE': env.int('SOCIAL_HTTP_POOL_MAXSIZE', default=16),
+    'TIMEOUT': env.float('SOCIAL_HTTP_TIMEOUT', default=10),
+    'HOSTS': {},
+}
+
+# Most platform calls SocialMediaManager.publish_many() keeps in flight on one event loop
+# (also the connection limit of the shared httpx.AsyncClient)
+SOCIAL_ASYNC_MAX_CONCURRENCY = env.int('SOCIAL_ASYNC_MAX_CONCURRENCY', default=100)
+
+# Longest a cached post/account API response is served (it is dropped earlier on any change)
+POSTS_RESPONSE_CACHE_TTL = env.int('POSTS_RESPONSE_CACHE_TTL', default=300)
+# Rows fetched per database round trip (and sent per write) by the streaming exports
+POSTS_EXPORT_CHUNK_SIZE = env.int('POSTS_EXPORT_CHUNK_SIZE', default=2000)
+
+# Prometheus metrics at /metrics (posts/metrics.py). Set the PROMETHEUS_MULTIPROC_DIR
+# environment variable to an empty directory shared by the web and Celery worker
+# processes of a host (wiped on deploy) to export their aggregate. When
+# METRICS_TOKEN is set, scrapes must send it as a bearer token.
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+
+# Content-addressed cache of downloaded post media (videos for YouTube uploads),
+# kept under MEDIA_CACHE_MAX_BYTES by evicting the least recently used files
+MEDIA_CACHE_DIR = env('MEDIA_CACHE_DIR', default=str(BASE_DIR / 'media_cache'))
+MEDIA_CACHE_MAX_BYTES = env.int('MEDIA_CACHE_MAX_BYTES', default=5 * 1024 ** 3)
+# How long a media URL is trusted to keep serving the same bytes
+MEDIA_CACHE_URL_TTL = env.int('MEDIA_CACHE_URL_TTL', default=86400)
+
+# Platform-specific image variants rendered before publishing (posts/variants.py).
+# They are written to MEDIA_CACHE_DIR, which must be served publicly at
+# MEDIA_CACHE_URL; leave it empty to publish original images.
+MEDIA_CACHE_URL = env('MEDIA_CACHE_URL', default='')
+# Rendering processes per worker process; every Celery child has its own pool, so
+# this multiplies with --concurrency (0 = one per CPU, for a dedicated worker)
+MEDIA_PREP_WORKERS = env.int('MEDIA_PREP_WORKERS', default=2)
+# ASPECT is the allowed width/height range; images outside it are center-cropped
+SOCIAL_MEDIA_PROFILES = {
+    'instagram': {'FORMAT': 'JPEG', 'ASPECT': (4 / 5, 1.91), 'MAX_SIDE': 1440, 'MIN_SIDE': 320, 'QUALITY': 90},
+    'facebook': {'FORMAT': 'JPEG', 'MAX_SIDE': 2048, 'QUALITY': 90},
+}
+
+# Number of built YouTube API clients kept per thread (LRU, keyed by access token)
+YOUTUBE_CLIENT_CACHE_SIZE = env.int('YOUTUBE_CLIENT_CACHE_SIZE', default=64)
+
+# Chunk size for resumable YouTube uploads (rounded down to a multiple of 256 KiB)
+YOUTUBE_UPLOAD_CHUNK_SIZE = env.int('YOUTUBE_UPLOAD_CHUNK_SIZE', default=8 * 1024 * 1024)
+
+# How long platform identities (e.g. the LinkedIn member URN) are cached per access token
+SOCIAL_IDENTITY_CACHE_TTL = env.int('SOCIAL_IDENTITY_CACHE_TTL', default=6 * 3600)
+
+# Cached authenticate() results per access token
+SOCIAL_AUTH_CACHE_TTL = env.int('SOCIAL_AUTH_CACHE_TTL', default=900)
+
+# Tokens expiring within AHEAD seconds are refreshed by refresh_expiring_tokens, in
+# batches of BATCH_SIZE accounts per platform and at most LIMIT accounts per run.
+# Tokens that expired more than GRACE seconds ago are left for the user to reconnect.
+SOCIAL_TOKEN_REFRESH_AHEAD = env.int('SOCIAL_TOKEN_REFRESH_AHEAD', default=1200)
+SOCIAL_TOKEN_REFRESH_GRACE = env.int('SOCIAL_TOKEN_REFRESH_GRACE', default=86400)
+SOCIAL_TOKEN_REFRESH_BATCH_SIZE = env.int('SOCIAL_TOKEN_REFRESH_BATCH_SIZE', default=50)
+SOCIAL_TOKEN_REFRESH_LIMIT = env.int('SOCIAL_TOKEN_REFRESH_LIMIT', default=1000)
+
+# (connect, read) timeouts per platform in seconds; others use SOCIAL_HTTP_POOL['TIMEOUT']
+SOCIAL_PLATFORM_TIMEOUTS = {
+    'linkedin': {'CONNECT': 3.05, 'READ': env.float('LINKEDIN_READ_TIMEOUT', default=15)},
+    'facebook': {'CONNECT': 3.05, 'READ': env.float('FACEBOOK_READ_TIMEOUT', default=20)},
+    'instagram': {'CONNECT': 3.05, 'READ': env.float('INSTAGRAM_READ_TIMEOUT', default=20)},
+    'youtube': {'CONNECT': 3.05, 'READ': env.float('YOUTUBE_READ_TIMEOUT', default=60)},
+}
+
+# Inline retries of platform calls: at most ATTEMPTS tries, exponential backoff from
+# BACKOFF seconds (capped at MAX_BACKOFF); waits longer than MAX_INLINE_WAIT are
+# left to a later scheduler sweep instead of sleeping in the worker.
+SOCIAL_RETRY = {
+    'ATTEMPTS': env.int('SOCIAL_RETRY_ATTEMPTS', default=3),
+    'BACKOFF': env.float('SOCIAL_RETRY_BACKOFF', default=0.5),
+    'MAX_BACKOFF': env.float('SOCIAL_RETRY_MAX_BACKOFF', default=600),
+    'MAX_INLINE_WAIT': env.float('SOCIAL_RETRY_MAX_INLINE_WAIT', default=2),
+}
+# Times a link is rescheduled after transient failures before it is marked failed
+SOCIAL_PUBLISH_MAX_RETRIES = env.int('SOCIAL_PUBLISH_MAX_RETRIES', default=5)
+
+# A platform's circuit opens after FAILURES failed calls within WINDOW seconds and
+# fails calls fast for COOLDOWN seconds (per platform overrides under its name).
+SOCIAL_CIRCUIT_BREAKER = {
+    'FAILURES': env.int('SOCIAL_CIRCUIT_FAILURES', default=5),
+    'WINDOW': env.int('SOCIAL_CIRCUIT_WINDOW', default=60),
+    'COOLDOWN': env.int('SOCIAL_CIRCUIT_COOLDOWN', default=30),
+}
+
+# Threads of the long-lived pool publish_post_task fans a post's platform links out on
+SOCIAL_PUBLISH_MAX_WORKERS = env.int('SOCIAL_PUBLISH_MAX_WORKERS', default=4)
+# Publish each link in its own publish_link_task on its platform's queue, settled by a
+# chord callback, instead of fanning out inside publish_post_task (needs a result backend)
+SOCIAL_PUBLISH_PER_LINK = env.bool('SOCIAL_PUBLISH_PER_LINK', default=False)
+
+# Token buckets per platform and account, shared by all workers through the cache.
+# RATE is tokens per second, BURST the bucket size. Platforms not listed are unlimited.
+SOCIAL_RATE_LIMITS = {
+    'linkedin': {'RATE': 150 / 86400, 'BURST': 25},
+    'facebook': {'RATE': 200 / 3600, 'BURST': 50},
+    'instagram': {'RATE': 25 / 86400, 'BURST': 25},
+}
+# Longest a publish waits in-process for a token before it is deferred to a later sweep
+SOCIAL_RATE_LIMIT_MAX_WAIT = env.float('SOCIAL_RATE_LIMIT_MAX_WAIT', default=10)
+
 # Social Media API Credentials (from .env)
 SOCIALACCOUNT_PROVIDERS = {
     'linkedin_oauth2': {
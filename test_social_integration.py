@@ -14,7 +14,7 @@ def run_tests():
     
     # 1. Test LinkedIn
     print("\nTesting LinkedIn Service...")
-    with patch('requests.get') as mock_get, patch('requests.post') as mock_post:
+    with patch('requests.Session.get') as mock_get, patch('requests.Session.post') as mock_post:
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = {'id': 'user_123'}
         mock_post.return_value.status_code = 201
@@ -25,7 +25,7 @@ def run_tests():
 
     # 2. Test Facebook
     print("\nTesting Facebook Service...")
-    with patch('requests.post') as mock_post:
+    with patch('requests.Session.post') as mock_post:
         mock_post.return_value.status_code = 200
         mock_post.return_value.json.return_value = {'id': 'fb_post_123'}
         
@@ -34,7 +34,7 @@ def run_tests():
 
     # 3. Test Instagram
     print("\nTesting Instagram Service...")
-    with patch('requests.post') as mock_post:
+    with patch('requests.Session.post') as mock_post:
         mock_post.side_effect = [
             MagicMock(status_code=200, json=lambda: {'id': 'cont_123'}),
             MagicMock(status_code=200, json=lambda: {'id': 'ig_post_123'})